@@ -1,5 +1,51 @@
 from django.contrib import admin
-from .models import ProductDocument, Vendor, Department, Status, Category, Product, TransferLog, RepairStatus, RepairLog, RepairMovement
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import ProductDocument, Vendor, Department, Status, Category, Product, TransferLog, RepairStatus, RepairLog, RepairMovement, ReportSchedule, ReportSnapshot
+
+class EstimatedCountPaginator(Paginator):
+    """
+    On PostgreSQL, an unfiltered changelist of a large table is counted from
+    the planner's row estimate instead of a full COUNT(*). Filtered or
+    searched lists, and tables below `estimate_above` rows, are counted exactly.
+    """
+    estimate_above = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = self._estimate(queryset)
+            if estimate > self.estimate_above:
+                return estimate
+        return super().count
+
+    def _estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return -1
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            # A partitioned table (TransferLog, RepairMovement) has no
+            # estimate of its own; its partitions do. reltuples is -1 until a
+            # table has been analyzed, which empty future partitions never are.
+            cursor.execute(
+                "SELECT sum(greatest(reltuples, 0))::bigint FROM pg_class "
+                "WHERE (oid = %s::regclass AND relkind = 'r') "
+                "OR oid IN (SELECT relid FROM pg_partition_tree(%s::regclass) WHERE isleaf)",
+                [table, table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] is not None else -1
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """For tables that grow with usage: no second COUNT(*) for "x of y", estimated page count."""
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
 
 @admin.register(Vendor)
 class VendorAdmin(admin.ModelAdmin):
@@ -34,54 +80,89 @@ class CategoryAdmin(admin.ModelAdmin):
     ordering = ("name",)
 
 @admin.register(ProductDocument)
-class ProductDocumentAdmin(admin.ModelAdmin):
+class ProductDocumentAdmin(LargeTableAdmin):
     list_display = ("product_unique_code", "file", "uploaded_at")
+    list_select_related = ("product",)
+    autocomplete_fields = ("product",)
     search_fields = ("product__unique_code", "product__name", "file")
     ordering = ("-uploaded_at",)
 
     def product_unique_code(self, obj):
         return obj.product.unique_code
     product_unique_code.short_description = "Product Code"
+    product_unique_code.admin_order_field = "product__unique_code"
 
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ("unique_code", "name", "category", "vendor", "current_department", "price", "status", "is_active", "purchase_date", "warranty_years", "warranty_end_date")
-    search_fields = ("unique_code", "name", "model_number", "category__name", "vendor__name")
-    list_filter = ("status", "category", "vendor", "current_department", "is_active", "warranty_years")
+    list_select_related = ("category", "vendor", "current_department", "status")
+    autocomplete_fields = ("category", "vendor", "current_department", "status")
+    # Vendors and departments are searched rather than listed in the sidebar: one filter link per row
+    search_fields = ("unique_code", "name", "model_number", "category__name", "vendor__name", "current_department__name")
+    list_filter = ("status", "category", "is_active", "warranty_years")
     ordering = ("-created_at",)
 
 
 @admin.register(TransferLog)
-class TransferLogAdmin(admin.ModelAdmin):
+class TransferLogAdmin(LargeTableAdmin):
     list_display = ("product", "from_department", "to_department", "transfer_date", "created_at")
+    list_select_related = ("product", "from_department", "to_department")
+    autocomplete_fields = ("product", "from_department", "to_department")
     search_fields = ("product__name", "from_department__name", "to_department__name")
-    list_filter = ("from_department", "to_department")
+    list_filter = ("transfer_date",)
     ordering = ("-created_at",)
 
 
 @admin.register(RepairStatus)
 class RepairStatusAdmin(admin.ModelAdmin):
     list_display = ("name", "product_status", "is_active", "is_final", "created_at")
-    search_fields = ("name", "product_status")
+    list_select_related = ("product_status",)
+    autocomplete_fields = ("product_status",)
+    search_fields = ("name", "product_status__name")
     list_filter = ("is_active","is_final")
     ordering = ("name",)
 
 
 @admin.register(RepairLog)
-class RepairLogAdmin(admin.ModelAdmin):
+class RepairLogAdmin(LargeTableAdmin):
     list_display = ("product", "fault_description", "repair_vendor", "sent_date", "received_date", "repair_cost", "status", "created_at")
-    search_fields = ("product__unique_code", "product__name", "repair_vendor", "status__name")
-    list_filter = ("status", "repair_vendor", "sent_date", "received_date")
+    list_select_related = ("product", "repair_vendor", "status")
+    autocomplete_fields = ("product", "repair_vendor", "status")
+    search_fields = ("product__unique_code", "product__name", "repair_vendor__name", "status__name")
+    list_filter = ("status", "sent_date", "received_date")
     ordering = ("-created_at",)
 
+    def get_queryset(self, request):
+        # __str__ reads the product and status, e.g. for RepairMovement's autocomplete.
+        # The changelist skips list_select_related once a select_related is set, so reuse it.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
 
 @admin.register(RepairMovement)
-class RepairMovementAdmin(admin.ModelAdmin):
+class RepairMovementAdmin(LargeTableAdmin):
     list_display = ("product", "repair", "status", "from_department", "to_vendor", "changed_at")
+    # The repair column prints RepairLog.__str__, which reads its product and status
+    list_select_related = ("product", "repair__product", "repair__status", "status", "from_department", "to_vendor")
+    autocomplete_fields = ("product", "repair", "status", "from_department", "to_vendor")
     search_fields = ("product__unique_code", "product__name", "status__name", "from_department__name", "to_vendor__name")
-    list_filter = ("status", "to_vendor", "changed_at")
+    list_filter = ("status", "changed_at")
     ordering = ("-changed_at",)
 
 
+class ReportSnapshotInline(admin.TabularInline):
+    model = ReportSnapshot
+    fields = ("generated_at", "file", "size", "checksum", "change_cursor")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(ReportSchedule)
+class ReportScheduleAdmin(admin.ModelAdmin):
+    list_display = ("name", "report", "compress", "is_active", "updated_at")
+    search_fields = ("name",)
+    list_filter = ("report", "is_active")
+    ordering = ("name",)
+    inlines = [ReportSnapshotInline]
@@ -0,0 +1,86 @@
+"""
+Shared helpers for the benchmark commands (run_benchmarks, bench_startup).
+
+Results are written as JSON next to a baseline, by default under
+`benchmarks/` in the project directory; comparing against it flags cases
+that got slower by more than a tolerance or that now run more queries.
+"""
+import json
+import platform
+import statistics
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+BASELINE_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(seconds):
+    """min / p50 / p95 / mean in milliseconds for a list of durations in seconds."""
+    ms = [s * 1000 for s in seconds]
+    return {
+        "min_ms": round(min(ms), 2),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+    }
+
+
+def environment():
+    return {
+        "recorded_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+    }
+
+
+def save(path, results, **context):
+    """Write `results` with the environment (plus `context`, e.g. row counts) they were measured in."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"environment": {**environment(), **context}, "results": results}
+    path.write_text(json.dumps(document, indent=2, default=str) + "\n")
+
+
+def load(path):
+    """The saved {"environment": ..., "results": ...} document, or None."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def compare(results, baseline, timing_key, tolerance, min_delta, exact_keys=()):
+    """
+    Regressions of `results` against `baseline` (both {case: metrics}).
+
+    A case regresses when `timing_key` grew by more than `tolerance` (a
+    fraction) and by at least `min_delta` (absolute, to ignore noise on fast
+    cases), or when any of `exact_keys` (e.g. query counts) increased.
+    """
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or "error" in current or "error" in before:
+            continue
+        old, new = before.get(timing_key), current.get(timing_key)
+        if old is not None and new is not None and new > old * (1 + tolerance) and new - old >= min_delta:
+            growth = f" (+{(new / old - 1) * 100:.0f}%)" if old else ""
+            regressions.append(f"{name}: {timing_key} {old} -> {new}{growth}")
+        for key in exact_keys:
+            if key in before and key in current and current[key] > before[key]:
+                regressions.append(f"{name}: {key} {before[key]} -> {current[key]}")
+    return regressions
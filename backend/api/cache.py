@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from it_asset_management_system.db_routers import replica_reads
+
+from .conditional import latest_change
+
+
+def get_version(model_name):
+    """
+    Per-model version: the id of the model's newest ChangeLog entry. Every
+    save, soft delete and bulk publish appends one, and the database is
+    shared by all workers, so a write in one process changes the version
+    every other process sees. Read from the primary, like the cache fills.
+    """
+    with replica_reads(enabled=False):
+        return latest_change([model_name])[0]
+
+
+def versions_key(model_names):
+    return "-".join(f"{name}.{get_version(name)}" for name in sorted(model_names))
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for the list cache of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counts[name]["hits" if hit else "misses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+class CachedListMixin:
+    """
+    Caches serialized list responses for rarely changing reference data.
+
+    Entries are keyed by the request path and query string plus the current
+    version of every model in `cache_models` (falling back to
+    `conditional_models`), so a save or soft delete makes old entries
+    unreachable in every worker instead of requiring explicit invalidation.
+    """
+    cache_models = None
+
+    def get_cache_models(self):
+        return (
+            self.cache_models
+            or getattr(self, "conditional_models", None)
+            or [self.get_queryset().model._meta.model_name]
+        )
+
+    def get_list_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        digest = hashlib.sha1(f"{request.path}?{params}".encode()).hexdigest()
+        return f"api:list:{versions_key(self.get_cache_models())}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        name = self.get_queryset().model._meta.model_name
+        key = self.get_list_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            stats.record(name, hit=True)
+            return Response(data)
+
+        stats.record(name, hit=False)
+        # The key already carries the new version, so fill it from the
+        # primary rather than from a replica that may still be behind.
+        with replica_reads(enabled=False):
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_LIST_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,76 @@
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ChangeLog
+
+
+def latest_change(models):
+    """
+    (id, changed_at) of the newest ChangeLog entry of any of `models`, or
+    (0, None). One index-only lookup on (model, id) per model, so the cost
+    does not grow with the history.
+    """
+    latest = (0, None)
+    for model in models:
+        row = ChangeLog.objects.filter(model=model).order_by("-id").values_list("id", "changed_at").first()
+        if row and row[0] > latest[0]:
+            latest = row
+    return latest
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve.
+
+    The validator is the latest ChangeLog entry of the models a response
+    depends on, so a 304 costs one index lookup per model and no serialization.
+    Viewsets whose payload includes related names list those models in
+    `conditional_models`.
+    """
+    conditional_models = None
+
+    def get_conditional_models(self):
+        return self.conditional_models or [self.get_queryset().model._meta.model_name]
+
+    def get_conditional_state(self, request):
+        seq, changed_at = latest_change(self.get_conditional_models())
+        raw = f"{seq}:{request.user.pk}:{request.get_full_path()}"
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        last_modified = changed_at.timestamp() if changed_at else None
+        return etag, last_modified
+
+    def _is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return "*" in etags or etag in etags
+
+        if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+        return bool(last_modified and if_modified_since and int(last_modified) <= if_modified_since)
+
+    def _set_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        response["Vary"] = "Authorization"
+        return response
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.get_conditional_state(request)
+        if self._is_not_modified(request, etag, last_modified):
+            return self._set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self._set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
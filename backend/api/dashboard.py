@@ -0,0 +1,109 @@
+"""
+Dashboard aggregates.
+
+Every entry of SUMMARY and SECTIONS is an independent query. `build()` runs
+them one after another on the calling thread, which is what the sync view
+does: a WSGI worker handles one request and should use one connection.
+`abuild()`, for the async view, runs them with DASHBOARD_WORKERS > 1 on a
+shared bounded thread pool where each thread keeps its own database
+connection, so the dashboard costs about as much as its slowest query and
+the event loop stays free meanwhile.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, DecimalField, F, Sum
+
+from . import warranty
+from .models import Category, Department, Product, RepairLog, TransferLog, Vendor
+
+
+def _active_products():
+    return Product.objects.filter(is_active=True)
+
+
+SUMMARY = {
+    "total_products": lambda: _active_products().count(),
+    "total_repairs": lambda: RepairLog.objects.filter(is_active=True).count(),
+    "total_transfers": lambda: TransferLog.objects.filter(product__is_active=True).count(),
+    "total_vendors": lambda: Vendor.objects.filter(is_active=True).count(),
+    "total_departments": lambda: Department.objects.filter(is_active=True).count(),
+    "total_categories": lambda: Category.objects.filter(is_active=True).count(),
+    "total_product_value": lambda: Product.objects.aggregate(
+        total=Sum(F("price"), output_field=DecimalField())
+    )["total"] or 0,
+    "total_repair_cost": lambda: RepairLog.objects.aggregate(
+        total=Sum(F("repair_cost"), output_field=DecimalField())
+    )["total"] or 0,
+}
+
+SECTIONS = {
+    "department_products": lambda: list(
+        _active_products().values(dept=F("current_department__name")).annotate(count=Count("id")).order_by("dept")
+    ),
+    "repair_status_counts": lambda: list(
+        RepairLog.objects.filter(is_active=True).values("status__name").annotate(value=Count("id"))
+    ),
+    "product_category_counts": lambda: list(_active_products().values("category__name").annotate(value=Count("id"))),
+    "product_vendor_counts": lambda: list(_active_products().values("vendor__name").annotate(value=Count("id"))),
+    "product_status_counts": lambda: list(
+        _active_products().values(status_name=F("status__name")).annotate(value=Count("id"))
+    ),
+    "warranty_expiring_by_month": warranty.expiring_by_month,
+}
+
+TASKS = {**SUMMARY, **SECTIONS}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DASHBOARD_WORKERS,
+                    thread_name_prefix="dashboard",
+                )
+    return _executor
+
+
+def _in_worker(func):
+    # Pool threads outlive requests: apply CONN_MAX_AGE and health checks as a request would
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+def _submit(executor, func):
+    # Copy the context so the request's replica choice applies in the worker too
+    return executor.submit(contextvars.copy_context().run, _in_worker, func)
+
+
+def _assemble(results):
+    return {
+        "summary": {name: results[name] for name in SUMMARY},
+        **{name: results[name] for name in SECTIONS},
+    }
+
+
+def build():
+    return _assemble({name: func() for name, func in TASKS.items()})
+
+
+async def abuild():
+    if settings.DASHBOARD_WORKERS <= 1:
+        return await sync_to_async(build)()
+    executor = _get_executor()
+    names = list(TASKS)
+    values = await asyncio.gather(*(asyncio.wrap_future(_submit(executor, TASKS[name])) for name in names))
+    return _assemble(dict(zip(names, values)))
@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from it_asset_management_system.db_routers import replica_reads
+
+from .cache import versions_key
+from .models import Category, Product, RepairLog
+
+
+TCO_MODELS = ["product", "category", "repairlog", "department"]
+
+GROUPS = {
+    "department": ("current_department_id", "current_department__name"),
+    "category": ("category_id", "category__name"),
+}
+
+
+def _repair_cost_subquery():
+    totals = (
+        RepairLog.objects.filter(product=OuterRef("pk"))
+        .values("product")
+        .annotate(total=Sum("repair_cost"))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(totals, output_field=DecimalField(max_digits=12, decimal_places=2)),
+        Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
+    )
+
+
+def product_frame(as_of=None):
+    """
+    Load every active product with its category's depreciation settings and
+    cumulative repair cost in one query, then compute book value for all rows
+    at once with NumPy.
+    """
+    import numpy as np
+    import pandas as pd
+
+    as_of = as_of or timezone.localdate()
+    rows = (
+        Product.objects.filter(is_active=True)
+        .annotate(repair_cost=_repair_cost_subquery())
+        .values(
+            "id", "price", "purchase_date", "created_at",
+            "current_department_id", "current_department__name",
+            "category_id", "category__name",
+            "category__depreciation_method",
+            "category__useful_life_years",
+            "category__salvage_value_percent",
+            "repair_cost",
+        )
+    )
+    df = pd.DataFrame.from_records(list(rows))
+    if df.empty:
+        return df
+
+    price = df["price"].astype(float).to_numpy()
+    repair_cost = df["repair_cost"].astype(float).to_numpy()
+
+    # Products without a purchase date depreciate from when they were recorded
+    start = pd.to_datetime(df["purchase_date"]).fillna(
+        pd.to_datetime(df["created_at"], utc=True)
+        .dt.tz_convert(settings.TIME_ZONE).dt.tz_localize(None).dt.normalize()
+    )
+    age_years = np.clip((pd.Timestamp(as_of) - start).dt.days.to_numpy() / 365.25, 0, None)
+
+    life = np.maximum(df["category__useful_life_years"].astype(float).to_numpy(), 1)
+    salvage = price * df["category__salvage_value_percent"].astype(float).to_numpy() / 100
+
+    straight = price - (price - salvage) * np.minimum(age_years / life, 1)
+    # Double-declining balance, never below salvage value
+    declining = np.maximum(price * np.power(1 - np.minimum(2 / life, 1), age_years), salvage)
+
+    method = df["category__depreciation_method"].to_numpy()
+    book_value = np.where(method == Category.DECLINING_BALANCE, declining, straight)
+
+    df["price"] = price
+    df["repair_cost"] = repair_cost
+    df["book_value"] = book_value
+    df["depreciation"] = price - book_value
+    df["tco"] = price + repair_cost
+    return df
+
+
+def _group_totals(df, group):
+    id_col, name_col = GROUPS[group]
+    if df.empty:
+        return []
+
+    totals = (
+        df.groupby([id_col, name_col], dropna=False)
+        .agg(
+            products=("id", "count"),
+            purchase_value=("price", "sum"),
+            book_value=("book_value", "sum"),
+            depreciation=("depreciation", "sum"),
+            repair_cost=("repair_cost", "sum"),
+            tco=("tco", "sum"),
+        )
+        .reset_index()
+        .sort_values("tco", ascending=False)
+    )
+
+    return [
+        {
+            "id": int(row[id_col]),
+            "name": row[name_col],
+            "products": int(row["products"]),
+            "purchase_value": round(float(row["purchase_value"]), 2),
+            "book_value": round(float(row["book_value"]), 2),
+            "depreciation": round(float(row["depreciation"]), 2),
+            "repair_cost": round(float(row["repair_cost"]), 2),
+            "tco": round(float(row["tco"]), 2),
+        }
+        for _, row in totals.iterrows()
+    ]
+
+
+def tco_by(group, as_of=None):
+    """
+    Per-department or per-category TCO, cached for the requested date until
+    products, categories or repairs change.
+    """
+    as_of = as_of or timezone.localdate()
+    key = f"tco:{group}:{as_of.isoformat()}:{versions_key(TCO_MODELS)}"
+    result = cache.get(key)
+    if result is None:
+        # Cached under the current versions, so compute from the primary
+        with replica_reads(enabled=False):
+            result = _group_totals(product_frame(as_of), group)
+        cache.set(key, result, settings.TCO_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,171 @@
+import os
+import re
+import mimetypes
+import tempfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework.renderers import BaseRenderer
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Lets file downloads through DRF content negotiation untouched."""
+    media_type = "*/*"
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+def _etag(checksum):
+    return quote_etag(checksum)
+
+
+def _base_headers(response, checksum, modified):
+    response["ETag"] = _etag(checksum)
+    response["Last-Modified"] = http_date(modified.timestamp())
+    response["Cache-Control"] = f"private, max-age={settings.DOCUMENTS_CACHE_MAX_AGE}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _content_type(file):
+    content_type, _ = mimetypes.guess_type(file.name)
+    return content_type or "application/octet-stream"
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None to send
+    the whole file, or False when the range cannot be satisfied."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix range: last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_range(fh, start, length):
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _sendfile_response(file):
+    backend = settings.DOCUMENTS_SENDFILE
+    response = HttpResponse(content_type=_content_type(file))
+
+    if backend == "nginx":
+        prefix = settings.DOCUMENTS_SENDFILE_PREFIX.rstrip("/")
+        response["X-Accel-Redirect"] = quote(f"{prefix}/{file.name}")
+    else:
+        response["X-Sendfile"] = file.path
+
+    return response
+
+
+def serve_file(request, file, size, checksum, modified, attachment=False):
+    """
+    Serve a stored file after the caller has checked permissions.
+
+    Production setups hand the transfer to the web server through
+    X-Accel-Redirect (nginx) or X-Sendfile (apache); otherwise the file is
+    streamed from storage with Range and If-None-Match support.
+    """
+    etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    if "*" in etags or _etag(checksum) in etags:
+        return _base_headers(HttpResponse(status=304), checksum, modified)
+
+    filename = os.path.basename(file.name)
+    disposition = f"{'attachment' if attachment else 'inline'}; filename*=UTF-8''{quote(filename)}"
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=_content_type(file))
+        response["Content-Length"] = str(size)
+        response["Content-Disposition"] = disposition
+        return _base_headers(response, checksum, modified)
+
+    if settings.DOCUMENTS_SENDFILE:
+        response = _sendfile_response(file)
+        response["Content-Disposition"] = disposition
+        return _base_headers(response, checksum, modified)
+
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE")
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if range_header and (not if_range or if_range == _etag(checksum)):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return _base_headers(response, checksum, modified)
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(file.storage.open(file.name, "rb"), start, length),
+            status=206,
+            content_type=_content_type(file),
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        response = FileResponse(
+            file.storage.open(file.name, "rb"),
+            content_type=_content_type(file),
+        )
+        response["Content-Length"] = str(size)
+
+    response["Content-Disposition"] = disposition
+    return _base_headers(response, checksum, modified)
+
+
+def serve_document(request, document):
+    """Serve a ProductDocument, filling in its checksum on first download."""
+    if not document.checksum:
+        document.refresh_file_metadata()
+        document.save(update_fields=["size", "checksum"])
+
+    return serve_file(request, document.file, document.size, document.checksum, document.uploaded_at)
+
+
+def spool(writer, *args, **kwargs):
+    """Run `writer(*args, fileobj)` into a temporary file, rewound and ready to stream."""
+    fileobj = tempfile.TemporaryFile()
+    try:
+        writer(*args, fileobj, **kwargs)
+    except BaseException:
+        fileobj.close()
+        raise
+    fileobj.seek(0)
+    return fileobj
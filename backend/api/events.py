@@ -0,0 +1,290 @@
+"""
+Live change events for the Server-Sent Events stream (/api/events/).
+
+Model signals turn product and transfer writes into compact events once the
+transaction commits: `product.created`, `product.transferred`,
+`product.status_changed`, `product.updated`, `product.deleted`,
+`transfer.created`, plus `dashboard.delta` with the counter changes keyed like
+the dashboard response.
+
+`publish()` encodes each event as an SSE frame once. On PostgreSQL the frame
+goes out through NOTIFY on EVENTS_CHANNEL and a listener thread in every
+process relays it to that process's subscribers; on other databases it only
+reaches the subscribers of the process that made the change. Subscribers are
+asyncio queues owned by the streaming responses. A client that falls
+EVENTS_QUEUE_SIZE frames behind, or that may have missed events while the
+listener reconnected, gets a `reset` event and should refetch.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Category, Department, Status, Vendor
+
+logger = logging.getLogger(__name__)
+
+# Reconnect delay sent to EventSource clients
+RETRY_MS = 3000
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_LIMIT = 7999
+
+
+def encode(kind, data):
+    payload = json.dumps(data, cls=JSONEncoder, separators=(",", ":"))
+    return f"event: {kind}\ndata: {payload}\n\n"
+
+
+RESET = encode("reset", {})
+
+
+class Subscription:
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def put(self, frame):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too far behind to catch up from deltas: drop the backlog, ask for a refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """In-process fan-out; `dispatch()` may be called from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), settings.EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(subscription)
+        if connections["default"].vendor == "postgresql":
+            _start_listener()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def dispatch(self, frame):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, frame)
+            except RuntimeError:
+                # Its event loop is closed
+                self.unsubscribe(subscription)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+broker = Broker()
+
+
+def enabled():
+    """
+    Whether events made here can reach a subscriber. Without PostgreSQL only
+    this process's streams receive them, so with none open there is nothing
+    to publish (or to compute).
+    """
+    if not settings.EVENTS_ENABLED:
+        return False
+    return connections["default"].vendor == "postgresql" or len(broker) > 0
+
+
+def publish(kind, data):
+    if not settings.EVENTS_ENABLED:
+        return
+    frame = encode(kind, data)
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        broker.dispatch(frame)
+        return
+    if len(frame.encode()) > NOTIFY_LIMIT:
+        logger.warning("Dropping %s event of %d bytes, too large for NOTIFY", kind, len(frame.encode()))
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [settings.EVENTS_CHANNEL, frame])
+
+
+# ── Cross-process delivery (PostgreSQL LISTEN) ────────────────────────────────
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener():
+    global _listener
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                _listener = threading.Thread(target=_listen_forever, name="events-listener", daemon=True)
+                _listener.start()
+
+
+def _listen_forever():
+    delay = 1
+    while True:
+        started = time.monotonic()
+        try:
+            _listen()
+        except Exception:
+            logger.exception("Event listener lost its connection; reconnecting")
+        # Anything published while disconnected is lost
+        broker.dispatch(RESET)
+        delay = 1 if time.monotonic() - started > 60 else min(delay * 2, 30)
+        time.sleep(delay)
+
+
+def _listen():
+    # A connection of its own: it blocks waiting for notifications
+    connection = connections.create_connection("default")
+    try:
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {connection.ops.quote_name(settings.EVENTS_CHANNEL)}")
+        raw = connection.connection
+        if callable(getattr(raw, "notifies", None)):  # psycopg 3
+            for notify in raw.notifies():
+                broker.dispatch(notify.payload)
+        else:  # psycopg2
+            while True:
+                if select.select([raw], [], [], 60) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    broker.dispatch(raw.notifies.pop(0).payload)
+    finally:
+        connection.close()
+
+
+# ── Product and transfer events ───────────────────────────────────────────────
+
+PRODUCT_FIELDS = ("is_active", "status_id", "current_department_id", "category_id", "vendor_id", "price")
+
+# Product field -> (dashboard section, model whose name labels the section's rows)
+COUNTED_FIELDS = {
+    "current_department_id": ("department_products", Department),
+    "status_id": ("product_status_counts", Status),
+    "category_id": ("product_category_counts", Category),
+    "vendor_id": ("product_vendor_counts", Vendor),
+}
+
+
+def product_state(instance):
+    return {field: getattr(instance, field) for field in PRODUCT_FIELDS}
+
+
+def stored_state(instance):
+    """PRODUCT_FIELDS as last loaded from or saved to the database; None if not all known."""
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is None or not all(field in loaded for field in PRODUCT_FIELDS):
+        return None
+    return {field: loaded[field] for field in PRODUCT_FIELDS}
+
+
+def _count_delta(before, after):
+    """Change of the per-name counts of active products, as {field: Counter({pk: delta})}."""
+    deltas = {field: Counter() for field in COUNTED_FIELDS}
+    for state, sign in ((before, -1), (after, 1)):
+        if state and state["is_active"]:
+            for field in COUNTED_FIELDS:
+                deltas[field][state[field]] += sign
+    return deltas
+
+
+def _price(state):
+    # An unsaved default is the float 0.0
+    return Decimal(str(state["price"])) if state else Decimal(0)
+
+
+def dashboard_delta(before, after):
+    """The dashboard changes caused by a product going from `before` to `after` (None: absent)."""
+    summary = {}
+    active = int(bool(after and after["is_active"])) - int(bool(before and before["is_active"]))
+    if active:
+        summary["total_products"] = active
+    # total_product_value sums every product, active or not
+    value = _price(after) - _price(before)
+    if value:
+        summary["total_product_value"] = value
+
+    delta = {"summary": summary} if summary else {}
+    for field, counts in _count_delta(before, after).items():
+        counts = {pk: n for pk, n in counts.items() if n}
+        if not counts:
+            continue
+        section, model = COUNTED_FIELDS[field]
+        names = dict(model.objects.filter(pk__in=counts).values_list("pk", "name"))
+        delta[section] = {names.get(pk, str(pk)): n for pk, n in counts.items()}
+    return delta
+
+
+def product_changed(pk, unique_code, name, created, before, after):
+    """
+    Publish the events for one committed product save. `before` is the stored
+    state the save replaced; None when `created` or when the save could not
+    have touched PRODUCT_FIELDS.
+    """
+    product = {"id": pk, "unique_code": unique_code, "name": name}
+    if created:
+        before = None
+    elif before is None:
+        publish("product.updated", product)
+        return
+
+    was_active = bool(before and before["is_active"])
+    if after["is_active"] and not was_active:
+        publish("product.created", {
+            **product,
+            "status": after["status_id"],
+            "department": after["current_department_id"],
+            "category": after["category_id"],
+            "vendor": after["vendor_id"],
+        })
+    elif was_active and not after["is_active"]:
+        publish("product.deleted", {"id": pk})
+    elif after["is_active"]:
+        specific = False
+        if before["current_department_id"] != after["current_department_id"]:
+            publish("product.transferred", {
+                **product, "from": before["current_department_id"], "to": after["current_department_id"],
+            })
+            specific = True
+        if before["status_id"] != after["status_id"]:
+            publish("product.status_changed", {**product, "from": before["status_id"], "to": after["status_id"]})
+            specific = True
+        if not specific:
+            publish("product.updated", product)
+
+    delta = dashboard_delta(before, after)
+    if delta:
+        publish("dashboard.delta", delta)
+
+
+def transfer_created(pk, product_id, to_department_id, product_active):
+    publish("transfer.created", {"id": pk, "product": product_id, "to": to_department_id})
+    # The dashboard only counts transfers of active products
+    if product_active:
+        publish("dashboard.delta", {"summary": {"total_transfers": 1}})
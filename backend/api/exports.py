@@ -0,0 +1,231 @@
+"""
+Products Excel / PDF rendering.
+
+Only loaded by the export views, report snapshots and benchmarks, so that
+reportlab (and pandas/openpyxl, imported inside `write_products_excel`) stay
+out of the web workers until an export is requested.
+"""
+import itertools
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import BaseDocTemplate, Frame, NextPageTemplate, PageTemplate, Paragraph, Spacer, Table, TableStyle
+
+
+PAGE_SIZE = landscape(A4)
+LEFT_MARGIN = RIGHT_MARGIN = 1 * cm
+TOP_MARGIN = 2 * cm
+BOTTOM_MARGIN = 1 * cm
+
+# Roughly one page of single-line rows. Tables of this size split cheaply at a
+# page boundary, whereas one table holding every row is laid out in quadratic time.
+ROWS_PER_TABLE = 28
+
+PRODUCT_COLUMNS = [
+    ("SL", 1.0 * cm),
+    ("ID", 2.0 * cm),
+    ("Name", 5.5 * cm),
+    ("Category", 3.0 * cm),
+    ("Department", 3.0 * cm),
+    ("Vendor", 3.0 * cm),
+    ("Price", 2.0 * cm),
+    ("Purchase", 2.0 * cm),
+    ("Warranty", 1.9 * cm),
+    ("End", 2.0 * cm),
+    ("Status", 2.0 * cm),
+]
+
+PRODUCT_ROW_FIELDS = [
+    "unique_code", "name", "category_name", "department_name", "vendor_name",
+    "price", "purchase_date", "warranty_years", "warranty_end_date", "status_name",
+]
+
+_sample = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle("ExportTitle", parent=_sample["Title"], fontSize=18, leading=22)
+CELL_STYLE = ParagraphStyle("ExportCell", parent=_sample["BodyText"], fontSize=9, leading=11, alignment=TA_CENTER)
+
+_CELL_COMMANDS = [
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("GRID", (0, 0), (-1, -1), 0.4, colors.grey),
+    ("LEFTPADDING", (0, 0), (-1, -1), 3),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 3),
+    ("TOPPADDING", (0, 0), (-1, -1), 3),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+]
+
+HEADER_STYLE = TableStyle(_CELL_COMMANDS + [
+    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f0f0f0")),
+    ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 11),
+])
+
+BODY_STYLE = TableStyle(_CELL_COMMANDS + [
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("ROWBACKGROUNDS", (0, 0), (-1, -1), [None, colors.HexColor("#fafafa")]),
+])
+
+
+def _text(value, fits):
+    """Plain strings are far cheaper to lay out; only wrap text that would overflow."""
+    if not value:
+        return "-"
+    if len(value) <= fits:
+        return value
+    return Paragraph(escape(value), CELL_STYLE)
+
+
+def _date(value):
+    return value.strftime("%d-%m-%Y") if value else "-"
+
+
+def product_pdf_row(sl, row):
+    code, name, category, department, vendor, price, purchase, warranty, end, status = row
+    return [
+        str(sl),
+        code,
+        _text(name, 30),
+        _text(category, 15),
+        _text(department, 15),
+        _text(vendor, 15),
+        f"{price:.2f}",
+        _date(purchase),
+        f"{warranty}y" if warranty else "-",
+        _date(end),
+        _text(status, 10),
+    ]
+
+
+class _LazyFlowables(list):
+    """
+    Flowable list that pulls from a generator as the doc template consumes it,
+    so only the tables around the current page are held in memory.
+    """
+
+    def __init__(self, head, source):
+        super().__init__(head)
+        self._source = source
+
+    def __len__(self):
+        if super().__len__() < 2:
+            self.extend(itertools.islice(self._source, 2))
+        return super().__len__()
+
+
+def _header_footer(canvas_obj, doc_obj):
+    canvas_obj.saveState()
+    canvas_obj.setFont("Helvetica-Bold", 14)
+    canvas_obj.drawString(2 * cm, doc_obj.pagesize[1] - 1.5 * cm, "Feni Diabetes Hospital")
+    canvas_obj.setFont("Helvetica", 9)
+    canvas_obj.drawRightString(doc_obj.pagesize[0] - 2 * cm, 1 * cm, f"Page {doc_obj.page}")
+    canvas_obj.restoreState()
+
+
+def write_table_pdf(fileobj, title, columns, rows, rows_per_table=ROWS_PER_TABLE):
+    """
+    Write `rows` (an iterable of cell lists) as a paginated table report.
+
+    Rows are emitted as a series of small tables sharing one style. The column
+    header is a flowable on the first page and is drawn by the page template
+    on every later page, so chunks flow together without repeated headers.
+    """
+    col_widths = [width for _, width in columns]
+    header = Table([[name for name, _ in columns]], colWidths=col_widths, style=HEADER_STYLE)
+    table_width, header_height = header.wrap(PAGE_SIZE[0], PAGE_SIZE[1])
+
+    doc = BaseDocTemplate(
+        fileobj,
+        pagesize=PAGE_SIZE,
+        leftMargin=LEFT_MARGIN,
+        rightMargin=RIGHT_MARGIN,
+        topMargin=TOP_MARGIN,
+        bottomMargin=BOTTOM_MARGIN,
+        title=title,
+    )
+    padding = 6  # Frame default
+    top = doc.bottomMargin + doc.height
+
+    def draw_header(canvas_obj, doc_obj):
+        _header_footer(canvas_obj, doc_obj)
+        header.drawOn(canvas_obj, (PAGE_SIZE[0] - table_width) / 2, top - padding - header_height)
+
+    doc.addPageTemplates([
+        PageTemplate("first", [Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)], onPage=_header_footer),
+        PageTemplate("later", [Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - header_height)], onPage=draw_header),
+    ])
+
+    def tables():
+        rows_iter = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows_iter, rows_per_table))
+            if not chunk:
+                return
+            yield Table(chunk, colWidths=col_widths, style=BODY_STYLE)
+
+    head = [Paragraph(title, TITLE_STYLE), Spacer(1, 12), header, NextPageTemplate("later")]
+    doc.build(_LazyFlowables(head, tables()))
+
+
+def write_products_pdf(queryset, fileobj, rows_per_table=ROWS_PER_TABLE):
+    """Render ProductListing rows (see `listing.filter_listing`) as the products PDF report."""
+    values = queryset.values_list(*PRODUCT_ROW_FIELDS).iterator(chunk_size=2000)
+    rows = (product_pdf_row(sl, row) for sl, row in enumerate(values, start=1))
+    write_table_pdf(fileobj, "Products Report", PRODUCT_COLUMNS, rows, rows_per_table)
+
+
+def write_products_excel(queryset, fileobj):
+    """Render ProductListing rows as the products Excel workbook."""
+    import pandas as pd
+    from openpyxl.styles import Alignment, Font
+    from openpyxl.utils import get_column_letter
+
+    data = []
+    for p in queryset:
+        data.append({
+            "ID": p.unique_code,
+            "Name": p.name,
+            "Model Number": p.model_number,
+            "Serial Number": p.serial_number,
+            "Description": p.description,
+            "Category": p.category_name,
+            "Department": p.department_name,
+            "Vendor": p.vendor_name,
+            "Price": float(p.price),
+            "Purchase Date": p.purchase_date.strftime("%d-%m-%Y") if p.purchase_date else "",
+            "Warranty": f"{p.warranty_years} years" if p.warranty_years else "",
+            "Warranty End": p.warranty_end_date.strftime("%d-%m-%Y") if p.warranty_end_date else "",
+            "Status": p.status_name,
+            "Created At": p.created_at.strftime("%d-%m-%Y %H:%M:%S"),
+            "Updated At": p.updated_at.strftime("%d-%m-%Y %H:%M:%S"),
+        })
+
+    df = pd.DataFrame(data)
+
+    with pd.ExcelWriter(fileobj, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Products")
+        sheet = writer.book["Products"]
+
+        # Style header
+        header_font = Font(bold=True)
+        for cell in sheet[1]:
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal="center")
+
+        # Auto column width
+        for col in sheet.columns:
+            max_length = 0
+            col_letter = get_column_letter(col[0].column)
+            for cell in col:
+                try:
+                    max_length = max(max_length, len(str(cell.value)))
+                except (TypeError, ValueError):
+                    pass
+            sheet.column_dimensions[col_letter].width = max_length + 4
+
+        # Freeze header
+        sheet.freeze_panes = "A2"
@@ -0,0 +1,262 @@
+"""
+Bulk CSV and Parquet extracts for BI pulls.
+
+CSV is produced by Postgres itself (`COPY (SELECT ...) TO STDOUT`) when the
+database allows it, so rows never become Python objects; other backends fall
+back to `csv.writer` over a server-side iterator. Parquet is written one row
+group per chunk of rows, with a schema derived from the model fields so every
+row group has the same column types.
+"""
+import csv
+import gzip
+import io
+import itertools
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Q
+
+from .listing import filter_listing
+from .models import RepairLog, TransferLog
+
+
+def _ordering(filters, columns, default):
+    """Only allow ordering by an exported column; anything else uses the default."""
+    ordering = filters.get("ordering") or default
+    lookups = dict(columns)
+    field = ordering.lstrip("-")
+    if field in lookups:
+        return ("-" if ordering.startswith("-") else "") + lookups[field]
+    return default
+
+
+PRODUCT_COLUMNS = [
+    ("id", "product_id"),
+    ("unique_code", "unique_code"),
+    ("name", "name"),
+    ("model_number", "model_number"),
+    ("serial_number", "serial_number"),
+    ("description", "description"),
+    ("category", "category_name"),
+    ("department", "department_name"),
+    ("vendor", "vendor_name"),
+    ("status", "status_name"),
+    ("price", "price"),
+    ("purchase_date", "purchase_date"),
+    ("warranty_years", "warranty_years"),
+    ("warranty_end_date", "warranty_end_date"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+TRANSFER_COLUMNS = [
+    ("id", "id"),
+    ("product_id", "product_id"),
+    ("product_code", "product__unique_code"),
+    ("product_name", "product__name"),
+    ("from_department", "from_department__name"),
+    ("to_department", "to_department__name"),
+    ("transfer_date", "transfer_date"),
+    ("note", "note"),
+    ("created_at", "created_at"),
+]
+
+REPAIR_COLUMNS = [
+    ("id", "id"),
+    ("product_id", "product_id"),
+    ("product_code", "product__unique_code"),
+    ("product_name", "product__name"),
+    ("fault_description", "fault_description"),
+    ("vendor", "repair_vendor__name"),
+    ("status", "status__name"),
+    ("sent_date", "sent_date"),
+    ("received_date", "received_date"),
+    ("repair_cost", "repair_cost"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+
+def filter_products(filters):
+    return filter_listing({**filters, "ordering": _ordering(filters, PRODUCT_COLUMNS, "-created_at")})
+
+
+def filter_transfers(filters):
+    qs = TransferLog.objects.all()
+
+    search = filters.get("search")
+    product = filters.get("product")
+    department = filters.get("department")
+    date_from = filters.get("date_from")
+    date_to = filters.get("date_to")
+
+    if search:
+        qs = qs.filter(
+            Q(product__unique_code__icontains=search) | Q(product__name__icontains=search)
+            | Q(from_department__name__icontains=search) | Q(to_department__name__icontains=search)
+        )
+    if product:
+        qs = qs.filter(product_id=product)
+    if department:
+        qs = qs.filter(Q(from_department_id=department) | Q(to_department_id=department))
+    if date_from:
+        qs = qs.filter(transfer_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(transfer_date__lte=date_to)
+
+    return qs.order_by(_ordering(filters, TRANSFER_COLUMNS, "-created_at"))
+
+
+def filter_repairs(filters):
+    qs = RepairLog.objects.filter(is_active=True)
+
+    search = filters.get("search")
+    product = filters.get("product")
+    status = filters.get("status")
+    vendor = filters.get("vendor")
+    date_from = filters.get("date_from")
+    date_to = filters.get("date_to")
+
+    if search:
+        qs = qs.filter(
+            Q(product__unique_code__icontains=search) | Q(product__name__icontains=search)
+            | Q(fault_description__icontains=search)
+        )
+    if product:
+        qs = qs.filter(product_id=product)
+    if status:
+        qs = qs.filter(status_id=status)
+    if vendor:
+        qs = qs.filter(repair_vendor_id=vendor)
+    if date_from:
+        qs = qs.filter(sent_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(sent_date__lte=date_to)
+
+    return qs.order_by(_ordering(filters, REPAIR_COLUMNS, "-created_at"))
+
+
+# entity -> (filter function, (column name, lookup) pairs)
+ENTITIES = {
+    "products": (filter_products, PRODUCT_COLUMNS),
+    "transfers": (filter_transfers, TRANSFER_COLUMNS),
+    "repairs": (filter_repairs, REPAIR_COLUMNS),
+}
+
+FORMATS = {
+    # format -> (content type, file extension)
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _values(entity, filters):
+    filter_func, columns = ENTITIES[entity]
+    qs = filter_func(filters)
+    return qs.values_list(*[lookup for _, lookup in columns]), columns
+
+
+def copy_to(connection, sql, params, fileobj, options="FORMAT csv"):
+    """Write `COPY (sql) TO STDOUT` to a binary file object (PostgreSQL only)."""
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            query = raw.mogrify(sql, params).decode()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH ({options})", fileobj)
+        else:  # psycopg 3
+            with raw.copy(f"COPY ({sql}) TO STDOUT WITH ({options})", params) as copy:
+                for block in copy:
+                    fileobj.write(block)
+
+
+def _copy_csv(qs, fileobj):
+    """Stream the query through Postgres COPY; returns False when COPY is unavailable."""
+    connection = connections[qs.db]
+    if connection.vendor != "postgresql":
+        return False
+
+    sql, params = qs.query.sql_with_params()
+    copy_to(connection, sql, params, fileobj)
+    return True
+
+
+def write_csv(entity, filters, fileobj):
+    qs, columns = _values(entity, filters)
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="", write_through=True)
+    try:
+        csv.writer(text).writerow([name for name, _ in columns])
+        if not _copy_csv(qs, fileobj):
+            writer = csv.writer(text)
+            for row in qs.iterator(chunk_size=settings.EXPORT_CHUNK_ROWS):
+                writer.writerow(row)
+    finally:
+        text.detach()
+
+
+def _field_for(model, lookup):
+    field = None
+    for part in lookup.split("__"):
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _arrow_type(field):
+    import pyarrow as pa
+
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pa.int64()
+    return pa.string()
+
+
+def write_parquet(entity, filters, fileobj, compression="snappy"):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    qs, columns = _values(entity, filters)
+    names = [name for name, _ in columns]
+    schema = pa.schema([(name, _arrow_type(_field_for(qs.model, lookup))) for name, lookup in columns])
+
+    chunk_rows = settings.EXPORT_CHUNK_ROWS
+    rows = qs.iterator(chunk_size=chunk_rows)
+    with pq.ParquetWriter(fileobj, schema, compression=compression) as writer:
+        while True:
+            chunk = list(itertools.islice(rows, chunk_rows))
+            if not chunk:
+                break
+            frame = pd.DataFrame.from_records(chunk, columns=names)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+
+def write_extract(entity, fmt, filters, fileobj, compress=False):
+    """
+    Write an extract of `entity` in `fmt` to a binary file object.
+
+    `compress` gzips CSV output and switches Parquet to its gzip codec (Parquet
+    files stay readable by every tool that way).
+    """
+    if fmt == "parquet":
+        write_parquet(entity, filters, fileobj, compression="gzip" if compress else "snappy")
+    elif compress:
+        with gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=settings.EXPORT_GZIP_LEVEL) as gz:
+            write_csv(entity, filters, gz)
+    else:
+        write_csv(entity, filters, fileobj)
+
+
+def extract_filename(entity, fmt, compress=False):
+    name = f"{entity}.{FORMATS[fmt][1]}"
+    return f"{name}.gz" if compress and fmt == "csv" else name
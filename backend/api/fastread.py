@@ -0,0 +1,253 @@
+"""
+Fast read path for list endpoints.
+
+Rows are fetched with `queryset.values(...)` and converted by per-field
+mappers derived once from the viewset's serializer, then encoded with orjson
+when it is installed. The output is meant to match the regular DRF
+serializer + JSONRenderer byte for byte; `manage.py compare_fast_read`
+checks that against live data.
+"""
+import json
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+def _identity(value):
+    return value
+
+
+def _date(value):
+    return value.isoformat()
+
+
+def _converter(field):
+    """Return a plain function turning a DB value into the field's output."""
+    if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+        return _identity
+    if isinstance(field, (serializers.RelatedField, serializers.SerializerMethodField, serializers.HiddenField)):
+        raise UnsupportedField(field.field_name)
+    if type(field) is serializers.CharField:
+        return str
+    if type(field) in (serializers.IntegerField, serializers.BooleanField):
+        return _identity
+    if type(field) is serializers.DateField:
+        output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+        if output_format and output_format.lower() == ISO_8601:
+            return _date
+    # Decimal, DateTime, Choice and friends: reuse DRF's own conversion
+    return field.to_representation
+
+
+class _Value:
+    __slots__ = ("name", "path", "guard", "convert")
+
+    def __init__(self, name, path, guard, convert):
+        self.name = name
+        self.path = path
+        self.guard = guard
+        self.convert = convert
+
+
+class _File:
+    __slots__ = ("name", "path", "storage")
+
+    def __init__(self, name, path, storage):
+        self.name = name
+        self.path = path
+        self.storage = storage
+
+
+class _Computed:
+    __slots__ = ("name", "paths", "compute")
+
+    def __init__(self, name, paths, compute):
+        self.name = name
+        self.paths = paths
+        self.compute = compute
+
+
+class _Nested:
+    __slots__ = ("name", "reader", "related_model", "fk_attname")
+
+    def __init__(self, name, reader, related_model, fk_attname):
+        self.name = name
+        self.reader = reader
+        self.related_model = related_model
+        self.fk_attname = fk_attname
+
+
+class FastReader:
+    """Field mappers for one serializer (and field subset), built once."""
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        self.model = model
+        self.entries = []
+        self.paths = {"pk"}
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(field.source)
+                if not relation.one_to_many:
+                    raise UnsupportedField(name)
+                child = FastReader(field.child)
+                self.entries.append(_Nested(name, child, relation.related_model, relation.field.attname))
+                continue
+
+            if isinstance(field, serializers.BaseSerializer):
+                raise UnsupportedField(name)
+
+            # Fields that declare the columns they are computed from
+            if hasattr(field, "value_paths"):
+                self.entries.append(_Computed(name, field.value_paths, field.from_values))
+                self.paths.update(field.value_paths)
+                continue
+
+            attrs = field.source_attrs
+            path = "__".join(attrs)
+
+            if isinstance(field, serializers.FileField):
+                if len(attrs) != 1:
+                    raise UnsupportedField(name)
+                self.entries.append(_File(name, path, model._meta.get_field(attrs[0]).storage))
+                self.paths.add(path)
+                continue
+
+            # A null FK in the middle of a dotted source makes DRF skip the key
+            guard = None
+            if len(attrs) > 1:
+                first = model._meta.get_field(attrs[0])
+                if not first.is_relation or len(attrs) > 2:
+                    raise UnsupportedField(name)
+                if first.null:
+                    guard = attrs[0]
+                    self.paths.add(guard)
+
+            self.entries.append(_Value(name, path, guard, _converter(field)))
+            self.paths.add(path)
+
+    def _fetch_nested(self, entry, parent_ids, request):
+        children = defaultdict(list)
+        if not parent_ids:
+            return children
+        qs = entry.related_model._default_manager.filter(**{f"{entry.fk_attname}__in": parent_ids}).order_by("pk")
+        rows = list(qs.values(entry.fk_attname, *entry.reader.paths))
+        for parent_id, item in zip((r[entry.fk_attname] for r in rows), entry.reader.convert(rows, request)):
+            children[parent_id].append(item)
+        return children
+
+    def convert(self, rows, request):
+        nested = {
+            entry.name: self._fetch_nested(entry, [r["pk"] for r in rows], request)
+            for entry in self.entries if isinstance(entry, _Nested)
+        }
+
+        out = []
+        for row in rows:
+            item = {}
+            for entry in self.entries:
+                if isinstance(entry, _Value):
+                    if entry.guard and row[entry.guard] is None:
+                        continue
+                    value = row[entry.path]
+                    item[entry.name] = None if value is None else entry.convert(value)
+                elif isinstance(entry, _Computed):
+                    item[entry.name] = entry.compute(*(row[path] for path in entry.paths), request)
+                elif isinstance(entry, _File):
+                    value = row[entry.path]
+                    if not value:
+                        item[entry.name] = None
+                    else:
+                        url = entry.storage.url(value)
+                        item[entry.name] = request.build_absolute_uri(url) if request else url
+                else:
+                    item[entry.name] = nested[entry.name].get(row["pk"], [])
+            out.append(item)
+        return out
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.paths)
+
+
+def encode(data):
+    """JSON bytes identical to DRF's compact, unicode JSONRenderer output."""
+    if orjson is not None:
+        ret = orjson.dumps(data)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+    ret = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+# Readers are keyed by the serializer's field list, which `?fields=` lets
+# clients vary freely, so only the most recently used ones are kept.
+READER_CACHE_SIZE = 64
+
+_readers = OrderedDict()
+_readers_lock = threading.Lock()
+
+
+def get_reader(serializer):
+    key = (type(serializer), tuple(serializer.fields))
+    with _readers_lock:
+        if key in _readers:
+            _readers.move_to_end(key)
+            return _readers[key]
+    try:
+        reader = FastReader(serializer)
+    except UnsupportedField:
+        reader = None
+    with _readers_lock:
+        _readers[key] = reader
+        while len(_readers) > READER_CACHE_SIZE:
+            _readers.popitem(last=False)
+    return reader
+
+
+class FastReadMixin:
+    """
+    Serves `list` from `values()` rows instead of model instances and DRF
+    field objects. Off unless API_FAST_READ is set; falls back to the normal
+    path for unsupported serializers, non-JSON renderers, or `?fast=0`.
+    """
+
+    def use_fast_read(self, request):
+        if not settings.API_FAST_READ or request.query_params.get("fast") == "0":
+            return False
+        renderer = getattr(request, "accepted_renderer", None)
+        media_type = getattr(request, "accepted_media_type", "") or ""
+        return renderer is not None and renderer.format == "json" and "indent" not in media_type
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_read(request):
+            return super().list(request, *args, **kwargs)
+
+        reader = get_reader(self.get_serializer())
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = reader.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            data = self.get_paginated_response(reader.convert(page, request)).data
+        else:
+            data = reader.convert(list(queryset), request)
+
+        return HttpResponse(encode(data), content_type="application/json")
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.filters import SearchFilter
+
+from .models import Product, ProductListing
+
+
+# Plain columns copied from Product as-is
+COPIED_FIELDS = [
+    "unique_code", "name", "model_number", "serial_number", "description",
+    "category_id", "vendor_id", "current_department_id", "status_id",
+    "purchase_date", "warranty_years", "warranty_end_date", "price",
+    "is_active", "created_at", "updated_at",
+]
+
+# Related name columns: related model name -> (listing FK column, listing name column)
+RELATED_NAMES = {
+    "category": ("category_id", "category_name"),
+    "vendor": ("vendor_id", "vendor_name"),
+    "department": ("current_department_id", "department_name"),
+    "status": ("status_id", "status_name"),
+}
+
+UPDATE_FIELDS = COPIED_FIELDS + ["category_name", "vendor_name", "department_name", "status_name", "document_count"]
+
+
+def _build(product):
+    listing = ProductListing(product_id=product.pk)
+    for field in COPIED_FIELDS:
+        setattr(listing, field, getattr(product, field))
+    listing.category_name = product.category.name
+    listing.vendor_name = product.vendor.name
+    listing.department_name = product.current_department.name
+    listing.status_name = product.status.name
+    listing.document_count = product.document_count
+    return listing
+
+
+def _source(product_ids=None):
+    qs = Product.objects.select_related(
+        "category", "vendor", "current_department", "status"
+    ).annotate(document_count=Count("documents"))
+    if product_ids is not None:
+        qs = qs.filter(pk__in=product_ids)
+    return qs
+
+
+def _upsert(listings):
+    ProductListing.objects.bulk_create(
+        listings,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=UPDATE_FIELDS,
+    )
+
+
+def refresh_products(product_ids):
+    """Rebuild the listing rows of the given products from the source tables."""
+    product_ids = set(product_ids)
+    listings = [_build(p) for p in _source(product_ids)]
+    with transaction.atomic():
+        if listings:
+            _upsert(listings)
+        missing = product_ids - {listing.product_id for listing in listings}
+        if missing:
+            ProductListing.objects.filter(product_id__in=missing).delete()
+
+
+def rename_related(model_name, pk, name):
+    """
+    Propagate a renamed vendor/department/category/status to its products.
+    Returns the ids of the products whose listing row changed.
+    """
+    fk_column, name_column = RELATED_NAMES[model_name]
+    stale = ProductListing.objects.filter(**{fk_column: pk}).exclude(**{name_column: name})
+    with transaction.atomic():
+        renamed = list(stale.select_for_update().values_list("product_id", flat=True))
+        if renamed:
+            ProductListing.objects.filter(product_id__in=renamed).update(**{name_column: name})
+    return renamed
+
+
+def rebuild(batch_size=2000):
+    """Full rebuild in primary key batches; returns the number of rows written."""
+    written = 0
+    last_pk = 0
+    while True:
+        batch = list(_source().filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        with transaction.atomic():
+            _upsert([_build(p) for p in batch])
+        written += len(batch)
+    ProductListing.objects.exclude(product_id__in=Product.objects.values("pk")).delete()
+    return written
+
+
+def filter_listing(filters):
+    """Apply the product export filter payload (search/status/category/department/ordering)."""
+    qs = ProductListing.objects.filter(is_active=True)
+
+    search = filters.get("search")
+    status = filters.get("status")
+    category = filters.get("category")
+    department = filters.get("department")
+    ordering = filters.get("ordering") or "-created_at"
+
+    if search:
+        qs = qs.filter(Q(unique_code__icontains=search) | Q(name__icontains=search))
+    if status:
+        qs = qs.filter(status_id=status)
+    if category:
+        qs = qs.filter(category_id=category)
+    if department:
+        qs = qs.filter(current_department_id=department)
+
+    return qs.order_by(ordering)
+
+
+class ProductSearchFilter(SearchFilter):
+    """Searches the flat listing columns when a view serves the read model."""
+
+    def get_search_fields(self, view, request):
+        if getattr(view, "uses_listing", lambda: False)():
+            return view.listing_search_fields
+        return super().get_search_fields(view, request)
@@ -0,0 +1,69 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api.extracts import copy_to
+from api.partitions import HISTORY, add_months, detach_partition, is_partitioned, month_start, partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Detach the monthly TransferLog/RepairMovement partitions older than the retention period. "
+        "Detached months become standalone tables; --export writes them to gzipped CSV and --drop removes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months", type=int, default=settings.HISTORY_RETENTION_MONTHS,
+            help="Full months to keep attached before the current one (default: HISTORY_RETENTION_MONTHS).",
+        )
+        parser.add_argument("--export", metavar="DIR", help="Write each detached month to DIR/<partition>.csv.gz.")
+        parser.add_argument("--drop", action="store_true", help="Drop each month once detached (and exported).")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived.")
+
+    def handle(self, *args, **options):
+        if options["keep_months"] < 1:
+            raise CommandError("--keep-months must be at least 1.")
+        export_dir = Path(options["export"]) if options["export"] else None
+        if export_dir:
+            export_dir.mkdir(parents=True, exist_ok=True)
+
+        cutoff = add_months(month_start(timezone.now()), -options["keep_months"])
+        archived = 0
+        for model, _ in HISTORY.items():
+            table = model._meta.db_table
+            connection = connections[model.objects.db]
+            if not is_partitioned(connection, table):
+                self.stdout.write(f"{table}: not partitioned, skipping")
+                continue
+
+            for month, name in partitions(connection, table):
+                if month >= cutoff:
+                    break
+                archived += 1
+                if options["dry_run"]:
+                    self.stdout.write(f"{table}: would archive {name}")
+                    continue
+
+                detach_partition(connection, table, name)
+                line = f"{table}: detached {name}"
+                if export_dir:
+                    path = export_dir / f"{name}.csv.gz"
+                    with gzip.open(path, "wb", compresslevel=settings.EXPORT_GZIP_LEVEL) as fileobj:
+                        copy_to(connection, f"SELECT * FROM {connection.ops.quote_name(name)}", [], fileobj,
+                                options="FORMAT csv, HEADER")
+                    line += f", exported to {path}"
+                if options["drop"]:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+                    line += ", dropped"
+                self.stdout.write(line)
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {archived} partition{'' if archived == 1 else 's'} older than {cutoff:%Y-%m}."
+        ))
@@ -0,0 +1,86 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import listing
+from api.models import Product
+from api.signals import record_upserts
+
+
+def compute_end_dates(purchase_dates, warranty_years):
+    """
+    Vectorised equivalent of `purchase_date + relativedelta(years=n)`:
+    shift the year and clamp Feb 29 to Feb 28 on non-leap target years.
+    End dates past year 9999 (absurd warranty_years) are clamped to
+    date.max, where relativedelta would raise.
+    """
+    import numpy as np
+
+    purchased = np.array(purchase_dates, dtype="datetime64[D]")
+    month_index = purchased.astype("datetime64[M]").astype(np.int64)
+    years = month_index // 12 + 1970 + np.asarray(warranty_years, dtype=np.int64)
+    months = month_index % 12 + 1
+    days = (purchased - purchased.astype("datetime64[M]")).astype(np.int64) + 1
+
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    days = np.where((months == 2) & (days == 29) & ~leap, 28, days)
+
+    too_late = years > date.max.year
+    years = np.where(too_late, date.max.year, years)
+    end_months = ((years - 1970) * 12 + months - 1).astype("datetime64[M]")
+    end_dates = end_months.astype("datetime64[D]") + (days - 1).astype("timedelta64[D]")
+    end_dates[too_late] = np.datetime64(date.max)
+    return end_dates.tolist()
+
+
+class Command(BaseCommand):
+    help = "Recompute Product.warranty_end_date for existing rows in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        scanned = updated = 0
+
+        while True:
+            batch = list(
+                Product.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "purchase_date", "warranty_years", "warranty_end_date")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            with_warranty = [p for p in batch if p.purchase_date and p.warranty_years is not None]
+            expected = dict(zip(
+                (p.pk for p in with_warranty),
+                compute_end_dates(
+                    [p.purchase_date for p in with_warranty],
+                    [p.warranty_years for p in with_warranty],
+                ) if with_warranty else [],
+            ))
+
+            changed = []
+            for product in batch:
+                end_date = expected.get(product.pk)
+                if product.warranty_end_date != end_date:
+                    product.warranty_end_date = end_date
+                    changed.append(product)
+
+            if changed and not options["dry_run"]:
+                changed_ids = [p.pk for p in changed]
+                with transaction.atomic():
+                    Product.objects.bulk_update(changed, ["warranty_end_date"])
+                # bulk_update sends no signals: refresh the listing and publish the rows by hand
+                listing.refresh_products(changed_ids)
+                record_upserts("product", changed_ids)
+            updated += len(changed)
+
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {updated} of {scanned} product(s)."))
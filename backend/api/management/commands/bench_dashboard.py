@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from api import dashboard
+
+
+def _timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the dashboard aggregates one by one, then the whole dashboard run sequentially "
+        "(the sync view) and through the async path on the thread pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--workers", type=int, help="Pool size (default: DASHBOARD_WORKERS).")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        overrides = {"DASHBOARD_WORKERS": options["workers"]} if options["workers"] else {}
+        with override_settings(**overrides):
+            # Warm up caches and the pool's connections
+            dashboard.build()
+            async_to_sync(dashboard.abuild)()
+
+            per_task = {name: _timed(func, repeat) for name, func in dashboard.TASKS.items()}
+            for name, ms in sorted(per_task.items(), key=lambda item: item[1], reverse=True):
+                self.stdout.write(f"  {ms:8.2f} ms  {name}")
+
+            from django.conf import settings
+            rows = [
+                ("sum of queries", sum(per_task.values())),
+                ("slowest query", max(per_task.values())),
+                ("sequential", _timed(dashboard.build, repeat)),
+                (f"async ({settings.DASHBOARD_WORKERS} workers)", _timed(async_to_sync(dashboard.abuild), repeat)),
+            ]
+        for label, ms in rows:
+            self.stdout.write(f"{label:<20} {ms:8.2f} ms")
@@ -0,0 +1,89 @@
+import io
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+from reportlab.lib import colors
+
+from api.exports import (
+    BODY_STYLE, BOTTOM_MARGIN, CELL_STYLE, LEFT_MARGIN, PAGE_SIZE, PRODUCT_COLUMNS, RIGHT_MARGIN,
+    TOP_MARGIN, product_pdf_row, write_table_pdf,
+)
+
+
+def build_rows(n):
+    """Synthetic listing rows; every seventh name is long enough to wrap."""
+    start = date(2024, 1, 1)
+    for i in range(n):
+        name = f"Product {i}" + (" with a deliberately long descriptive name" if i % 7 == 0 else "")
+        purchase = start + timedelta(days=i % 365)
+        yield (
+            f"PRD-{i:06d}", name, "Category", "Department", "Vendor & Sons",
+            Decimal("1234.50"), purchase, 2, purchase + timedelta(days=730), "In Stock",
+        )
+
+
+def legacy_pdf(rows, fileobj):
+    """The previous single-table layout, for comparison."""
+    data = [[name for name, _ in PRODUCT_COLUMNS]]
+    for i, row in enumerate(rows, start=1):
+        cells = product_pdf_row(i, row)
+        data.append([Paragraph(c, CELL_STYLE) if idx in (2, 3, 4, 5, 10) and isinstance(c, str) else c
+                     for idx, c in enumerate(cells)])
+    table = Table(data, colWidths=[w for _, w in PRODUCT_COLUMNS], repeatRows=1)
+    style = TableStyle(BODY_STYLE.getCommands())
+    for i in range(1, len(data)):
+        if i % 2 == 0:
+            style.add("BACKGROUND", (0, i), (-1, i), colors.HexColor("#fafafa"))
+    table.setStyle(style)
+    SimpleDocTemplate(
+        fileobj, pagesize=PAGE_SIZE, leftMargin=LEFT_MARGIN, rightMargin=RIGHT_MARGIN,
+        topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN,
+    ).build([table])
+
+
+def chunked_pdf(rows, fileobj):
+    write_table_pdf(
+        fileobj, "Products Report", PRODUCT_COLUMNS,
+        (product_pdf_row(sl, row) for sl, row in enumerate(rows, start=1)),
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark the chunked products PDF renderer (optionally against the old single-table layout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+        parser.add_argument(
+            "--legacy-max", type=int, default=10000,
+            help="Also time the single-table layout up to this many rows (it grows quadratically).",
+        )
+        parser.add_argument("--memory", action="store_true", help="Report peak Python memory (slower).")
+
+    def _run(self, renderer, n, memory):
+        buffer = io.BytesIO()
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        renderer(build_rows(n), buffer)
+        elapsed = time.perf_counter() - start
+        peak = None
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return elapsed, len(buffer.getvalue()), peak
+
+    def handle(self, *args, **options):
+        for n in options["rows"]:
+            cases = [("chunked", chunked_pdf)]
+            if n <= options["legacy_max"]:
+                cases.append(("single table", legacy_pdf))
+            for label, renderer in cases:
+                elapsed, size, peak = self._run(renderer, n, options["memory"])
+                line = f"{n:>7} rows  {label:<13} {elapsed:8.2f} s  {size / 1024:9.0f} KiB"
+                if peak is not None:
+                    line += f"  peak {peak / 1024 / 1024:7.1f} MiB"
+                self.stdout.write(line)
@@ -0,0 +1,80 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Category, Department, Product, ProductDocument, ProductListing, Status, Vendor
+from api.serializers import PRODUCT_COMPACT_FIELDS, ProductListingSerializer, ProductSerializer
+
+
+def build_products(n):
+    """Unsaved products with related rows attached, so timing excludes the database."""
+    vendor = Vendor(pk=1, name="Vendor")
+    department = Department(pk=1, name="Department")
+    category = Category(pk=1, name="Category")
+    status = Status(pk=1, name="In Stock")
+    now = timezone.now()
+
+    products = []
+    for i in range(n):
+        p = Product(
+            pk=i + 1, unique_code=f"PRD-{i:06d}", name=f"Product {i}", model_number="M-1",
+            serial_number=f"SN{i}", description="", purchase_date=date(2024, 1, 1) + timedelta(days=i % 365),
+            warranty_years=2, warranty_end_date=date(2026, 1, 1), price=Decimal("1234.50"),
+            vendor=vendor, current_department=department, category=category, status=status,
+            created_at=now, updated_at=now,
+        )
+        p._prefetched_objects_cache = {"documents": ProductDocument.objects.none()}
+        products.append(p)
+    return products
+
+
+def build_listings(products):
+    return [
+        ProductListing(
+            product_id=p.pk, unique_code=p.unique_code, name=p.name, model_number=p.model_number,
+            serial_number=p.serial_number, description=p.description, category_id=1, category_name="Category",
+            vendor_id=1, vendor_name="Vendor", current_department_id=1, department_name="Department",
+            status_id=1, status_name="In Stock", purchase_date=p.purchase_date, warranty_years=p.warranty_years,
+            warranty_end_date=p.warranty_end_date, price=p.price, created_at=p.created_at, updated_at=p.updated_at,
+        )
+        for p in products
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark product serialization time per 1,000 rows for full and sparse field sets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def _time(self, serializer_class, rows, repeat, **kwargs):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serializer_class(rows, many=True, **kwargs).data
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000 * 1000 / len(rows)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        products = build_products(rows)
+        listings = build_listings(products)
+
+        cases = [
+            ("full (20 fields + documents)", ProductSerializer, products, {}),
+            ("compact", ProductSerializer, products, {"fields": PRODUCT_COMPACT_FIELDS}),
+            ("sparse id,unique_code,name,status_name", ProductSerializer, products,
+             {"fields": ["id", "unique_code", "name", "status_name"]}),
+            ("flat listing (all fields)", ProductListingSerializer, listings, {}),
+            ("flat listing compact", ProductListingSerializer, listings, {"fields": PRODUCT_COMPACT_FIELDS}),
+        ]
+
+        self.stdout.write(f"{rows} rows, best of {repeat}")
+        for label, serializer_class, data, kwargs in cases:
+            ms = self._time(serializer_class, data, repeat, **kwargs)
+            self.stdout.write(f"  {label:<42} {ms:8.1f} ms / 1k rows")
@@ -0,0 +1,118 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import benchmarks
+
+# What a fresh web worker does before serving its first request: load the WSGI
+# app and the URLconf, which imports every view module.
+WSGI_STARTUP = (
+    "from django.core.wsgi import get_wsgi_application\n"
+    "application = get_wsgi_application()\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+SCENARIOS = {
+    "check": ["manage.py", "check"],
+    "wsgi": ["-c", WSGI_STARTUP],
+}
+
+# Libraries only export, report and chatbot requests need
+HEAVY_MODULES = ["pandas", "numpy", "reportlab", "openpyxl", "pyarrow", "groq", "PIL", "pypdfium2"]
+
+IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """{top-level module: cumulative microseconds} and the set of every imported module."""
+    top_level, modules = {}, set()
+    for line in stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        if len(indent) == 1:
+            top_level[name] = top_level.get(name, 0) + int(cumulative)
+    return top_level, modules
+
+
+def run_once(args):
+    """(wall seconds, max RSS in MiB, -X importtime output) of one cold interpreter."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    proc.stderr.close()
+    if proc.returncode:
+        raise CommandError(f"{' '.join(args)} exited with {proc.returncode}:\n{stderr[-2000:]}")
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, rss, stderr
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start time, import time and peak RSS of `manage.py check` and of a WSGI "
+        "worker loading the app, and list heavy libraries imported at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to show.")
+        parser.add_argument("--baseline", default=str(benchmarks.BASELINE_DIR / "startup.json"))
+        parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.2)
+        parser.add_argument("--fail", action="store_true", help="Exit with an error on regressions or heavy imports.")
+
+    def handle(self, *args, **options):
+        results = {}
+        problems = []
+        for name, scenario in SCENARIOS.items():
+            runs = [run_once(scenario) for _ in range(options["runs"])]
+            top_level, modules = parse_importtime(runs[-1][2])
+            heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+            results[name] = {
+                "wall_ms": round(statistics.median(r[0] for r in runs) * 1000, 1),
+                "import_ms": round(sum(top_level.values()) / 1000, 1),
+                "rss_mib": round(statistics.median(r[1] for r in runs), 1),
+                "heavy_imports": heavy,
+            }
+
+            result = results[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{name}: {result['wall_ms']} ms wall, {result['import_ms']} ms importing, {result['rss_mib']} MiB RSS"
+            ))
+            slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:options["top"]]
+            for module, micros in slowest:
+                self.stdout.write(f"  {micros / 1000:8.1f} ms  {module}")
+            if heavy and name == "wsgi":
+                problems.append(f"wsgi: imports {', '.join(heavy)} at startup")
+                self.stdout.write(self.style.WARNING(f"  heavy imports at startup: {', '.join(heavy)}"))
+
+        if options["save"]:
+            benchmarks.save(options["baseline"], results, runs=options["runs"])
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['baseline']}."))
+            return
+
+        baseline = benchmarks.load(options["baseline"])
+        if baseline:
+            problems += benchmarks.compare(results, baseline["results"], "wall_ms", options["tolerance"], 20)
+            problems += benchmarks.compare(results, baseline["results"], "rss_mib", options["tolerance"], 5)
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(f"REGRESSION {problem}"))
+        if problems and options["fail"]:
+            raise CommandError(f"{len(problems)} startup regression(s).")
+        self.stdout.write(self.style.SUCCESS(f"Done; {len(problems)} regression(s)."))
@@ -0,0 +1,68 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+
+def changelist_queries(model_admin, per_page, user):
+    """(rows shown, queries run) for the first changelist page at `per_page` rows."""
+    request = RequestFactory().get(f"/admin/{model_admin.opts.app_label}/{model_admin.opts.model_name}/")
+    request.user = user
+    original = model_admin.list_per_page
+    model_admin.list_per_page = per_page
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = model_admin.changelist_view(request)
+            response.render()
+    finally:
+        model_admin.list_per_page = original
+    return len(response.context_data["cl"].result_list), len(queries)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every registered admin changelist at two page sizes and flag the ones whose "
+        "query count grows with the number of rows (a missing list_select_related)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--small", type=int, default=5, help="Rows on the first render.")
+        parser.add_argument("--large", type=int, default=50, help="Rows on the second render.")
+        parser.add_argument("--max-queries", type=int, default=0, help="Also flag changelists above this many queries.")
+        parser.add_argument("--verbose-queries", action="store_true", help="Print the SQL of flagged changelists.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when a changelist is flagged.")
+
+    def handle(self, *args, **options):
+        # Never saved: superusers pass every permission check without a query
+        user = get_user_model()(is_active=True, is_staff=True, is_superuser=True)
+
+        flagged = 0
+        for model, model_admin in sorted(admin.site._registry.items(), key=lambda item: item[0]._meta.label):
+            label = model._meta.label
+            small_rows, small = changelist_queries(model_admin, options["small"], user)
+            large_rows, large = changelist_queries(model_admin, options["large"], user)
+
+            notes = []
+            if large_rows > small_rows and large > small:
+                notes.append(f"+{large - small} queries for {large_rows - small_rows} more rows")
+            if options["max_queries"] and large > options["max_queries"]:
+                notes.append(f"over {options['max_queries']} queries")
+
+            line = f"{label:<34} {small_rows:>3} rows {small:>3} queries  {large_rows:>3} rows {large:>3} queries"
+            if not notes:
+                self.stdout.write(f"OK   {line}")
+                continue
+
+            flagged += 1
+            self.stdout.write(self.style.WARNING(f"N+1  {line}: {'; '.join(notes)}"))
+            if options["verbose_queries"]:
+                with CaptureQueriesContext(connection) as queries:
+                    changelist_queries(model_admin, options["large"], user)
+                for query in queries:
+                    self.stdout.write(f"       {query['sql']}")
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{flagged} changelist{'' if flagged == 1 else 's'} flagged.")
+        self.stdout.write(self.style.SUCCESS(f"Checked; {flagged} flagged."))
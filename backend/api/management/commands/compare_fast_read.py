@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+DEFAULT_URLS = [
+    "/api/products/",
+    "/api/products/?page=2",
+    "/api/products/?search=a",
+    "/api/products/?ordering=price",
+    "/api/products/?compact=1",
+    "/api/products/?fields=id,unique_code,name,status_name,documents",
+    "/api/products/?flat=1",
+    "/api/products/?flat=1&compact=1",
+    "/api/transfers/",
+    "/api/transfers/?page=2",
+    "/api/transfers/?search=a",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the fast read path against the regular DRF serializers byte for byte "
+        "and report the speedup per URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", help="URLs to compare (defaults to the product and transfer lists).")
+        parser.add_argument("--user", help="Phone number of the user to authenticate as (defaults to the first superuser).")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def _get(self, client, url, fast, repeat):
+        # Toggle the setting rather than adding ?fast=, which would leak into pagination links
+        best, content = None, None
+        with override_settings(API_FAST_READ=fast):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = client.get(url, HTTP_ACCEPT="application/json")
+                elapsed = time.perf_counter() - start
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}")
+                content = response.content
+                best = elapsed if best is None else min(best, elapsed)
+        return content, best
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(phone=options["user"]) if options["user"] else User.objects.filter(is_superuser=True)
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as; pass --user or create a superuser.")
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        failures = 0
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            for url in options["urls"] or DEFAULT_URLS:
+                slow, slow_time = self._get(client, url, False, options["repeat"])
+                fast, fast_time = self._get(client, url, True, options["repeat"])
+                same = slow == fast
+                failures += not same
+                self.stdout.write(
+                    f"{'OK  ' if same else 'DIFF'} {url:<60} drf {slow_time * 1000:7.1f} ms  "
+                    f"fast {fast_time * 1000:7.1f} ms  x{slow_time / fast_time:4.1f}"
+                )
+                if not same:
+                    for i, (a, b) in enumerate(zip(slow, fast)):
+                        if a != b:
+                            self.stdout.write(f"     first difference at byte {i}:")
+                            self.stdout.write(f"     drf : {slow[max(i - 60, 0):i + 60]!r}")
+                            self.stdout.write(f"     fast: {fast[max(i - 60, 0):i + 60]!r}")
+                            break
+                    else:
+                        self.stdout.write(f"     lengths differ: {len(slow)} vs {len(fast)}")
+
+        if failures:
+            raise CommandError(f"{failures} URL(s) differ between the fast and regular paths.")
+        self.stdout.write(self.style.SUCCESS("Fast read output matches the serializers."))
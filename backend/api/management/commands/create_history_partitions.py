@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.partitions import HISTORY, ensure_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly TransferLog/RepairMovement partitions for the coming months and move "
+        "rows caught by the default partition into their month. Run it daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=settings.HISTORY_PARTITIONS_AHEAD,
+            help="Months after the current one to create (default: HISTORY_PARTITIONS_AHEAD).",
+        )
+
+    def handle(self, *args, **options):
+        for model, column in HISTORY.items():
+            table = model._meta.db_table
+            connection = connections[model.objects.db]
+            if not is_partitioned(connection, table):
+                self.stdout.write(f"{table}: not partitioned, skipping")
+                continue
+
+            created = ensure_partitions(connection, table, column, options["ahead"])
+            for name, moved in created:
+                self.stdout.write(f"{table}: created {name}" + (f", moved {moved} rows from the default" if moved else ""))
+            if not created:
+                self.stdout.write(f"{table}: up to date")
+        self.stdout.write(self.style.SUCCESS("Done."))
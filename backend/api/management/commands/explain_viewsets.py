@@ -0,0 +1,107 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from rest_framework.viewsets import GenericViewSet
+
+from api import views
+from api.listing import filter_listing
+from api.models import RepairMovement
+
+
+SEQ_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # SQLite prints "SCAN table" for a full scan and "SCAN table USING INDEX ..." otherwise
+    "sqlite": re.compile(r"\bSCAN (\w+)(?! USING)(?:\s|$)"),
+}
+SORT = {
+    "postgresql": re.compile(r"^\s*(?:->\s*)?(?:Incremental )?Sort\b", re.M),
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+}
+
+
+def _sample(queryset, field):
+    """An existing value for `field`, so the filter is realistic; falls back to 1."""
+    value = queryset.order_by().values_list(field, flat=True).exclude(**{f"{field}__isnull": True}).first()
+    return 1 if value is None else value
+
+
+def viewset_cases():
+    """(label, queryset) for each viewset's default list query and its filterset fields."""
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10
+    for name, viewset in sorted(vars(views).items()):
+        if not (isinstance(viewset, type) and issubclass(viewset, GenericViewSet)):
+            continue
+        queryset = getattr(viewset, "queryset", None)
+        if queryset is None:
+            continue
+        queryset = queryset.all()
+        yield name, queryset[:page_size]
+        for field in getattr(viewset, "filterset_fields", None) or []:
+            yield f"{name} ?{field}=", queryset.filter(**{field: _sample(queryset, field)})[:page_size]
+
+    # Access paths that are not a viewset's class-level queryset
+    listing = filter_listing({})
+    yield "ProductListing (?flat=1)", listing[:page_size]
+    for field in ("status", "category", "department"):
+        column = "current_department_id" if field == "department" else f"{field}_id"
+        yield f"ProductListing ?{field}=", filter_listing({field: _sample(listing, column)})[:page_size]
+    yield "RepairLog.movements", RepairMovement.objects.filter(repair_id=_sample(RepairMovement.objects, "repair_id"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on every api viewset's default list query (plus its filterset "
+        "fields) and flag sequential scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (PostgreSQL only; runs the queries).")
+        parser.add_argument(
+            "--no-seqscan", action="store_true",
+            help="SET enable_seqscan = off (PostgreSQL only), to see whether an index can serve "
+                 "the query on a database too small for the planner to prefer it.",
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only flagged ones.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when a sequential scan is found.")
+
+    def _explain(self, queryset, options):
+        connection = connections[queryset.db]
+        explain_options = {}
+        if connection.vendor == "postgresql" and options["analyze"]:
+            explain_options = {"analyze": True, "buffers": True}
+
+        with transaction.atomic(using=queryset.db):
+            if connection.vendor == "postgresql" and options["no_seqscan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return connection.vendor, queryset.explain(**explain_options)
+
+    def handle(self, *args, **options):
+        flagged = 0
+        for label, queryset in viewset_cases():
+            vendor, plan = self._explain(queryset, options)
+            seq_pattern, sort_pattern = SEQ_SCAN.get(vendor), SORT.get(vendor)
+            tables = sorted(set(seq_pattern.findall(plan))) if seq_pattern else []
+            sorts = bool(sort_pattern and sort_pattern.search(plan))
+
+            notes = []
+            if tables:
+                notes.append(f"seq scan on {', '.join(tables)}")
+            if sorts:
+                notes.append("explicit sort")
+
+            if tables:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f"SEQ  {label}: {'; '.join(notes)}"))
+            else:
+                self.stdout.write(f"OK   {label}" + (f": {'; '.join(notes)}" if notes else ""))
+
+            if tables or options["verbose_plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"       {line}")
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{flagged} quer{'y' if flagged == 1 else 'ies'} use a sequential scan.")
+        self.stdout.write(self.style.SUCCESS(f"Checked; {flagged} with sequential scans."))
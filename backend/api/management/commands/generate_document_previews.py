@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.models import ProductDocument
+from api.previews import generate_preview
+
+
+class Command(BaseCommand):
+    help = "Render preview thumbnails for product documents that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render previews for every document.")
+
+    def handle(self, *args, **options):
+        qs = ProductDocument.objects.order_by("pk")
+        if not options["all"]:
+            qs = qs.filter(preview="")
+
+        rendered = 0
+        for document in qs.iterator(chunk_size=200):
+            try:
+                if generate_preview(document):
+                    rendered += 1
+            except Exception as e:
+                self.stderr.write(f"Document {document.pk}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} preview(s)."))
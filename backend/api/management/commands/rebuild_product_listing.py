@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api import listing
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalised ProductListing table from the product tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = listing.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} listing row(s)."))
@@ -0,0 +1,199 @@
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import benchmarks
+from api.models import Product, RepairLog, TransferLog
+from chatbot import agent
+
+# name -> (method, path, JSON body); {status}/{category}/{department} are filled with the busiest ids
+CASES = {
+    "products.list": ("get", "/api/products/", None),
+    "products.list.deep_page": ("get", "/api/products/?page=200", None),
+    "products.list.flat": ("get", "/api/products/?flat=1", None),
+    "products.search": ("get", "/api/products/?search=Laptop", None),
+    "products.filter.status": ("get", "/api/products/?status={status}", None),
+    "products.filter.department": ("get", "/api/products/?current_department={department}", None),
+    "dashboard": ("get", "/api/dashboard/", None),
+    "tco.departments": ("get", "/api/tco/departments/", None),
+    "transfers.list": ("get", "/api/transfers/", None),
+    "export.products.excel": ("post", "/api/export/products/excel/", {"department": "{department}"}),
+    "export.products.pdf": ("post", "/api/export/products/pdf/", {"department": "{department}"}),
+    "export.products.csv": ("post", "/api/export/products/csv/", {}),
+    "export.transfers.parquet": ("post", "/api/export/transfers/parquet/", {}),
+    "chatbot": ("post", "/api/chatbot/", {"message": "How many products does each department have?"}),
+}
+
+
+class StubLLM:
+    """Stands in for the Groq client so the chatbot case measures only our side (schema, SQL, history)."""
+
+    SQL = (
+        "SELECT department_name, COUNT(*) AS products FROM api_productlisting "
+        "WHERE is_active = true GROUP BY department_name ORDER BY products DESC"
+    )
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        content = self.SQL if "write a single SELECT query" in messages[0]["content"] else "Stub answer."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def _most_common(field):
+    """The id with the most active products, so filtered cases return full pages."""
+    row = (
+        Product.objects.filter(is_active=True).values(field)
+        .annotate(n=Count("pk")).order_by("-n").values_list(field, flat=True).first()
+    )
+    return 0 if row is None else row
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency and query count per API endpoint through the full middleware stack, "
+        "and compare with (or save) a JSON baseline. Seed data first with seed_benchmark_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("cases", nargs="*", help="Case names or prefixes to run (default: all).")
+        parser.add_argument("--repeat", type=int, default=5, help="Measured requests per case.")
+        parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests per case first.")
+        parser.add_argument("--user", help="Login (the user model's USERNAME_FIELD, e.g. phone) to authenticate as; default: the first active superuser.")
+        parser.add_argument("--baseline", default=str(benchmarks.BASELINE_DIR / "endpoints.json"))
+        parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (fraction).")
+        parser.add_argument("--min-delta-ms", type=float, default=5, help="Ignore slowdowns smaller than this.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error on regressions.")
+
+    def _user(self, username):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        if username:
+            user = users.filter(**{User.USERNAME_FIELD: username}).first()
+        else:
+            user = users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("No user to authenticate as; create a superuser or pass --user.")
+        return user
+
+    def _client(self, user):
+        host = next((h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")), "localhost")
+        return Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}", HTTP_HOST=host)
+
+    def _request(self, client, method, path, body):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            start = time.perf_counter()
+            if method == "get":
+                response = client.get(path)
+            else:
+                response = client.post(path, body, content_type="application/json")
+            size = len(b"".join(response.streaming_content) if response.streaming else response.content)
+            elapsed = time.perf_counter() - start
+        response.close()
+        return response.status_code, elapsed, counter.count, size
+
+    def _run_case(self, client, session_id, method, path, body, options):
+        for _ in range(options["warmup"]):
+            self._request(client, method, path, body)
+        timings, queries, size = [], 0, 0
+        for _ in range(options["repeat"]):
+            # Keep the chatbot prompt the same size on every run
+            agent.clear_history(session_id)
+            code, elapsed, queries, size = self._request(client, method, path, body)
+            if not 200 <= code < 300:
+                return {"error": f"HTTP {code}"}
+            timings.append(elapsed)
+        return {**benchmarks.summarize(timings), "queries": queries, "bytes": size}
+
+    def handle(self, *args, **options):
+        user = self._user(options["user"])
+        client = self._client(user)
+        session_id = f"user_{user.pk}"
+        ids = {
+            "status": _most_common("status"),
+            "category": _most_common("category"),
+            "department": _most_common("current_department"),
+        }
+        dataset = {
+            "products": Product.objects.count(),
+            "transfers": TransferLog.objects.count(),
+            "repairs": RepairLog.objects.count(),
+        }
+        selected = [
+            name for name in CASES
+            if not options["cases"] or any(name.startswith(prefix) for prefix in options["cases"])
+        ]
+        if not selected:
+            raise CommandError("No benchmark case matches.")
+
+        baseline = None if options["save"] else benchmarks.load(options["baseline"])
+        if baseline and baseline["environment"].get("dataset") != dataset:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded on {baseline['environment'].get('dataset')}, this database has {dataset}."
+            ))
+
+        self.stdout.write(f"{'case':<28} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'KiB':>9}")
+        results = {}
+        with mock.patch.object(agent, "get_client", StubLLM):
+            for name in selected:
+                method, path, body = CASES[name]
+                result = results[name] = self._run_case(
+                    client, session_id, method, _fill(path, ids), _fill(body, ids), options,
+                )
+                if "error" in result:
+                    self.stdout.write(self.style.ERROR(f"{name:<28} {result['error']}"))
+                    continue
+                line = f"{name:<28} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} {result['queries']:8d} {result['bytes'] / 1024:9.1f}"
+                before = baseline and baseline["results"].get(name)
+                if before and "p50_ms" in before:
+                    line += f"   (baseline {before['p50_ms']:.1f} ms, {before['queries']} queries)"
+                self.stdout.write(line)
+
+        if options["save"]:
+            benchmarks.save(options["baseline"], results, dataset=dataset)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['baseline']}."))
+            return
+        if baseline is None:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save to record one.")
+            return
+
+        regressions = benchmarks.compare(
+            results, baseline["results"], "p50_ms", options["tolerance"], options["min_delta_ms"],
+            exact_keys=("queries",),
+        )
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(f"REGRESSION {regression}"))
+        if regressions and options["fail"]:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}.")
+        self.stdout.write(self.style.SUCCESS(f"Compared with {options['baseline']}: {len(regressions)} regression(s)."))
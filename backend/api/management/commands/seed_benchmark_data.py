@@ -0,0 +1,230 @@
+import itertools
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from api import listing
+from api.models import Category, Department, Product, RepairLog, RepairMovement, RepairStatus, Status, TransferLog, Vendor
+from api.signals import TRACKED_MODELS, record_upserts
+
+from .backfill_warranty_end_dates import compute_end_dates
+
+BRANDS = ["Dell", "HP", "Lenovo", "Asus", "Acer", "Apple", "Samsung", "Cisco", "Epson", "Canon", "Brother", "APC"]
+CATEGORY_NAMES = [
+    "Laptop", "Desktop", "Monitor", "Printer", "Scanner", "Router", "Switch", "Access Point",
+    "Projector", "Tablet", "Phone", "Server", "UPS", "Keyboard", "Webcam", "Docking Station",
+]
+DEPARTMENT_NAMES = [
+    "Accounts", "Admin", "Engineering", "Finance", "HR", "IT", "Legal", "Marketing",
+    "Operations", "Procurement", "Sales", "Support", "Training", "Warehouse",
+]
+FAULTS = [
+    "Does not power on", "Screen flickering", "Battery not charging", "Paper jam",
+    "Overheating", "Keyboard keys not working", "Network port dead", "Fan noise",
+]
+STATUS_NAMES = ["In Stock", "In Use", "Under Repair", "Retired"]
+# repair status -> (product status, is_final)
+REPAIR_STATUSES = {
+    "Sent for Repair": ("Under Repair", False),
+    "In Repair": ("Under Repair", False),
+    "Repaired": ("In Use", True),
+    "Unrepairable": ("Retired", True),
+}
+
+CODE = "{prefix}-B{n:04d}"  # seeded reference rows, e.g. VND-B0001
+PRODUCT_CODE = "PRD-{n:08d}"  # seeded products, e.g. PRD-00000001 (app codes are shorter)
+
+
+def _numbered(names, n):
+    """`n` distinct names, cycling through `names` and numbering the repeats."""
+    rounds = itertools.count(1)
+    out = []
+    while len(out) < n:
+        suffix = next(rounds)
+        out.extend(name if suffix == 1 else f"{name} {suffix}" for name in names)
+    return out[:n]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed realistic volumes of reference data, products, transfers and repairs with "
+        "bulk_create for benchmarking. Intended for a scratch database (use `manage.py flush` "
+        "to start over); running it again adds more products."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendors", type=int, default=50)
+        parser.add_argument("--departments", type=int, default=30)
+        parser.add_argument("--categories", type=int, default=40)
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument("--transfers", type=int, default=100000)
+        parser.add_argument("--repairs", type=int, default=20000)
+        parser.add_argument("--max-movements", type=int, default=3, help="Movements per repair (1 to this many).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable data sets.")
+
+    def _reference(self, model, prefix, names, build):
+        """Top up the seeded rows of `model` to len(names); returns all seeded rows."""
+        existing = list(model.objects.filter(unique_code__startswith=f"{prefix}-B").order_by("unique_code"))
+        missing = [
+            build(unique_code=CODE.format(prefix=prefix, n=i + 1), name=name)
+            for i, name in enumerate(names) if i >= len(existing)
+        ]
+        model.objects.bulk_create(missing)
+        return list(model.objects.filter(unique_code__startswith=f"{prefix}-B").order_by("unique_code"))[:len(names)]
+
+    def _statuses(self):
+        statuses = {name: Status.objects.get_or_create(name=name)[0] for name in STATUS_NAMES}
+        repair_statuses = {}
+        for name, (product_status, is_final) in REPAIR_STATUSES.items():
+            repair_statuses[name] = RepairStatus.objects.get_or_create(
+                name=name, defaults={"product_status": statuses[product_status], "is_final": is_final},
+            )[0]
+        return statuses, repair_statuses
+
+    def _batches(self, total, batch_size):
+        for start in range(0, total, batch_size):
+            yield range(start, min(start + batch_size, total))
+
+    def _products(self, rng, total, start, batch_size, vendors, departments, categories, statuses):
+        status_list = list(statuses.values())
+        status_weights = [30, 60, 5, 5]
+        today = date.today()
+        for batch in self._batches(total, batch_size):
+            products = []
+            for i in batch:
+                category = rng.choice(categories)
+                brand = rng.choice(BRANDS)
+                model_number = f"{brand[:2].upper()}-{rng.randint(100, 9999)}"
+                purchase_date = today - timedelta(days=rng.randint(0, 6 * 365)) if rng.random() < 0.9 else None
+                products.append(Product(
+                    unique_code=PRODUCT_CODE.format(n=start + i + 1),
+                    name=f"{brand} {category.name.removeprefix('Bench ').rstrip('0123456789 ')} {model_number}",
+                    category=category,
+                    vendor=rng.choice(vendors),
+                    current_department=rng.choice(departments),
+                    model_number=model_number,
+                    serial_number=f"SN{rng.getrandbits(48):012X}",
+                    description=rng.choice(["", "", f"Assigned stock item from {brand}"]),
+                    purchase_date=purchase_date,
+                    warranty_years=rng.choice([None, 1, 2, 3, 3, 5]) if purchase_date else None,
+                    price=Decimal(rng.randint(5000, 500000)) / 100,
+                    status=rng.choices(status_list, weights=status_weights)[0],
+                    is_active=rng.random() < 0.95,
+                ))
+
+            # Product.save() fills warranty_end_date; bulk_create does not call it
+            with_warranty = [p for p in products if p.warranty_years is not None]
+            if with_warranty:
+                end_dates = compute_end_dates(
+                    [p.purchase_date for p in with_warranty], [p.warranty_years for p in with_warranty],
+                )
+                for product, end_date in zip(with_warranty, end_dates):
+                    product.warranty_end_date = end_date
+
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+            self.stdout.write(f"  products {start + batch.stop}")
+
+    def _transfers(self, rng, total, batch_size, product_rows, departments):
+        for batch in self._batches(total, batch_size):
+            transfers = []
+            for _ in batch:
+                product_id, department_id = rng.choice(product_rows)
+                transfers.append(TransferLog(
+                    product_id=product_id,
+                    from_department_id=department_id,
+                    to_department=rng.choice(departments),
+                    note=rng.choice(["", "", "Reassigned", "Temporary loan"]),
+                ))
+            with transaction.atomic():
+                TransferLog.objects.bulk_create(transfers)
+
+    def _repairs(self, rng, total, batch_size, max_movements, product_rows, vendors, repair_statuses):
+        status_list = list(repair_statuses.values())
+        today = date.today()
+        for batch in self._batches(total, batch_size):
+            repairs, departments = [], []
+            for _ in batch:
+                product_id, department_id = rng.choice(product_rows)
+                departments.append(department_id)
+                status = rng.choice(status_list)
+                sent_date = today - timedelta(days=rng.randint(0, 3 * 365))
+                repairs.append(RepairLog(
+                    product_id=product_id,
+                    fault_description=rng.choice(FAULTS),
+                    repair_vendor=rng.choice(vendors),
+                    sent_date=sent_date,
+                    received_date=sent_date + timedelta(days=rng.randint(3, 60)) if status.is_final else None,
+                    repair_cost=Decimal(rng.randint(0, 50000)) / 100 if status.is_final else None,
+                    status=status,
+                    is_active=rng.random() < 0.97,
+                ))
+            with transaction.atomic():
+                # PostgreSQL and SQLite return the new primary keys, which the movements need
+                RepairLog.objects.bulk_create(repairs)
+                movements = []
+                for repair, department_id in zip(repairs, departments):
+                    for _ in range(rng.randint(1, max_movements)):
+                        movements.append(RepairMovement(
+                            repair=repair,
+                            product_id=repair.product_id,
+                            from_department_id=department_id,
+                            to_vendor_id=repair.repair_vendor_id,
+                            status=rng.choice(status_list),
+                        ))
+                RepairMovement.objects.bulk_create(movements, batch_size=batch_size)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+        # Rows above these ids are the ones this run creates
+        last_ids = {model: model.objects.aggregate(last=Max("pk"))["last"] or 0 for model in TRACKED_MODELS}
+
+        vendors = self._reference(
+            Vendor, "VND", _numbered([f"{b} Solutions" for b in BRANDS] + [f"{b} Store" for b in BRANDS], options["vendors"]),
+            lambda **kw: Vendor(**kw, phone=f"+8801{rng.randint(100000000, 999999999)}"),
+        )
+        departments = self._reference(
+            Department, "DEPT", _numbered(DEPARTMENT_NAMES, options["departments"]),
+            lambda **kw: Department(**kw, location=f"Floor {rng.randint(1, 12)}"),
+        )
+        categories = self._reference(
+            Category, "CAT", _numbered([f"Bench {name}" for name in CATEGORY_NAMES], options["categories"]),
+            lambda **kw: Category(**kw, useful_life_years=rng.choice([3, 4, 5, 7]), salvage_value_percent=rng.choice([0, 5, 10])),
+        )
+        statuses, repair_statuses = self._statuses()
+        self.stdout.write(f"Reference data: {len(vendors)} vendors, {len(departments)} departments, {len(categories)} categories")
+
+        seeded = Product.objects.filter(unique_code__regex=r"^PRD-\d{8}$")
+        last_code = seeded.order_by("-unique_code").values_list("unique_code", flat=True).first()
+        start = int(last_code.split("-")[1]) if last_code else 0
+        self._products(rng, options["products"], start, batch_size, vendors, departments, categories, statuses)
+
+        product_rows = list(seeded.values_list("id", "current_department_id"))
+        if product_rows:
+            self._transfers(rng, options["transfers"], batch_size, product_rows, departments)
+            self._repairs(
+                rng, options["repairs"], batch_size, max(1, options["max_movements"]),
+                product_rows, vendors, repair_statuses,
+            )
+
+        self.stdout.write("Rebuilding the product listing...")
+        listing.rebuild(batch_size=batch_size)
+        # bulk_create sends no signals: publish the new rows to the change
+        # feed by hand, which also invalidates the cached lists
+        self.stdout.write("Publishing the new rows to the change feed...")
+        for model, last_id in last_ids.items():
+            new_ids = model.objects.filter(pk__gt=last_id).values_list("pk", flat=True).iterator(chunk_size=batch_size)
+            record_upserts(model._meta.model_name, new_ids, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['products']} products, {options['transfers'] if product_rows else 0} transfers and "
+            f"{options['repairs'] if product_rows else 0} repairs in {time.perf_counter() - started:.1f} s."
+        ))
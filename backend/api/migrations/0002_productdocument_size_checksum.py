@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productdocument',
+            name='checksum',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='productdocument',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_productdocument_size_checksum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productdocument',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, upload_to='previews/'),
+        ),
+    ]
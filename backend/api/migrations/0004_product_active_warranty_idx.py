@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_productdocument_preview'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['warranty_end_date'], name='product_active_warranty_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_product_active_warranty_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depreciation_method',
+            field=models.CharField(choices=[('straight_line', 'Straight line'), ('declining_balance', 'Declining balance')], default='straight_line', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='salvage_value_percent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='useful_life_years',
+            field=models.PositiveIntegerField(default=5),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_listing(apps, schema_editor):
+    Product = apps.get_model("api", "Product")
+    ProductListing = apps.get_model("api", "ProductListing")
+
+    batch = []
+    products = Product.objects.select_related("category", "vendor", "current_department", "status").annotate(
+        document_count=models.Count("documents")
+    )
+    for p in products.iterator(chunk_size=2000):
+        batch.append(ProductListing(
+            product_id=p.pk,
+            unique_code=p.unique_code,
+            name=p.name,
+            model_number=p.model_number,
+            serial_number=p.serial_number,
+            description=p.description,
+            category_id=p.category_id,
+            category_name=p.category.name,
+            vendor_id=p.vendor_id,
+            vendor_name=p.vendor.name,
+            current_department_id=p.current_department_id,
+            department_name=p.current_department.name,
+            status_id=p.status_id,
+            status_name=p.status.name,
+            purchase_date=p.purchase_date,
+            warranty_years=p.warranty_years,
+            warranty_end_date=p.warranty_end_date,
+            price=p.price,
+            document_count=p.document_count,
+            is_active=p.is_active,
+            created_at=p.created_at,
+            updated_at=p.updated_at,
+        ))
+        if len(batch) >= 2000:
+            ProductListing.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ProductListing.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_changelog_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='api.product')),
+                ('unique_code', models.CharField(db_index=True, max_length=12)),
+                ('name', models.CharField(max_length=200)),
+                ('model_number', models.CharField(blank=True, max_length=200)),
+                ('serial_number', models.CharField(blank=True, max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('category_name', models.CharField(max_length=100)),
+                ('vendor_name', models.CharField(max_length=200)),
+                ('department_name', models.CharField(max_length=200)),
+                ('status_name', models.CharField(max_length=50)),
+                ('purchase_date', models.DateField(blank=True, null=True)),
+                ('warranty_years', models.PositiveIntegerField(blank=True, null=True)),
+                ('warranty_end_date', models.DateField(blank=True, null=True)),
+                ('price', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('document_count', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('category', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.category')),
+                ('current_department', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.department')),
+                ('status', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.status')),
+                ('vendor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.vendor')),
+            ],
+        ),
+        migrations.RunPython(backfill_listing, migrations.RunPython.noop),
+    ]
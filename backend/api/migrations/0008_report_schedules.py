@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:46
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_productlisting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('report', models.CharField(choices=[('products_pdf', 'Products report (PDF)'), ('products_excel', 'Products report (Excel)'), ('products_csv', 'Products extract (CSV)'), ('products_parquet', 'Products extract (Parquet)'), ('transfers_csv', 'Transfers extract (CSV)'), ('transfers_parquet', 'Transfers extract (Parquet)'), ('repairs_csv', 'Repairs extract (CSV)'), ('repairs_parquet', 'Repairs extract (Parquet)')], max_length=30)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('compress', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to=api.models.report_upload_to)),
+                ('size', models.PositiveBigIntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('change_cursor', models.BigIntegerField()),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='api.reportschedule')),
+            ],
+            options={
+                'ordering': ['-generated_at', '-id'],
+            },
+        ),
+    ]
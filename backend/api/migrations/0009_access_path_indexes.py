@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_report_schedules'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='department_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='product_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status', '-created_at'], name='product_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='product_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['current_department', '-created_at'], name='product_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productdocument',
+            index=models.Index(fields=['product', '-uploaded_at'], name='document_product_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='listing_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status', '-created_at'], name='listing_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='listing_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['current_department', '-created_at'], name='listing_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairlog',
+            index=models.Index(fields=['-created_at'], name='repairlog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairlog',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status'], name='repairlog_active_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairmovement',
+            index=models.Index(fields=['-changed_at'], name='movement_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairmovement',
+            index=models.Index(fields=['repair', '-changed_at'], name='movement_repair_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairstatus',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='repstatus_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferlog',
+            index=models.Index(fields=['-created_at'], name='transfer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='vendor_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:05
+
+from django.conf import settings
+from django.db import migrations
+
+# table -> partition column
+HISTORY_TABLES = {
+    "api_transferlog": "created_at",
+    "api_repairmovement": "changed_at",
+}
+
+
+def partition_history(apps, schema_editor):
+    from api.partitions import partition_table
+
+    connection = schema_editor.connection
+    # Declarative partitioning is PostgreSQL only; other databases keep plain tables
+    if connection.vendor != "postgresql":
+        return
+    for table, column in HISTORY_TABLES.items():
+        partition_table(connection, table, column, settings.HISTORY_PARTITIONS_AHEAD)
+
+
+def unpartition_history(apps, schema_editor):
+    from api.partitions import is_partitioned, unpartition_table
+
+    connection = schema_editor.connection
+    for table in HISTORY_TABLES:
+        if is_partitioned(connection, table):
+            unpartition_table(connection, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history, unpartition_history),
+    ]
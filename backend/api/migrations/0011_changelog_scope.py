@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+def scope_document_entries(apps, schema_editor):
+    # Entries of documents deleted before this migration keep no scope and
+    # drop out of the nested feeds; their clients refetch anyway.
+    ChangeLog = apps.get_model('api', 'ChangeLog')
+    ProductDocument = apps.get_model('api', 'ProductDocument')
+    ChangeLog.objects.filter(model='productdocument').update(
+        scope=models.Subquery(
+            ProductDocument.objects.filter(pk=models.OuterRef('object_id')).values('product_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_partition_history_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelog',
+            name='scope',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['model', 'scope', 'id'], name='changelog_model_scope_seq_idx'),
+        ),
+        migrations.RunPython(scope_document_entries, migrations.RunPython.noop),
+    ]
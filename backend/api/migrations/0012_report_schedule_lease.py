@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_changelog_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportschedule',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -3,6 +3,8 @@ from autoslug import AutoSlugField
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Q
+import hashlib
 import random
 class Vendor(models.Model):
     unique_code = models.CharField(max_length=12, unique=True, editable=False, db_index=True)
@@ -12,8 +14,16 @@ class Vendor(models.Model):
     address = models.CharField(max_length=200, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(is_active=True),
+                name="vendor_active_created_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
@@ -42,8 +52,16 @@ class Department(models.Model):
     responsible_person = models.CharField(max_length=200, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(is_active=True),
+                name="department_active_created_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
@@ -69,7 +87,7 @@ class Status(models.Model):
     name = models.CharField(max_length=50, unique=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
     def save(self, *args, **kwargs):
@@ -93,12 +111,22 @@ class Status(models.Model):
         return self.name
     
 class Category(models.Model):
+    STRAIGHT_LINE = "straight_line"
+    DECLINING_BALANCE = "declining_balance"
+    DEPRECIATION_METHODS = [
+        (STRAIGHT_LINE, "Straight line"),
+        (DECLINING_BALANCE, "Declining balance"),
+    ]
+
     unique_code = models.CharField(max_length=12, unique=True, editable=False, db_index=True)
     name = models.CharField(max_length=100, unique=True)
     slug = AutoSlugField(populate_from='name', unique=True)
+    depreciation_method = models.CharField(max_length=20, choices=DEPRECIATION_METHODS, default=STRAIGHT_LINE)
+    useful_life_years = models.PositiveIntegerField(default=5)
+    salvage_value_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
     def save(self, *args, **kwargs):
@@ -137,7 +165,37 @@ class Product(models.Model):
     status = models.ForeignKey(Status, on_delete=models.PROTECT)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["warranty_end_date"],
+                condition=Q(is_active=True),
+                name="product_active_warranty_idx",
+            ),
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(is_active=True),
+                name="product_active_created_idx",
+            ),
+            # The list filters (?status= / ?category= / ?current_department=) with the default ordering
+            models.Index(
+                fields=["status", "-created_at"],
+                condition=Q(is_active=True),
+                name="product_status_created_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at"],
+                condition=Q(is_active=True),
+                name="product_category_created_idx",
+            ),
+            models.Index(
+                fields=["current_department", "-created_at"],
+                condition=Q(is_active=True),
+                name="product_dept_created_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
 
@@ -162,14 +220,63 @@ class Product(models.Model):
 
             super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored values, for the live events to diff a save against without a query
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def __str__(self):
         return self.name
 
 class ProductDocument(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="documents")
     file = models.FileField(upload_to="docs/")
+    size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    checksum = models.CharField(max_length=64, blank=True, editable=False)
+    preview = models.ImageField(upload_to="previews/", blank=True, editable=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "-uploaded_at"], name="document_product_uploaded_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored name, to notice a replaced file at save time
+        if "file" in instance.__dict__:
+            instance._saved_file_name = instance.__dict__["file"]
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.file and (not self.checksum or self.file_changed()):
+            self.refresh_file_metadata()
+        super().save(*args, **kwargs)
+        self._saved_file_name = self.file.name
+
+    def file_changed(self):
+        """A new upload, or a different stored file than the one loaded."""
+        if not self.file._committed:
+            return True
+        return self.file.name != getattr(self, "_saved_file_name", self.file.name)
+
+    def refresh_file_metadata(self):
+        # Size and hash are stored so downloads can answer HEAD and
+        # conditional requests without touching the storage backend.
+        digest = hashlib.sha256()
+        if self.file._committed:
+            with self.file.open("rb") as fh:
+                for chunk in fh.chunks():
+                    digest.update(chunk)
+        else:
+            for chunk in self.file.chunks():
+                digest.update(chunk)
+        self.size = self.file.size
+        self.checksum = digest.hexdigest()
+
     def __str__(self):
         return f"{self.product.name} - {self.file.name}"
 
@@ -180,6 +287,12 @@ class TransferLog(models.Model):
     transfer_date = models.DateField(auto_now_add=True)
     note = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="transfer_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.product.name if self.product else 'Unknown'} transfer"
@@ -192,6 +305,16 @@ class RepairStatus(models.Model):
     is_active = models.BooleanField(default=True)
     is_final = models.BooleanField(default=False) 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(is_active=True),
+                name="repstatus_active_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -207,7 +330,17 @@ class RepairLog(models.Model):
     status = models.ForeignKey(RepairStatus, on_delete=models.PROTECT) 
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="repairlog_created_idx"),
+            models.Index(
+                fields=["status"],
+                condition=Q(is_active=True),
+                name="repairlog_active_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product.unique_code} - {self.status.name}"
@@ -225,13 +358,164 @@ class RepairMovement(models.Model):
 
     class Meta:
         ordering = ["-changed_at"]
+        indexes = [
+            models.Index(fields=["-changed_at"], name="movement_changed_idx"),
+            # A repair's history, newest first
+            models.Index(fields=["repair", "-changed_at"], name="movement_repair_changed_idx"),
+        ]
 
     def __str__(self):
         return f"{self.product.unique_code} → {self.status.name if self.status else 'Unknown'}"
 
 
 
+class ProductListing(models.Model):
+    """
+    Flattened copy of Product with the names of its related rows, kept in
+    sync by signals (see api/listing.py). List views, exports and the
+    chatbot read it without joins.
+
+    Signals only see per-row saves: code that writes products or their
+    related rows with update(), bulk_create() or bulk_update() must call
+    listing.refresh_products() with the ids it touched, or listing.rebuild().
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="listing")
+    unique_code = models.CharField(max_length=12, db_index=True)
+    name = models.CharField(max_length=200)
+    model_number = models.CharField(max_length=200, blank=True)
+    serial_number = models.CharField(max_length=200, blank=True)
+    description = models.TextField(blank=True)
+    category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    category_name = models.CharField(max_length=100)
+    vendor = models.ForeignKey(Vendor, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    vendor_name = models.CharField(max_length=200)
+    current_department = models.ForeignKey(Department, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    department_name = models.CharField(max_length=200)
+    status = models.ForeignKey(Status, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    status_name = models.CharField(max_length=50)
+    purchase_date = models.DateField(null=True, blank=True)
+    warranty_years = models.PositiveIntegerField(null=True, blank=True)
+    warranty_end_date = models.DateField(null=True, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    document_count = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(is_active=True),
+                name="listing_active_created_idx",
+            ),
+            models.Index(
+                fields=["status", "-created_at"],
+                condition=Q(is_active=True),
+                name="listing_status_created_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at"],
+                condition=Q(is_active=True),
+                name="listing_category_created_idx",
+            ),
+            models.Index(
+                fields=["current_department", "-created_at"],
+                condition=Q(is_active=True),
+                name="listing_dept_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.unique_code} - {self.name}"
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only change sequence for the api models. The primary key is the
+    sync cursor handed to clients by the `/changes/` endpoints. `scope` is the
+    parent of rows served by nested endpoints (the product of a document), so
+    those feeds only read their parent's entries.
+    """
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTIONS = [
+        (UPSERT, "Upsert"),
+        (DELETE, "Delete"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    scope = models.BigIntegerField(null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "id"], name="changelog_model_seq_idx"),
+            models.Index(fields=["model", "scope", "id"], name="changelog_model_scope_seq_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.model}:{self.object_id} {self.action}"
+
+
+
+def report_upload_to(instance, filename):
+    return f"reports/{instance.schedule_id}/{filename}"
+
+
+class ReportSchedule(models.Model):
+    """
+    An export that `manage.py run_scheduled_reports` precomputes (see
+    api/reports.py). A new snapshot is only written when the tables behind
+    the report have changed since the last one.
+    """
+    PRODUCTS_PDF = "products_pdf"
+    PRODUCTS_EXCEL = "products_excel"
+    PRODUCTS_CSV = "products_csv"
+    PRODUCTS_PARQUET = "products_parquet"
+    TRANSFERS_CSV = "transfers_csv"
+    TRANSFERS_PARQUET = "transfers_parquet"
+    REPAIRS_CSV = "repairs_csv"
+    REPAIRS_PARQUET = "repairs_parquet"
+    REPORTS = [
+        (PRODUCTS_PDF, "Products report (PDF)"),
+        (PRODUCTS_EXCEL, "Products report (Excel)"),
+        (PRODUCTS_CSV, "Products extract (CSV)"),
+        (PRODUCTS_PARQUET, "Products extract (Parquet)"),
+        (TRANSFERS_CSV, "Transfers extract (CSV)"),
+        (TRANSFERS_PARQUET, "Transfers extract (Parquet)"),
+        (REPAIRS_CSV, "Repairs extract (CSV)"),
+        (REPAIRS_PARQUET, "Repairs extract (Parquet)"),
+    ]
+
+    name = models.CharField(max_length=100)
+    report = models.CharField(max_length=30, choices=REPORTS)
+    filters = models.JSONField(default=dict, blank=True)
+    compress = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    # Generation lease, claimed with a conditional UPDATE by run_schedule
+    locked_until = models.DateTimeField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
 
 
+class ReportSnapshot(models.Model):
+    schedule = models.ForeignKey(ReportSchedule, on_delete=models.CASCADE, related_name="snapshots")
+    file = models.FileField(upload_to=report_upload_to)
+    size = models.PositiveBigIntegerField()
+    checksum = models.CharField(max_length=64)
+    # Highest ChangeLog id of the report's models when it was generated
+    change_cursor = models.BigIntegerField()
+    generated_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["-generated_at", "-id"]
 
+    def __str__(self):
+        return f"{self.schedule.name} @ {self.generated_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,239 @@
+"""
+Monthly range partitioning of the append-only history tables (PostgreSQL only).
+
+TransferLog is partitioned by created_at and RepairMovement by changed_at: one
+partition per calendar month in TIME_ZONE, named <table>_pYYYYMM, plus
+<table>_default for rows no monthly partition covers. PostgreSQL requires the
+partition column in the primary key, so it becomes (id, <column>); ids still
+come from one sequence and stay unique, so the ORM keeps using `id` alone.
+
+Newest-first queries read the latest partitions and stop at their LIMIT, and
+autovacuum mostly works on the current month. Old months are detached whole
+(see archive_history_partitions) instead of deleted row by row, and
+create_history_partitions keeps months ahead of the clock.
+"""
+import re
+from datetime import date, datetime, time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RepairMovement, TransferLog
+
+# model -> partition column
+HISTORY = {
+    TransferLog: "created_at",
+    RepairMovement: "changed_at",
+}
+
+
+def month_start(value):
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def _bound(month):
+    return datetime.combine(month, time.min, tzinfo=timezone.get_default_timezone()).isoformat()
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def is_partitioned(connection, table):
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row and row[0] == "p")
+
+
+def partitions(connection, table):
+    """The monthly partitions of `table` as [(month, name)], oldest first."""
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    found = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            found.append((date(int(match[1]), int(match[2]), 1), name))
+    return sorted(found)
+
+
+def create_partition(connection, table, column, month):
+    """
+    Create the partition for `month`. Rows of that month already caught by the
+    default partition are moved into it (PostgreSQL refuses the new partition
+    while the default holds rows in its range). Returns the number moved.
+    """
+    qn = connection.ops.quote_name
+    name, default = partition_name(table, month), default_partition(table)
+    start, end = _bound(month), _bound(add_months(month, 1))
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [default])
+        has_default = cursor.fetchone()[0]
+        stranded = False
+        if has_default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE {qn(column)} >= %s AND {qn(column)} < %s)",
+                [start, end],
+            )
+            stranded = cursor.fetchone()[0]
+        if stranded:
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(default)}")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+        moved = 0
+        if stranded:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {qn(default)} WHERE {qn(column)} >= %s AND {qn(column)} < %s "
+                f"RETURNING *) INSERT INTO {qn(table)} SELECT * FROM moved",
+                [start, end],
+            )
+            moved = cursor.rowcount
+            cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default)} DEFAULT")
+    return moved
+
+
+def stranded_months(connection, table, column):
+    """Months that have rows in the default partition."""
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {qn(column)} AT TIME ZONE %s) FROM {qn(default_partition(table))}",
+            [timezone.get_default_timezone_name()],
+        )
+        return sorted(row[0].date() for row in cursor.fetchall())
+
+
+def ensure_partitions(connection, table, column, ahead, today=None):
+    """
+    Create the partitions from the current month to `ahead` months later, and
+    for any month stranded in the default partition. Returns [(name, rows moved)].
+    """
+    current = month_start(today or timezone.now())
+    existing = {month for month, _ in partitions(connection, table)}
+    wanted = {add_months(current, offset) for offset in range(ahead + 1)}
+    wanted.update(stranded_months(connection, table, column))
+
+    created = []
+    for month in sorted(wanted - existing):
+        moved = create_partition(connection, table, column, month)
+        created.append((partition_name(table, month), moved))
+    return created
+
+
+def detach_partition(connection, table, name):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+
+
+# ── Conversion (used by migration 0010) ───────────────────────────────────────
+
+def _keys(cursor, table):
+    """Secondary index definitions and foreign keys of `table`, to recreate on its replacement."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    # A partitioned table's definitions read "ON ONLY <table>"
+    indexes = [row[0].replace(" ON ONLY ", " ON ", 1) for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return indexes, cursor.fetchall()
+
+
+def _replace(connection, table, partition_by):
+    """
+    Rename `table` aside and create an empty table of the same name and
+    columns in its place, partitioned by `partition_by` (a column) or plain
+    when None. Returns the (first, last) values of the partition column, for
+    the caller to create partitions in between, and `finish(cursor)`, which
+    copies the rows over, drops the original and recreates the keys, indexes
+    and id sequence. Runs inside the migration's transaction.
+    """
+    qn = connection.ops.quote_name
+    previous = f"{table}_previous"
+    with connection.cursor() as cursor:
+        indexes, foreign_keys = _keys(cursor, table)
+        cursor.execute(f"SELECT max(id) FROM {qn(table)}")
+        max_id = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(previous)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(previous)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS)"
+            + (f" PARTITION BY RANGE ({qn(partition_by)})" if partition_by else "")
+        )
+        # The id default (serial or identity) belongs to the old table; a new sequence replaces it
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id DROP DEFAULT")
+
+        bounds = (None, None)
+        if partition_by:
+            cursor.execute(f"SELECT min({qn(partition_by)}), max({qn(partition_by)}) FROM {qn(previous)}")
+            bounds = cursor.fetchone()
+
+    def finish(cursor):
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(previous)}")
+        cursor.execute(f"DROP TABLE {qn(previous)}")
+
+        key = ["id", partition_by] if partition_by else ["id"]
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY ({', '.join(qn(c) for c in key)})")
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+
+        sequence = f"{table}_id_seq"
+        cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+        cursor.execute("SELECT setval(%s, %s, %s)", [sequence, max_id or 1, max_id is not None])
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence])
+
+    return bounds, finish
+
+
+def partition_table(connection, table, column, ahead):
+    """Turn `table` into a monthly partitioned table, keeping its rows, indexes and foreign keys."""
+    qn = connection.ops.quote_name
+    (first, last), finish = _replace(connection, table, column)
+
+    now = month_start(timezone.now())
+    month = month_start(first) if first else now
+    end = add_months(max(month_start(last) if last else now, now), ahead)
+    while month <= end:
+        create_partition(connection, table, column, month)
+        month = add_months(month, 1)
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {qn(default_partition(table))} PARTITION OF {qn(table)} DEFAULT")
+        finish(cursor)
+
+
+def unpartition_table(connection, table):
+    """Undo `partition_table`: one plain table again, detached partitions excluded."""
+    _, finish = _replace(connection, table, None)
+    with connection.cursor() as cursor:
+        finish(cursor)
@@ -0,0 +1,115 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff"}
+PDF_EXTENSIONS = {".pdf"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DOCUMENT_PREVIEW_WORKERS,
+                    thread_name_prefix="doc-preview",
+                )
+    return _executor
+
+
+def schedule_preview(document_id):
+    """Queue preview rendering for a document on the worker pool."""
+    if not settings.DOCUMENT_PREVIEWS_ENABLED:
+        return None
+    return _get_executor().submit(_run, document_id)
+
+
+def _run(document_id):
+    from .models import ProductDocument
+
+    try:
+        document = ProductDocument.objects.filter(pk=document_id).first()
+        if document:
+            generate_preview(document)
+    except Exception:
+        logger.exception("Preview generation failed for document %s", document_id)
+    finally:
+        # Worker threads are not request-scoped, so release their connection.
+        connections.close_all()
+
+
+def _render_image(fh):
+    from PIL import Image
+
+    with Image.open(fh) as image:
+        image.seek(0)
+        image.thumbnail(settings.DOCUMENT_PREVIEW_SIZE)
+        return image.convert("RGB")
+
+
+def _render_pdf(fh):
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        logger.debug("pypdfium2 is not installed; skipping PDF preview")
+        return None
+
+    pdf = pdfium.PdfDocument(fh.read())
+    try:
+        if len(pdf) == 0:
+            return None
+        page = pdf[0]
+        width, _ = page.get_size()
+        scale = settings.DOCUMENT_PREVIEW_SIZE[0] / width if width else 1
+        image = page.render(scale=scale).to_pil()
+        image.thumbnail(settings.DOCUMENT_PREVIEW_SIZE)
+        return image.convert("RGB")
+    finally:
+        pdf.close()
+
+
+def generate_preview(document):
+    """
+    Render a JPEG thumbnail for a document (first page for PDFs) and store it
+    on `document.preview`. Unsupported file types are left without a preview.
+    """
+    ext = os.path.splitext(document.file.name)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        renderer = _render_image
+    elif ext in PDF_EXTENSIONS:
+        renderer = _render_pdf
+    else:
+        return None
+
+    with document.file.open("rb") as fh:
+        image = renderer(fh)
+    if image is None:
+        return None
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80, optimize=True)
+
+    if document.preview:
+        document.preview.delete(save=False)
+    document.preview.save(f"{document.pk}.jpg", ContentFile(buffer.getvalue()), save=False)
+
+    # update() keeps the post_save signal from queueing another render, so
+    # the change is published to the sync feed by hand.
+    from .models import ChangeLog
+    from .signals import record_change
+
+    type(document).objects.filter(pk=document.pk).update(preview=document.preview.name)
+    record_change("productdocument", document.pk, ChangeLog.UPSERT, document.product_id)
+    return document.preview.name
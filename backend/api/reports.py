@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+from it_asset_management_system.db_routers import replica_reads
+
+from . import extracts
+from .conditional import latest_change
+from .exports import write_products_excel, write_products_pdf
+from .listing import filter_listing
+from .models import ReportSchedule, ReportSnapshot
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_MODELS = ["product", "category", "vendor", "department", "status"]
+TRANSFER_MODELS = ["transferlog", "product", "department"]
+REPAIR_MODELS = ["repairlog", "product", "vendor", "repairstatus"]
+
+
+@dataclass(frozen=True)
+class Report:
+    extension: str
+    # Models whose ChangeLog entries invalidate the report
+    models: list
+    # writer(filters, fileobj, compress)
+    write: Callable
+
+
+def _extract(entity, fmt):
+    def write(filters, fileobj, compress):
+        extracts.write_extract(entity, fmt, filters, fileobj, compress=compress)
+    return write
+
+
+REPORTS = {
+    ReportSchedule.PRODUCTS_PDF: Report(
+        "pdf", PRODUCT_MODELS, lambda filters, fileobj, compress: write_products_pdf(filter_listing(filters), fileobj),
+    ),
+    ReportSchedule.PRODUCTS_EXCEL: Report(
+        "xlsx", PRODUCT_MODELS, lambda filters, fileobj, compress: write_products_excel(filter_listing(filters), fileobj),
+    ),
+    ReportSchedule.PRODUCTS_CSV: Report("csv", PRODUCT_MODELS, _extract("products", "csv")),
+    ReportSchedule.PRODUCTS_PARQUET: Report("parquet", PRODUCT_MODELS, _extract("products", "parquet")),
+    ReportSchedule.TRANSFERS_CSV: Report("csv", TRANSFER_MODELS, _extract("transfers", "csv")),
+    ReportSchedule.TRANSFERS_PARQUET: Report("parquet", TRANSFER_MODELS, _extract("transfers", "parquet")),
+    ReportSchedule.REPAIRS_CSV: Report("csv", REPAIR_MODELS, _extract("repairs", "csv")),
+    ReportSchedule.REPAIRS_PARQUET: Report("parquet", REPAIR_MODELS, _extract("repairs", "parquet")),
+}
+
+
+def change_cursor(models):
+    """Highest change sequence number recorded for any of `models`."""
+    return latest_change(models)[0]
+
+
+def is_stale(schedule, cursor):
+    latest = schedule.snapshots.first()
+    return latest is None or latest.change_cursor != cursor or latest.generated_at < schedule.updated_at
+
+
+def _filename(schedule, report):
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{schedule.report}-{stamp}.{report.extension}"
+    return f"{name}.gz" if schedule.compress and report.extension == "csv" else name
+
+
+def _prune(schedule):
+    keep = settings.REPORT_SNAPSHOTS_KEEP
+    for snapshot in schedule.snapshots.all()[keep:]:
+        snapshot.file.delete(save=False)
+        snapshot.delete()
+
+
+def generate(schedule):
+    """Render `schedule` into a new snapshot and drop the ones beyond the retention limit."""
+    report = REPORTS[schedule.report]
+
+    with tempfile.TemporaryFile() as fileobj:
+        with replica_reads():
+            # Read the cursor first: anything committed while rendering triggers the next run
+            cursor = change_cursor(report.models)
+            report.write(schedule.filters, fileobj, schedule.compress)
+
+        fileobj.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+            digest.update(chunk)
+        size = fileobj.tell()
+
+        fileobj.seek(0)
+        snapshot = ReportSnapshot(schedule=schedule, size=size, checksum=digest.hexdigest(), change_cursor=cursor)
+        snapshot.file.save(_filename(schedule, report), File(fileobj), save=False)
+        snapshot.save()
+
+    _prune(schedule)
+    return snapshot
+
+
+def run_schedule(schedule, force=False):
+    """
+    Regenerate `schedule` when its tables changed (or `force`). Returns the
+    new snapshot, or None when the latest one is still current or another
+    run holds the lock.
+    """
+    report = REPORTS[schedule.report]
+    if not force and not is_stale(schedule, change_cursor(report.models)):
+        return None
+
+    # The lease lives on the schedule row so runs on other hosts see it; it
+    # expires after REPORT_LOCK_TIMEOUT in case a run dies holding it
+    now = timezone.now()
+    until = now + timedelta(seconds=settings.REPORT_LOCK_TIMEOUT)
+    rows = ReportSchedule.objects.filter(pk=schedule.pk)
+    if not rows.filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now)).update(locked_until=until):
+        logger.info("Report schedule %s is already being generated", schedule.pk)
+        return None
+    try:
+        return generate(schedule)
+    finally:
+        # Only release our own lease, not one taken over after it expired
+        rows.filter(locked_until=until).update(locked_until=None)
@@ -1,5 +1,20 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Vendor, Department, Status, Category, Product, ProductDocument, TransferLog, RepairStatus, RepairLog, RepairMovement
+from .models import Vendor, Department, Status, Category, Product, ProductDocument, ProductListing, TransferLog, RepairStatus, RepairLog, RepairMovement, ReportSchedule, ReportSnapshot
+
+class SparseFieldsetMixin:
+    """
+    Accepts a `fields` kwarg (e.g. from `?fields=id,name`) and drops every
+    other field, so unused relations are neither fetched nor rendered.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
 class VendorSerializer(serializers.ModelSerializer):
     unique_code = serializers.CharField(read_only=True)
@@ -28,13 +43,44 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class DocumentDownloadUrlField(serializers.Field):
+    """
+    URL of the document's download action, which checks permissions and
+    answers Range and conditional requests (unlike the raw /media/ URL).
+    `value_paths` and `from_values` let the fast read path build it from
+    values() rows.
+    """
+    value_paths = ('pk', 'product_id')
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, document):
+        return self.from_values(document.pk, document.product_id, self.context.get('request'))
+
+    @staticmethod
+    def from_values(pk, product_id, request):
+        url = reverse('product-documents-download', kwargs={'product_id': product_id, 'pk': pk})
+        return request.build_absolute_uri(url) if request else url
+
+
 class ProductDocumentSerializer(serializers.ModelSerializer):
+    preview_url = serializers.ImageField(source='preview', read_only=True)
+    download_url = DocumentDownloadUrlField()
+
     class Meta:
         model = ProductDocument
-        fields = '__all__'
+        exclude = ['preview']
+
+
+# Columns the products table actually shows, served with ?compact=1
+PRODUCT_COMPACT_FIELDS = ['id', 'unique_code', 'name', 'category_name', 'department_name', 'vendor_name', 'price',
+                          'purchase_date', 'warranty_years', 'warranty_end_date', 'status_name']
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     unique_code = serializers.CharField(read_only=True)
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
     department_name = serializers.CharField(source='current_department.name', read_only=True)
@@ -56,6 +102,18 @@ class ProductSerializer(serializers.ModelSerializer):
             
 
 
+class ProductListingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    id = serializers.IntegerField(source='product_id', read_only=True)
+
+    class Meta:
+        model = ProductListing
+        fields = ['id', 'unique_code', 'name', 'model_number', 'serial_number', 'description', 'purchase_date', 'warranty_years',
+                  'warranty_end_date', 'price', 'vendor', 'current_department', 'category',
+                  'status', 'created_at', 'updated_at',
+                  'vendor_name', 'department_name', 'category_name', 'status_name', 'document_count']
+        read_only_fields = fields
+
+
 class TransferLogSerializer(serializers.ModelSerializer):
     unique_code = serializers.CharField(source='product.unique_code', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -120,3 +178,34 @@ class RepairMovementSerializer(serializers.ModelSerializer):
 
 
 
+
+
+class ReportSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportSnapshot
+        fields = ['id', 'generated_at', 'size', 'checksum']
+
+
+class ReportScheduleSerializer(serializers.ModelSerializer):
+    report_display = serializers.CharField(source='get_report_display', read_only=True)
+    latest_snapshot = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportSchedule
+        fields = ['id', 'name', 'report', 'report_display', 'filters', 'compress', 'latest_snapshot', 'download_url']
+
+    def _latest(self, obj):
+        snapshots = obj.snapshots.all()
+        return snapshots[0] if snapshots else None
+
+    def get_latest_snapshot(self, obj):
+        latest = self._latest(obj)
+        return ReportSnapshotSerializer(latest).data if latest else None
+
+    def get_download_url(self, obj):
+        if self._latest(obj) is None:
+            return None
+        url = reverse('report-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
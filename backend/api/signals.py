@@ -0,0 +1,142 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    Vendor, Department, Status, Category, Product, ProductDocument,
+    TransferLog, RepairStatus, RepairLog, RepairMovement, ChangeLog,
+)
+from .previews import schedule_preview
+from . import events, listing
+
+
+TRACKED_MODELS = [
+    Vendor, Department, Status, Category, Product, ProductDocument,
+    TransferLog, RepairStatus, RepairLog, RepairMovement,
+]
+
+
+@receiver(post_save, sender=ProductDocument)
+def queue_document_preview(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and "file" in update_fields):
+        transaction.on_commit(partial(schedule_preview, instance.pk))
+
+
+# ── Product read model ────────────────────────────────────────────────────────
+# Connected before the change feed below: on_commit callbacks run in the order
+# they were queued, so the listing is current by the time a ChangeLog entry
+# (and the new ETag derived from it) is visible to clients.
+
+@receiver(post_save, sender=Product, dispatch_uid="listing_product_save")
+def refresh_product_listing(sender, instance, **kwargs):
+    transaction.on_commit(partial(listing.refresh_products, [instance.pk]))
+
+
+@receiver(post_save, sender=ProductDocument, dispatch_uid="listing_document_save")
+@receiver(post_delete, sender=ProductDocument, dispatch_uid="listing_document_delete")
+def refresh_document_count(sender, instance, **kwargs):
+    transaction.on_commit(partial(listing.refresh_products, [instance.product_id]))
+
+
+def rename_related(model_name, pk, name):
+    """
+    Carry a renamed vendor/department/category/status into the listing and
+    publish the products showing its name to the product change feed.
+    """
+    record_upserts("product", listing.rename_related(model_name, pk, name))
+
+
+def rename_listing_related(sender, instance, **kwargs):
+    transaction.on_commit(partial(rename_related, sender._meta.model_name, instance.pk, instance.name))
+
+
+for model in (Vendor, Department, Category, Status):
+    post_save.connect(rename_listing_related, sender=model, dispatch_uid=f"listing_rename_{model._meta.model_name}")
+
+
+# ── Change feed ───────────────────────────────────────────────────────────────
+
+# Models served by nested endpoints: model -> field holding the parent, stored as ChangeLog.scope
+SCOPE_FIELDS = {
+    ProductDocument: "product_id",
+}
+
+
+def record_change(model, object_id, action, scope=None):
+    """Append to the change feed, which also moves the cached lists of `model` on (see cache.py)."""
+    ChangeLog.objects.create(model=model, object_id=object_id, action=action, scope=scope)
+
+
+def record_upserts(model, object_ids, batch_size=1000):
+    """record_change() for rows written without signals (update(), bulk_create(), bulk_update())."""
+    ChangeLog.objects.bulk_create(
+        (ChangeLog(model=model, object_id=object_id, action=ChangeLog.UPSERT) for object_id in object_ids),
+        batch_size=batch_size,
+    )
+
+
+def change_scope(sender, instance):
+    field = SCOPE_FIELDS.get(sender)
+    return getattr(instance, field) if field else None
+
+
+def record_save(sender, instance, **kwargs):
+    # Soft-deleted rows are published as tombstones
+    action = ChangeLog.DELETE if getattr(instance, "is_active", True) is False else ChangeLog.UPSERT
+    transaction.on_commit(partial(
+        record_change, sender._meta.model_name, instance.pk, action, change_scope(sender, instance),
+    ))
+
+
+def record_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(
+        record_change, sender._meta.model_name, instance.pk, ChangeLog.DELETE, change_scope(sender, instance),
+    ))
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(record_save, sender=model, dispatch_uid=f"changelog_save_{model._meta.model_name}")
+    post_delete.connect(record_delete, sender=model, dispatch_uid=f"changelog_delete_{model._meta.model_name}")
+
+
+# ── Live events ───────────────────────────────────────────────────────────────
+
+EVENT_FIELD_NAMES = {field.removesuffix("_id") for field in events.PRODUCT_FIELDS}
+
+
+@receiver(pre_save, sender=Product, dispatch_uid="events_product_pre_save")
+def remember_product_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._events_before = None
+    if raw or instance._state.adding or not events.enabled():
+        return
+    if update_fields is not None and not EVENT_FIELD_NAMES.intersection(update_fields):
+        return
+    # Instances loaded with every event field (the usual case) carry their stored values
+    instance._events_before = events.stored_state(instance)
+    if instance._events_before is None:
+        instance._events_before = Product.objects.filter(pk=instance.pk).values(*events.PRODUCT_FIELDS).first()
+
+
+@receiver(post_save, sender=Product, dispatch_uid="events_product_save")
+def publish_product_events(sender, instance, created, raw=False, **kwargs):
+    if raw or not events.enabled():
+        return
+    after = events.product_state(instance)
+    # The next save of this instance diffs against what was just written
+    instance._loaded_values = {**getattr(instance, "_loaded_values", {}), **after}
+    transaction.on_commit(partial(
+        events.product_changed, instance.pk, instance.unique_code, instance.name,
+        created, getattr(instance, "_events_before", None), after,
+    ), robust=True)
+
+
+@receiver(post_save, sender=TransferLog, dispatch_uid="events_transfer_save")
+def publish_transfer_events(sender, instance, created, raw=False, **kwargs):
+    if raw or not created or not events.enabled():
+        return
+    product_active = instance.product_id is not None and instance.product.is_active
+    transaction.on_commit(partial(
+        events.transfer_created, instance.pk, instance.product_id, instance.to_department_id, product_active,
+    ), robust=True)
@@ -0,0 +1,80 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework import status
+
+from .models import ChangeLog
+
+
+class ChangeFeedMixin:
+    """
+    Adds `GET <list>/changes/?since=<cursor>` to a viewset.
+
+    Clients do one full fetch, keep the returned cursor and afterwards pull
+    only the rows upserted or tombstoned since then. Calling without `since`
+    just returns the current cursor.
+
+    Nested viewsets return their parent's id from `get_change_scope()` and
+    only read the entries recorded with that scope (see signals.SCOPE_FIELDS).
+
+    Product rows are also published when a vendor, department, category or
+    status they show is renamed. Transfers, repairs and movements are not:
+    their payloads carry related names too, so clients refetch those lists
+    after syncing a rename of the related model itself.
+    """
+    change_feed_limit = 500
+
+    def get_change_model(self):
+        return self.get_queryset().model._meta.model_name
+
+    def get_change_scope(self):
+        return None
+
+    def get_change_entries(self):
+        entries = ChangeLog.objects.filter(model=self.get_change_model())
+        scope = self.get_change_scope()
+        if scope is not None:
+            entries = entries.filter(scope=scope)
+        return entries
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+
+        if since is None:
+            latest = self.get_change_entries().order_by("-id").values_list("id", flat=True).first()
+            return Response({"cursor": latest or 0, "has_more": False, "upserted": [], "deleted": []})
+
+        try:
+            since = int(since)
+        except ValueError:
+            return Response({"error": "since must be an integer cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = list(
+            self.get_change_entries().filter(id__gt=since)
+            .order_by("id")
+            .values_list("id", "object_id", "action")[:self.change_feed_limit + 1]
+        )
+        has_more = len(entries) > self.change_feed_limit
+        entries = entries[:self.change_feed_limit]
+
+        # Only the latest action per object matters
+        latest = {}
+        cursor = since
+        for seq, object_id, change in entries:
+            latest[object_id] = change
+            cursor = seq
+
+        upsert_ids = [pk for pk, change in latest.items() if change == ChangeLog.UPSERT]
+        deleted = [pk for pk, change in latest.items() if change == ChangeLog.DELETE]
+
+        rows = list(self.get_queryset().filter(pk__in=upsert_ids))
+        # Rows that fell out of the viewset queryset are gone for the client
+        found = {row.pk for row in rows}
+        deleted += [pk for pk in upsert_ids if pk not in found]
+
+        return Response({
+            "cursor": cursor,
+            "has_more": has_more,
+            "upserted": self.get_serializer(rows, many=True).data,
+            "deleted": sorted(deleted),
+        })
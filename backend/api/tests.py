@@ -1,3 +1,573 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from itertools import combinations
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, router, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from it_asset_management_system.db_routers import PIN_HEADER, replica_reads
+
+from . import fastread, listing, reports
+from .views import VendorViewSet
+from .models import (
+    Category, Department, Product, ProductDocument, RepairLog, RepairMovement,
+    RepairStatus, ReportSchedule, Status, TransferLog, Vendor,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# A stand-in read replica: a second connection to the test database
+# (TEST MIRROR), registered before the test runner creates the databases.
+REPLICA = "replica_test"
+if REPLICA not in connections:
+    connections.settings[REPLICA] = connections.configure_settings({
+        "default": connections.settings["default"],
+        REPLICA: {**connections.settings["default"], "TEST": {"MIRROR": "default"}},
+    })[REPLICA]
+
+
+def create_inventory():
+    """A few rows of every model the API lists, with nulls and unicode mixed in."""
+    vendors = [Vendor.objects.create(name=name) for name in ("Acme", "Žluťoučký kůň")]
+    departments = [Department.objects.create(name=name) for name in ("IT", "Finance")]
+    status = Status.objects.create(name="In Stock")
+    category = Category.objects.create(name="Laptops")
+    repair_status = RepairStatus.objects.create(name="Sent", product_status=status)
+
+    products = []
+    for i in range(6):
+        products.append(Product.objects.create(
+            name=f"Laptop {i} ",
+            category=category,
+            vendor=vendors[i % 2],
+            current_department=departments[i % 2],
+            status=status,
+            serial_number=f"SN-{i}",
+            purchase_date=date(2024, 1, 1 + i) if i % 3 else None,
+            warranty_years=i % 3 or None,
+            price=f"{1000 + i}.50",
+        ))
+    ProductDocument.objects.create(product=products[0], file=SimpleUploadedFile("manual.pdf", b"%PDF-1.4"))
+    ProductDocument.objects.create(product=products[0], file=SimpleUploadedFile("invoice.pdf", b"%PDF-1.4"))
+
+    for product in products[:3]:
+        TransferLog.objects.create(
+            product=product, from_department=departments[0], to_department=departments[1], note="moved",
+        )
+    TransferLog.objects.create(product=None, from_department=None, to_department=departments[0])
+
+    repair = RepairLog.objects.create(
+        product=products[1], fault_description="Broken hinge", repair_vendor=vendors[0], status=repair_status,
+    )
+    RepairMovement.objects.create(
+        repair=repair, product=products[1], from_department=departments[0], to_vendor=vendors[0], status=repair_status,
+    )
+    RepairMovement.objects.create(repair=repair, product=products[1], from_department=None, status=None)
+
+    # The listing is kept current on commit, which TestCase never reaches
+    listing.rebuild()
+    return products
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class FastReadTests(TestCase):
+    urls = [
+        "/api/products/",
+        "/api/products/?page=1",
+        "/api/products/?search=Laptop",
+        "/api/products/?ordering=price",
+        "/api/products/?compact=1",
+        "/api/products/?fields=id,unique_code,name,status_name,documents",
+        "/api/products/?flat=1",
+        "/api/products/?flat=1&compact=1",
+        "/api/transfers/",
+        "/api/transfers/?search=moved",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        create_inventory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, fast):
+        with override_settings(API_FAST_READ=fast):
+            response = self.client.get(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200, url)
+        return response.content
+
+    def test_fast_path_matches_serializers(self):
+        convert = fastread.FastReader.convert
+        for url in self.urls:
+            with self.subTest(url=url):
+                with mock.patch.object(fastread.FastReader, "convert", autospec=True, side_effect=convert) as fast:
+                    fast_content = self.get(url, fast=True)
+                self.assertTrue(fast.called, "the fast path fell back to the serializer")
+                self.assertEqual(fast_content, self.get(url, fast=False))
+
+    def test_fast_path_is_off_by_default(self):
+        self.assertFalse(settings.API_FAST_READ)
+
+    def test_reader_cache_is_bounded(self):
+        # Every ?fields= subset builds a reader of its own
+        names = ["unique_code", "name", "model_number", "serial_number", "description", "price", "is_active"]
+        subsets = [c for n in range(1, len(names) + 1) for c in combinations(names, n)]
+        self.assertGreater(len(subsets), fastread.READER_CACHE_SIZE)
+        for subset in subsets:
+            self.get(f"/api/products/?fields=id,{','.join(subset)}", fast=True)
+        self.assertEqual(len(fastread._readers), fastread.READER_CACHE_SIZE)
+
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class AdminChangelistQueryTests(TestCase):
+    """
+    Fixed query counts for the api changelists, so a list_display column that
+    queries per row fails here. Each count includes the session and user
+    lookups of the request; `manage.py check_admin_queries` explains a change.
+    """
+    expected_queries = {
+        Vendor: 5,
+        Department: 5,
+        Status: 5,
+        Category: 5,
+        Product: 7,
+        ProductDocument: 4,
+        TransferLog: 4,
+        RepairStatus: 5,
+        RepairLog: 5,
+        RepairMovement: 5,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        create_inventory()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_changelist_queries(self):
+        for model, count in self.expected_queries.items():
+            with self.subTest(model=model._meta.label):
+                self.assertIn(model, admin.site._registry)
+                with self.assertNumQueries(count):
+                    response = self.client.get(f"/admin/api/{model._meta.model_name}/")
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], REPLICA_APPS=["api"])
+class ReplicaRoutingTests(TransactionTestCase):
+    # TestCase wraps each test in a transaction, where the router never uses a replica
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def queries(self, func):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            result = func()
+        return result, len(primary), len(replica)
+
+    def test_safe_requests_read_from_the_replica(self):
+        response, _, replica = self.queries(lambda: self.client.get("/api/transfers/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(replica, 0)
+
+    def test_writes_use_the_primary(self):
+        response, primary, replica = self.queries(lambda: self.client.post("/api/departments/", {"name": "IT"}))
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_reads_inside_a_transaction_use_the_primary(self):
+        Department.objects.create(name="IT")
+
+        def read_in_transaction():
+            with transaction.atomic():
+                return Department.objects.count()
+
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Department), REPLICA)
+            count, primary, replica = self.queries(read_in_transaction)
+        self.assertEqual(count, 1)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_only_replica_apps_are_routed(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Department), REPLICA)
+            # accounts is not in REPLICA_APPS
+            self.assertEqual(router.db_for_read(get_user_model()), "default")
+
+    def test_replica_reads_can_be_disabled(self):
+        with replica_reads(enabled=False):
+            self.assertEqual(router.db_for_read(Department), "default")
+            _, primary, replica = self.queries(lambda: list(Department.objects.all()))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], REPLICA_PIN_SECONDS=5)
+class ReadYourWritesTests(TransactionTestCase):
+    # TestCase wraps each test in a transaction, where the router never uses a replica
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def replica_queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections[REPLICA]) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, len(queries)
+
+    def test_write_pins_the_next_read_to_the_primary(self):
+        response, replica = self.replica_queries("post", "/api/departments/", data={"name": "Finance"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica, 0)
+        pin = response[PIN_HEADER]
+
+        # The pin comes back as a header from a client that drops cookies
+        self.client.cookies.clear()
+        _, replica = self.replica_queries("get", "/api/transfers/", HTTP_X_DB_PIN=pin)
+        self.assertEqual(replica, 0)
+        _, replica = self.replica_queries("get", "/api/transfers/")
+        self.assertGreater(replica, 0)
+
+    def test_expired_or_forged_pins_are_ignored(self):
+        response = self.client.post("/api/departments/", data={"name": "Finance"})
+        pin = response[PIN_HEADER]
+        self.client.cookies.clear()
+        with mock.patch("time.time", return_value=time.time() + 10):
+            _, replica = self.replica_queries("get", "/api/transfers/", HTTP_X_DB_PIN=pin)
+        self.assertGreater(replica, 0)
+        _, replica = self.replica_queries("get", "/api/transfers/", HTTP_X_DB_PIN="primary:forged:pin")
+        self.assertGreater(replica, 0)
+
+
+class BatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        Vendor.objects.create(name="Acme")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_failing_items_do_not_fail_the_batch(self):
+        response = self.client.post("/api/batch/", {"requests": [
+            {"id": "vendors", "path": "/api/vendors/"},
+            {"id": "missing", "path": "/api/nonexistent/"},
+            {"id": "async", "path": "/api/dashboard/async/"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        statuses = {item["id"]: item["status"] for item in response.json()["responses"]}
+        self.assertEqual(statuses, {"vendors": 200, "missing": 404, "async": 400})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, DOCUMENTS_SENDFILE="")
+class DocumentDownloadTests(TestCase):
+    content = b"%PDF-1.4 0123456789"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        cls.product = create_inventory()[0]
+        cls.document = ProductDocument.objects.create(
+            product=cls.product, file=SimpleUploadedFile("manual.pdf", cls.content),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        detail = self.client.get(f"/api/products/{self.product.pk}/documents/{self.document.pk}/")
+        self.url = detail.json()["download_url"]
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_download(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range(self):
+        response, body = self.get(HTTP_RANGE="bytes=0-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[:4])
+        self.assertEqual(response["Content-Range"], f"bytes 0-3/{len(self.content)}")
+
+        response, body = self.get(HTTP_RANGE="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[-4:])
+
+    def test_if_range(self):
+        etag = self.get()[0]["ETag"]
+        response, body = self.get(HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        # A stale validator gets the whole file instead of a mismatched range
+        response, body = self.get(HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_head(self):
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertEqual(response.content, b"")
+
+    def test_not_modified(self):
+        etag = self.get()[0]["ETag"]
+        response, body = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b"")
+
+    def test_replaced_file_gets_a_new_validator(self):
+        etag = self.get()[0]["ETag"]
+        response = self.client.patch(
+            f"/api/products/{self.product.pk}/documents/{self.document.pk}/",
+            {"file": SimpleUploadedFile("manual.pdf", b"%PDF-1.7 revised")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response, body = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, b"%PDF-1.7 revised")
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ExtractExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        create_inventory()
+        RepairLog.objects.update(sent_date=date.today())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_date_filters(self):
+        today = date.today().isoformat()
+        for entity in ("transfers", "repairs"):
+            with self.subTest(entity=entity):
+                response = self.client.post(f"/api/export/{entity}/csv/", {"date_from": today}, format="json")
+                self.assertEqual(response.status_code, 200)
+                rows = b"".join(response.streaming_content).decode().splitlines()
+                self.assertGreater(len(rows), 1)
+
+                for bad in ("2024-13-01", "yesterday", 20240101):
+                    response = self.client.post(f"/api/export/{entity}/csv/", {"date_to": bad}, format="json")
+                    self.assertEqual(response.status_code, 400, bad)
+
+
+class WarrantyExpiringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_out_of_range_windows_are_rejected(self):
+        response = self.client.get("/api/products/warranty-expiring/?days=3650&buckets=30,3650")
+        self.assertEqual(response.status_code, 200)
+        for query in ("days=99999999", "days=-1", "days=x", "buckets=30,99999999", "buckets=0"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/products/warranty-expiring/?{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportScheduleLockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_inventory()
+        cls.schedule = ReportSchedule.objects.create(name="Transfers", report=ReportSchedule.TRANSFERS_CSV)
+
+    def test_a_held_lease_skips_the_run(self):
+        ReportSchedule.objects.update(locked_until=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(reports.run_schedule(self.schedule, force=True))
+        self.assertFalse(self.schedule.snapshots.exists())
+
+    def test_an_expired_lease_is_taken_over_and_released(self):
+        ReportSchedule.objects.update(locked_until=timezone.now() - timedelta(minutes=5))
+        self.assertIsNotNone(reports.run_schedule(self.schedule, force=True))
+        self.schedule.refresh_from_db()
+        self.assertIsNone(self.schedule.locked_until)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor = Vendor.objects.create(name="Acme")
+
+    def test_matching_etag_is_not_modified(self):
+        for url in ("/api/vendors/", f"/api/vendors/{self.vendor.pk}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get("/api/vendors/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/vendors/{self.vendor.pk}/", {"name": "Acme Ltd"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/api/vendors/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["results"][0]["name"], "Acme Ltd")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChangeFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        cls.products = create_inventory()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def changes(self, url, since):
+        response = self.client.get(url, {"since": since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @mock.patch.object(VendorViewSet, "change_feed_limit", 2)
+    def test_paging(self):
+        cursor = self.client.get("/api/vendors/changes/").json()["cursor"]
+        with self.captureOnCommitCallbacks(execute=True):
+            vendors = [Vendor.objects.create(name=name) for name in ("A", "B", "C")]
+        with self.captureOnCommitCallbacks(execute=True):
+            vendors[0].is_active = False
+            vendors[0].save()
+
+        # A row deactivated since is reported as deleted on every page it appears on
+        page = self.changes("/api/vendors/changes/", cursor)
+        self.assertTrue(page["has_more"])
+        self.assertEqual([row["id"] for row in page["upserted"]], [vendors[1].pk])
+        self.assertEqual(page["deleted"], [vendors[0].pk])
+
+        page = self.changes("/api/vendors/changes/", page["cursor"])
+        self.assertFalse(page["has_more"])
+        self.assertEqual([row["id"] for row in page["upserted"]], [vendors[2].pk])
+        self.assertEqual(page["deleted"], [vendors[0].pk])
+
+        self.assertEqual(self.changes("/api/vendors/changes/", page["cursor"])["upserted"], [])
+        self.assertEqual(self.client.get("/api/vendors/changes/?since=x").status_code, 400)
+
+    @mock.patch("api.signals.schedule_preview")
+    def test_nested_feeds_are_scoped_to_their_parent(self, schedule_preview):
+        first, second = self.products[:2]
+        cursor = self.client.get(f"/api/products/{first.pk}/documents/changes/").json()["cursor"]
+        with self.captureOnCommitCallbacks(execute=True):
+            mine = ProductDocument.objects.create(product=first, file=SimpleUploadedFile("a.pdf", b"%PDF"))
+            ProductDocument.objects.create(product=second, file=SimpleUploadedFile("b.pdf", b"%PDF"))
+
+        page = self.changes(f"/api/products/{first.pk}/documents/changes/", cursor)
+        self.assertEqual([row["id"] for row in page["upserted"]], [mine.pk])
+
+        pk = mine.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            mine.delete()
+        page = self.changes(f"/api/products/{first.pk}/documents/changes/", page["cursor"])
+        self.assertEqual(page["deleted"], [pk])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TCOCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            phone="01700000000", password="x", first_name="Test", last_name="User",
+        )
+        cls.products = create_inventory()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def purchase_value(self):
+        response = self.client.get("/api/tco/categories/?as_of=2025-01-01")
+        self.assertEqual(response.status_code, 200)
+        return sum(row["purchase_value"] for row in response.json())
+
+    def test_write_invalidates_cached_totals(self):
+        before = self.purchase_value()
+        with mock.patch("api.depreciation.product_frame") as product_frame:
+            self.assertEqual(self.purchase_value(), before)
+        self.assertFalse(product_frame.called, "the second request was not served from the cache")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product = self.products[0]
+            product.price = "5000.00"
+            product.save()
+        self.assertNotEqual(self.purchase_value(), before)
@@ -1,6 +1,6 @@
 from rest_framework.routers import DefaultRouter
-from .views import VendorViewSet, DepartmentViewSet, StatusViewSet, CategoryViewSet, ProductViewSet, ProductDocumentViewSet, TransferLogViewSet, RepairStatusViewSet, RepairLogViewSet, ProductExportExcelView, ProductExportPDFView, DashboardViewSet
-from django.urls import path, include
+from .views import VendorViewSet, DepartmentViewSet, StatusViewSet, CategoryViewSet, ProductViewSet, ProductDocumentViewSet, TransferLogViewSet, RepairStatusViewSet, RepairLogViewSet, ProductExportExcelView, ProductExportPDFView, ExtractExportView, DashboardViewSet, TCOViewSet, ReportViewSet, ListCacheStatsView, BatchView, dashboard_async, event_stream
+from django.urls import path, re_path, include
 
 router = DefaultRouter()
 router.register(r'vendors', VendorViewSet, basename='vendor')
@@ -13,13 +13,23 @@ router.register(r'transfers', TransferLogViewSet, basename='transfer')
 router.register(r'repair-statuses', RepairStatusViewSet, basename='repair-status')
 router.register(r'repairs', RepairLogViewSet, basename='repair')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'tco', TCOViewSet, basename='tco')
+router.register(r'reports', ReportViewSet, basename='report')
 
 
 export_routes = [
     path('export/products/excel/', ProductExportExcelView.as_view(), name='export-products-excel'),
     path('export/products/pdf/', ProductExportPDFView.as_view(), name='export-products-pdf'),
+    re_path(r'^export/(?P<entity>[a-z]+)/(?P<fmt>csv|parquet)/$', ExtractExportView.as_view(), name='export-extract'),
 ]
 
 
-urlpatterns = router.urls + export_routes
+urlpatterns = [
+    # Before the router, whose dashboard/<pk>/ route would match it first
+    path('dashboard/async/', dashboard_async, name='dashboard-async'),
+] + router.urls + export_routes + [
+    path('cache-stats/', ListCacheStatsView.as_view(), name='cache-stats'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('events/', event_stream, name='events'),
+]
 
@@ -1,28 +1,22 @@
 from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import Vendor, Department, Status, Category, Product, ProductDocument, TransferLog, RepairStatus, RepairLog, RepairMovement
-from .serializers import VendorSerializer, DepartmentSerializer, StatusSerializer, CategorySerializer, ProductDocumentSerializer, ProductSerializer, TransferLogSerializer, RepairStatusSerializer, RepairLogSerializer, RepairMovementSerializer
+from .models import Vendor, Department, Status, Category, Product, ProductDocument, ProductListing, TransferLog, RepairStatus, RepairLog, RepairMovement, ReportSchedule
+from .serializers import VendorSerializer, DepartmentSerializer, StatusSerializer, CategorySerializer, ProductDocumentSerializer, ProductSerializer, ProductListingSerializer, PRODUCT_COMPACT_FIELDS, TransferLogSerializer, RepairStatusSerializer, RepairLogSerializer, RepairMovementSerializer, ReportScheduleSerializer
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from django.db import transaction
 from django.db.models import Count
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
 
-import io
-import pandas as pd
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib.units import cm
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment
-from openpyxl.utils import get_column_letter
 
 
 from rest_framework import viewsets
@@ -30,10 +24,27 @@ from rest_framework.response import Response
 from django.db.models import Sum, Count, F, DecimalField
 from .models import Product, RepairLog, TransferLog, Vendor, Department, Status, Category
 
-from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions 
-
-
-class VendorViewSet(ModelViewSet):
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, DjangoModelPermissions 
+from .downloads import PassthroughRenderer, serve_document, serve_file, spool
+from . import warranty
+from .sync import ChangeFeedMixin
+from .conditional import ConditionalGetMixin
+from .cache import CachedListMixin, stats as list_cache_stats
+from .listing import ProductSearchFilter, filter_listing
+from .fastread import FastReadMixin
+from monitoring.serializers import SerializerMetricsMixin
+from django.db.models import Prefetch
+from .depreciation import tco_by
+from . import extracts
+from .batch import run_batch
+from . import dashboard, events
+from datetime import date
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+
+
+class VendorViewSet(SerializerMetricsMixin, ConditionalGetMixin, CachedListMixin, ChangeFeedMixin, ModelViewSet):
     queryset = Vendor.objects.filter(is_active=True).order_by("-created_at")
     serializer_class = VendorSerializer
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
@@ -47,7 +58,7 @@ class VendorViewSet(ModelViewSet):
         instance.save(update_fields=["is_active"])
 
 
-class DepartmentViewSet(ModelViewSet):
+class DepartmentViewSet(SerializerMetricsMixin, ConditionalGetMixin, CachedListMixin, ChangeFeedMixin, ModelViewSet):
     queryset = Department.objects.filter(is_active=True).order_by("-created_at")
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
@@ -61,7 +72,7 @@ class DepartmentViewSet(ModelViewSet):
         instance.save(update_fields=["is_active"])
 
 
-class StatusViewSet(ModelViewSet):
+class StatusViewSet(SerializerMetricsMixin, ConditionalGetMixin, CachedListMixin, ChangeFeedMixin, ModelViewSet):
     queryset = Status.objects.filter(is_active=True).order_by("name")
     serializer_class = StatusSerializer
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
@@ -74,7 +85,7 @@ class StatusViewSet(ModelViewSet):
         instance.save(update_fields=["is_active"])
 
 
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(SerializerMetricsMixin, ConditionalGetMixin, CachedListMixin, ChangeFeedMixin, ModelViewSet):
     queryset = Category.objects.filter(is_active=True).order_by("name")
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
@@ -86,17 +97,91 @@ class CategoryViewSet(ModelViewSet):
         instance.is_active = False
         instance.save(update_fields=["is_active"])
 
-class ProductViewSet(ModelViewSet):
+# What each serializer field needs from the database: (select_related, only() columns)
+PRODUCT_FIELD_DEPENDENCIES = {
+    "vendor_name": ("vendor", ["vendor", "vendor__name"]),
+    "department_name": ("current_department", ["current_department", "current_department__name"]),
+    "category_name": ("category", ["category", "category__name"]),
+    "status_name": ("status", ["status", "status__name"]),
+    "documents": (None, []),
+}
+
+# Stable document order so every read path renders the same nested list
+DOCUMENTS_PREFETCH = Prefetch("documents", queryset=ProductDocument.objects.order_by("pk"))
+
+
+class ProductViewSet(SerializerMetricsMixin, ConditionalGetMixin, FastReadMixin, ChangeFeedMixin, ModelViewSet):
     queryset = Product.objects.filter(is_active=True).select_related(
-        "vendor", "current_department", "status"
-    ).prefetch_related("documents").order_by("-created_at")
+        "vendor", "current_department", "category", "status"
+    ).prefetch_related(DOCUMENTS_PREFETCH).order_by("-created_at")
     serializer_class = ProductSerializer
+    conditional_models = ["product", "vendor", "department", "category", "status", "productdocument"]
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, OrderingFilter]
     filterset_fields = ["status", "category", "current_department"]
     search_fields = ["unique_code", "name", "vendor__name", "current_department__name", "warranty_years"]
+    listing_search_fields = ["unique_code", "name", "vendor_name", "department_name", "warranty_years"]
     ordering_fields = ["created_at", "name", "price"]
 
+    def uses_listing(self):
+        # ?flat=1 serves the list from the denormalised ProductListing table
+        return self.action == "list" and self.request.query_params.get("flat") in ("1", "true")
+
+    def get_requested_fields(self):
+        """Fields picked with ?fields=a,b or ?compact=1 on reads; None means all."""
+        if self.action not in ("list", "retrieve"):
+            return None
+        params = self.request.query_params
+        if params.get("fields"):
+            return [f.strip() for f in params["fields"].split(",") if f.strip()]
+        if params.get("compact") in ("1", "true"):
+            return PRODUCT_COMPACT_FIELDS
+        return None
+
+    def get_queryset(self):
+        fields = self.get_requested_fields()
+
+        if self.uses_listing():
+            qs = ProductListing.objects.filter(is_active=True).order_by("-created_at")
+            if fields:
+                concrete = {f.name for f in ProductListing._meta.concrete_fields}
+                columns = {"product" if f == "id" else f for f in fields} & concrete
+                qs = qs.only("product", *columns)
+            return qs
+
+        if not fields:
+            return super().get_queryset()
+
+        # Shrink joins, prefetches and selected columns to the requested fields
+        model_fields = {f.name for f in Product._meta.concrete_fields}
+        select_related, columns = set(), {"id"}
+        for name in fields:
+            if name in PRODUCT_FIELD_DEPENDENCIES:
+                relation, extra_columns = PRODUCT_FIELD_DEPENDENCIES[name]
+                if relation:
+                    select_related.add(relation)
+                columns.update(extra_columns)
+            elif name in model_fields:
+                columns.add(name)
+
+        qs = Product.objects.filter(is_active=True).order_by("-created_at")
+        if select_related:
+            qs = qs.select_related(*select_related)
+        if "documents" in fields:
+            qs = qs.prefetch_related(DOCUMENTS_PREFETCH)
+        return qs.only(*columns)
+
+    def get_serializer_class(self):
+        if self.uses_listing():
+            return ProductListingSerializer
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save(update_fields=["is_active"])
@@ -133,8 +218,28 @@ class ProductViewSet(ModelViewSet):
 
         return super().partial_update(request, *args, **kwargs)
 
+    @action(detail=False, methods=["get"], url_path="warranty-expiring")
+    def warranty_expiring(self, request):
+        try:
+            days = warranty.parse_days(request.query_params.get("days"))
+            bounds = warranty.parse_buckets(request.query_params.get("buckets"))
+        except ValueError:
+            return Response(
+                {"error": f"days and buckets must be whole numbers up to {warranty.MAX_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = warranty.expiring_within(days).select_related(
+            "vendor", "current_department", "category", "status"
+        ).prefetch_related(DOCUMENTS_PREFETCH).order_by("warranty_end_date")
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data["buckets"] = warranty.expiring_buckets(bounds)
+        return response
+
 
-class ProductDocumentViewSet(ModelViewSet):
+class ProductDocumentViewSet(SerializerMetricsMixin, ConditionalGetMixin, ChangeFeedMixin, ModelViewSet):
     serializer_class = ProductDocumentSerializer
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
 
@@ -142,228 +247,84 @@ class ProductDocumentViewSet(ModelViewSet):
         product_id = self.kwargs.get("product_id")
         return ProductDocument.objects.filter(product_id=product_id).order_by("-uploaded_at")
 
+    def get_change_scope(self):
+        return int(self.kwargs["product_id"])
+
+    @action(detail=True, methods=["get"], renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def download(self, request, *args, **kwargs):
+        document = self.get_object()
+        return serve_document(request, document)
+
 
 # Excel Export
 class ProductExportExcelView(APIView):
+    replica_reads = True
 
     def post(self, request, *args, **kwargs):
-        filters = request.data
-        qs = Product.objects.filter(is_active=True)
-
-        # Apply filters
-        search = filters.get("search")
-        status = filters.get("status")
-        category = filters.get("category")
-        department = filters.get("department")
-        ordering = filters.get("ordering", "-created_at")
-
-        if search:
-            qs = qs.filter(unique_code__icontains=search) | qs.filter(name__icontains=search)
-        if status:
-            qs = qs.filter(status_id=status)
-        if category:
-            qs = qs.filter(category_id=category)
-        if department:
-            qs = qs.filter(current_department_id=department)
-
-        qs = qs.order_by(ordering)
-
-       
-        data = []
-        for p in qs:
-            data.append({
-                "ID": p.unique_code,
-                "Name": p.name,
-                "Model Number": p.model_number,
-                "Serial Number": p.serial_number,
-                "Description": p.description,
-                "Category": p.category.name if p.category else "",
-                "Department": p.current_department.name if p.current_department else "",
-                "Vendor": p.vendor.name if p.vendor else "",
-                "Price": float(p.price),
-                "Purchase Date": p.purchase_date.strftime("%d-%m-%Y") if p.purchase_date else "",
-                "Warranty": f"{p.warranty_years} years" if p.warranty_years else "",
-                "Warranty End": p.warranty_end_date.strftime("%d-%m-%Y") if p.warranty_end_date else "",
-                "Status": p.status.name if p.status else "",
-                "Created At": p.created_at.strftime("%d-%m-%Y %H:%M:%S"),
-                "Updated At": p.updated_at.strftime("%d-%m-%Y %H:%M:%S"),
-            })
-
-        df = pd.DataFrame(data)
-
-        # Create Excel
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Products")
-            sheet = writer.book["Products"]
-
-            # Style header
-            header_font = Font(bold=True)
-            for cell in sheet[1]:
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center")
-
-            # Auto column width
-            for col in sheet.columns:
-                max_length = 0
-                col_letter = get_column_letter(col[0].column)
-                for cell in col:
-                    try:
-                        max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                sheet.column_dimensions[col_letter].width = max_length + 4
-
-            # Freeze header
-            sheet.freeze_panes = "A2"
-
-        buffer.seek(0)
-
-        response = HttpResponse(
-            buffer,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        from .exports import write_products_excel
+
+        qs = filter_listing(request.data)
+        workbook = spool(write_products_excel, qs)
+        return FileResponse(
+            workbook,
+            as_attachment=True,
+            filename="products.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
-        response["Content-Disposition"] = "attachment; filename=products.xlsx"
-        return response
 
 
 
 
 # Export PDF
 class ProductExportPDFView(APIView):
+    replica_reads = True
+
     def post(self, request, *args, **kwargs):
-        filters = request.data
-        qs = Product.objects.filter(is_active=True)
-
-        # Apply filters
-        search = filters.get("search")
-        status = filters.get("status")
-        category = filters.get("category")
-        department = filters.get("department")
-        ordering = filters.get("ordering", "-created_at")
-
-        if search:
-            qs = qs.filter(unique_code__icontains=search) | qs.filter(name__icontains=search)
-        if status:
-            qs = qs.filter(status_id=status)
-        if category:
-            qs = qs.filter(category_id=category)
-        if department:
-            qs = qs.filter(current_department_id=department)
-
-        qs = qs.order_by(ordering)
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=landscape(A4),
-            leftMargin=1*cm,
-            rightMargin=1*cm,
-            topMargin=2*cm,
-            bottomMargin=1*cm
-        )
+        from .exports import write_products_pdf
 
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Title
-        title_style = styles["Title"]
-        title_style.fontSize = 18
-        title_style.leading = 22
-        title = Paragraph("Products Report", title_style)
-        elements.append(title)
-        elements.append(Spacer(1, 12))
-
-        # Table headers
-        headers = ["SL", "ID", "Name", "Category", "Department", "Vendor", "Price", "Purchase", "Warranty", "End", "Status"]
-        data = [headers]
-
-        # Wrap long text using Paragraph
-        wrap_style = styles["BodyText"]
-        wrap_style.fontSize = 9
-        wrap_style.leading = 11
-
-        for i, prod in enumerate(qs, start=1):
-            row = [
-                str(i),
-                prod.unique_code,
-                Paragraph(prod.name if prod.name else "-", wrap_style),
-                Paragraph(prod.category.name if prod.category else "-", wrap_style),
-                Paragraph(prod.current_department.name if prod.current_department else "-", wrap_style),
-                Paragraph(prod.vendor.name if prod.vendor else "-", wrap_style),
-                f"{prod.price:.2f}",
-                prod.purchase_date.strftime("%d-%m-%Y") if prod.purchase_date else "-",
-                f"{prod.warranty_years}y" if prod.warranty_years else "-",
-                prod.warranty_end_date.strftime("%d-%m-%Y") if prod.warranty_end_date else "-",
-                Paragraph(prod.status.name if prod.status else "-", wrap_style),
-            ]
-            data.append(row)
-
-        # Column widths (compact and balanced)
-        col_widths = [
-            1.0*cm,   # SL
-            2.0*cm,   # ID
-            5.5*cm,   # Name
-            3.0*cm,   # Category
-            3.0*cm,   # Department
-            3.0*cm,   # Vendor
-            2.0*cm,   # Price
-            2.0*cm,   # Purchase
-            1.9*cm,   # Warranty
-            2.0*cm,   # End
-            2.0*cm,   # Status
-        ]
-
-        table = Table(data, colWidths=col_widths, repeatRows=1)
-
-        # Professional table style
-        style = TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 11),
-            ("FONTSIZE", (0, 1), (-1, -1), 9),
-            ("GRID", (0, 0), (-1, -1), 0.4, colors.grey),
-            ("LEFTPADDING", (0, 0), (-1, -1), 3),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 3),
-            ("TOPPADDING", (0, 0), (-1, -1), 3),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-        ])
-
-        # Alternating row colors
-        for i in range(1, len(data)):
-            if i % 2 == 0:
-                style.add("BACKGROUND", (0, i), (-1, i), colors.HexColor("#fafafa"))
-
-        table.setStyle(style)
-        elements.append(table)
-
-        # Header & Footer
-        def header_footer(canvas_obj, doc_obj):
-            canvas_obj.saveState()
-            canvas_obj.setFont("Helvetica-Bold", 14)
-            canvas_obj.drawString(2*cm, doc_obj.pagesize[1] - 1.5*cm, "Feni Diabetes Hospital")
-            canvas_obj.setFont("Helvetica", 9)
-            canvas_obj.drawRightString(doc_obj.pagesize[0] - 2*cm, 1*cm, f"Page {doc_obj.page}")
-            canvas_obj.restoreState()
-
-        # Build PDF
-        doc.build(elements, onFirstPage=header_footer, onLaterPages=header_footer)
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = "attachment; filename=products.pdf"
-        return response
+        qs = filter_listing(request.data)
+        pdf = spool(write_products_pdf, qs)
+        return FileResponse(pdf, as_attachment=True, filename="products.pdf", content_type="application/pdf")
+
+
+
+# CSV / Parquet extracts
+class ExtractExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+
+    def post(self, request, entity, fmt, *args, **kwargs):
+        if entity not in extracts.ENTITIES:
+            return Response({"error": f"Unknown export '{entity}'"}, status=status.HTTP_404_NOT_FOUND)
+
+        # The extract is written before the response starts, so bad filters
+        # have to be caught here rather than surface as a 500
+        filters = dict(request.data.items())
+        try:
+            for key in ("date_from", "date_to"):
+                if filters.get(key):
+                    filters[key] = date.fromisoformat(filters[key])
+        except (TypeError, ValueError):
+            return Response({"error": f"{key} must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        compress = request.query_params.get("gzip") in ("1", "true")
+        fileobj = spool(extracts.write_extract, entity, fmt, filters, compress=compress)
+        content_type = "application/gzip" if compress and fmt == "csv" else extracts.FORMATS[fmt][0]
+        return FileResponse(
+            fileobj,
+            as_attachment=True,
+            filename=extracts.extract_filename(entity, fmt, compress),
+            content_type=content_type,
+        )
 
 
 
-class TransferLogViewSet(ModelViewSet):
+class TransferLogViewSet(SerializerMetricsMixin, ConditionalGetMixin, FastReadMixin, ChangeFeedMixin, ModelViewSet):
     queryset = TransferLog.objects.select_related(
         "product", "from_department", "to_department"
     ).order_by("-created_at")
     serializer_class = TransferLogSerializer
+    conditional_models = ["transferlog", "product", "department"]
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
     filter_backends = [SearchFilter]
     search_fields = ['product__unique_code', 'product__name', 'from_department__name', 'to_department__name']
@@ -380,9 +341,10 @@ class TransferLogViewSet(ModelViewSet):
             transfer.product.current_department = transfer.to_department
             transfer.product.save(update_fields=["current_department"])
 
-class RepairStatusViewSet(ModelViewSet):
+class RepairStatusViewSet(SerializerMetricsMixin, ConditionalGetMixin, CachedListMixin, ChangeFeedMixin, ModelViewSet):
     queryset = RepairStatus.objects.filter(is_active=True).order_by("-created_at")
     serializer_class = RepairStatusSerializer
+    conditional_models = ["repairstatus", "status"]
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ["name"]
@@ -395,9 +357,10 @@ class RepairStatusViewSet(ModelViewSet):
 
 
 
-class RepairLogViewSet(ModelViewSet):
+class RepairLogViewSet(SerializerMetricsMixin, ConditionalGetMixin, ChangeFeedMixin, ModelViewSet):
     queryset = RepairLog.objects.select_related("product", "status", "repair_vendor").order_by("-created_at")
     serializer_class = RepairLogSerializer
+    conditional_models = ["repairlog", "product", "repairstatus", "vendor"]
     pagination_class = None 
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
     def perform_create(self, serializer):
@@ -451,11 +414,12 @@ class RepairLogViewSet(ModelViewSet):
 
 
 
-class RepairMovementViewSet(ModelViewSet):
+class RepairMovementViewSet(SerializerMetricsMixin, ConditionalGetMixin, FastReadMixin, ChangeFeedMixin, ModelViewSet):
     queryset = RepairMovement.objects.select_related(
         "product", "repair", "status", "to_vendor", "from_department"
     ).order_by("-changed_at")
     serializer_class = RepairMovementSerializer
+    conditional_models = ["repairmovement", "product", "repairstatus", "vendor", "department"]
     permission_classes = [IsAuthenticated, DjangoModelPermissions] 
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = [
@@ -475,49 +439,148 @@ class DashboardViewSet(viewsets.ViewSet):
 
     def list(self, request):
         try:
-            # ================= SUMMARY =================
-            summary = {
-                "total_products": Product.objects.filter(is_active=True).count(),
-                "total_repairs": RepairLog.objects.filter(is_active=True).count(),
-                "total_transfers": TransferLog.objects.filter(product__is_active=True).count(),
-                "total_vendors": Vendor.objects.filter(is_active=True).count(),
-                "total_departments": Department.objects.filter(is_active=True).count(),
-                "total_categories": Category.objects.filter(is_active=True).count(),
-                "total_product_value": Product.objects.aggregate(
-                    total=Sum(F("price"), output_field=DecimalField())
-                )["total"] or 0,
-                "total_repair_cost": RepairLog.objects.aggregate(
-                    total=Sum(F("repair_cost"), output_field=DecimalField())
-                )["total"] or 0,
-            }
-
-            department_products = (
-                Product.objects.filter(is_active=True)
-                .values(dept=F('current_department__name'))
-                .annotate(count=Count('id'))
-                .order_by('dept')
-            )
+            return Response(dashboard.build())
+        except Exception as e:
+            return Response({"error": str(e)}, status=500)
+
+
+async def dashboard_async(request):
+    """
+    The dashboard as an async view for the ASGI app: the aggregates run on the
+    dashboard thread pool while the event loop stays free for other requests.
+    """
+    try:
+        data, status_code = await dashboard.abuild(), 200
+    except Exception as e:
+        data, status_code = {"error": str(e)}, 500
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+def _stream_token(request):
+    """The validated access token of an active user, from ?token= or the Authorization header."""
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    auth = JWTAuthentication()
+    try:
+        raw = request.GET.get("token") or auth.get_raw_token(auth.get_header(request) or b"")
+        if not raw:
+            return None
+        token = auth.get_validated_token(raw)
+        auth.get_user(token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return token
+
+
+async def event_stream(request):
+    """
+    Live change events as Server-Sent Events, for the ASGI app (see api/events.py).
+    EventSource cannot send headers, so the access token may come as ?token=.
+    The stream ends when the token expires; the client reconnects with a new one.
+    """
+    if not isinstance(request, ASGIRequest):
+        # WSGI would buffer the endless stream in a worker thread
+        return HttpResponse(
+            JSONRenderer().render({"error": "The event stream is only served by the ASGI app"}),
+            status=status.HTTP_501_NOT_IMPLEMENTED, content_type="application/json",
+        )
+    token = await sync_to_async(_stream_token)(request)
+    if token is None:
+        return HttpResponse(
+            JSONRenderer().render({"error": "A valid access token is required"}),
+            status=status.HTTP_401_UNAUTHORIZED, content_type="application/json",
+        )
 
-            product_status_counts = Product.objects.filter(is_active=True).values(status_name=F('status__name')).annotate(value=Count('id'))
+    async def frames():
+        subscription = events.broker.subscribe()
+        try:
+            yield f"retry: {events.RETRY_MS}\n\n"
+            while (remaining := token["exp"] - time.time()) > 0:
+                try:
+                    yield await asyncio.wait_for(subscription.get(), min(remaining, settings.EVENTS_HEARTBEAT))
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+        finally:
+            events.broker.unsubscribe(subscription)
 
-            
-            repair_status_counts = RepairLog.objects.filter(is_active=True).values("status__name").annotate(
-                value=Count("id")
-            )
-            product_category_counts = Product.objects.filter(is_active=True).values("category__name").annotate(
-                value=Count("id")
-            )
-            product_vendor_counts = Product.objects.filter(is_active=True).values("vendor__name").annotate(
-                value=Count("id")
-            )
+    response = StreamingHttpResponse(frames(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
-            return Response({
-                "summary": summary,
-                "department_products": list(department_products),
-                "repair_status_counts": list(repair_status_counts),
-                "product_category_counts": list(product_category_counts),
-                "product_vendor_counts": list(product_vendor_counts),
-                "product_status_counts": list(product_status_counts),
-            })
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
\ No newline at end of file
+
+
+class TCOViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def _as_of(self, request):
+        raw = request.query_params.get("as_of")
+        return date.fromisoformat(raw) if raw else None
+
+    def _respond(self, request, group):
+        try:
+            as_of = self._as_of(request)
+        except ValueError:
+            return Response({"error": "as_of must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(tco_by(group, as_of))
+
+    @action(detail=False, methods=["get"])
+    def departments(self, request):
+        return self._respond(request, "department")
+
+    @action(detail=False, methods=["get"])
+    def categories(self, request):
+        return self._respond(request, "category")
+
+
+class ReportViewSet(SerializerMetricsMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ReportSchedule.objects.filter(is_active=True).prefetch_related("snapshots").order_by("name")
+    serializer_class = ReportScheduleSerializer
+    permission_classes = [IsAuthenticated, DjangoModelPermissions]
+
+    @action(detail=True, methods=["get"], renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def download(self, request, pk=None):
+        """Latest snapshot, or an older one still kept with `?snapshot=<id>`."""
+        snapshots = self.get_object().snapshots.all()
+        snapshot_id = request.query_params.get("snapshot")
+        if snapshot_id:
+            snapshots = [s for s in snapshots if str(s.pk) == snapshot_id]
+        if not snapshots:
+            return Response({"error": "No snapshot available"}, status=status.HTTP_404_NOT_FOUND)
+
+        snapshot = snapshots[0]
+        return serve_file(
+            request, snapshot.file, snapshot.size, snapshot.checksum, snapshot.generated_at, attachment=True,
+        )
+
+
+class ListCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(list_cache_stats.snapshot())
+
+
+class BatchView(APIView):
+    """
+    Run several GET requests in one round trip:
+    {"requests": [{"id": "vendors", "path": "/api/vendors/"}, ...], "concurrent": false}
+    Each result carries its id, status, ETag/Last-Modified headers and JSON body.
+    """
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+
+    def post(self, request):
+        items = request.data.get("requests") if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({"error": "'requests' must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {"error": f"At most {settings.BATCH_MAX_REQUESTS} requests per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        body = run_batch(request, items, concurrent=bool(request.data.get("concurrent")))
+        return HttpResponse(body, content_type="application/json")
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Product
+
+
+DEFAULT_BUCKETS = (30, 60, 90)
+# Ten years ahead; larger windows would overflow date arithmetic
+MAX_DAYS = 3650
+
+
+def active_with_warranty():
+    # Matches the partial index on warranty_end_date WHERE is_active
+    return Product.objects.filter(is_active=True, warranty_end_date__isnull=False)
+
+
+def parse_days(raw, default=30):
+    """Parse a look-ahead window in days, 0 to MAX_DAYS."""
+    if raw in (None, ""):
+        return default
+    days = int(raw)
+    if not 0 <= days <= MAX_DAYS:
+        raise ValueError(f"Days must be between 0 and {MAX_DAYS}.")
+    return days
+
+
+def parse_buckets(raw):
+    """Parse "30,60,90" into a sorted tuple of positive day bounds up to MAX_DAYS."""
+    if not raw:
+        return DEFAULT_BUCKETS
+    bounds = sorted({int(b) for b in str(raw).split(",") if b.strip()})
+    if not bounds or bounds[0] <= 0 or bounds[-1] > MAX_DAYS:
+        raise ValueError(f"Buckets must be day counts between 1 and {MAX_DAYS}.")
+    return tuple(bounds)
+
+
+def expiring_within(days, today=None):
+    today = today or timezone.localdate()
+    return active_with_warranty().filter(
+        warranty_end_date__gte=today,
+        warranty_end_date__lte=today + timedelta(days=days),
+    )
+
+
+def expiring_buckets(bounds=DEFAULT_BUCKETS, today=None):
+    """
+    Count products whose warranty ends in each day range, e.g. 0-30, 31-60,
+    61-90, plus already expired ones. Runs as a single aggregate query.
+    """
+    today = today or timezone.localdate()
+    ranges = []
+    start = 0
+    for end in bounds:
+        ranges.append((f"{start}-{end}", start, end))
+        start = end + 1
+
+    aggregates = {
+        "expired": Count("id", filter=Q(warranty_end_date__lt=today)),
+    }
+    for label, lo, hi in ranges:
+        aggregates[label] = Count("id", filter=Q(
+            warranty_end_date__gte=today + timedelta(days=lo),
+            warranty_end_date__lte=today + timedelta(days=hi),
+        ))
+
+    counts = active_with_warranty().aggregate(**aggregates)
+
+    buckets = [{"label": "expired", "from": None, "to": str(today - timedelta(days=1)), "count": counts["expired"]}]
+    for label, lo, hi in ranges:
+        buckets.append({
+            "label": label,
+            "from": str(today + timedelta(days=lo)),
+            "to": str(today + timedelta(days=hi)),
+            "count": counts[label],
+        })
+    return buckets
+
+
+def expiring_by_month(months=12, today=None):
+    """Upcoming warranty expiries grouped by calendar month, for the dashboard."""
+    today = today or timezone.localdate()
+    end_year = today.year + (today.month - 1 + months) // 12
+    end_month = (today.month - 1 + months) % 12 + 1
+    rows = (
+        active_with_warranty()
+        .filter(warranty_end_date__gte=today, warranty_end_date__lt=date(end_year, end_month, 1))
+        .annotate(month=TruncMonth("warranty_end_date"))
+        .values("month")
+        .annotate(count=Count("id"))
+        .order_by("month")
+    )
+    return [{"month": row["month"].strftime("%Y-%m"), "count": row["count"]} for row in rows]
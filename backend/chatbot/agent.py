@@ -1,16 +1,22 @@
-from groq import Groq
+from typing import TYPE_CHECKING
+
 from django.conf import settings
-from django.db import connection
+from django.db import connections
+from it_asset_management_system.db_routers import read_alias
+from monitoring.metrics import CHATBOT_PHASE
+
+if TYPE_CHECKING:
+    from groq import Groq
 
 # ── Safety: only allow SELECT statements ─────────────────────────────────────
 def is_safe_sql(sql: str) -> bool:
     cleaned = sql.strip().lstrip(";").strip().lower()
     return cleaned.startswith("select")
 
-# ── Execute SQL directly via Django connection ────────────────────────────────
+# ── Execute SQL directly via Django connection (replica when configured) ──────
 def run_sql(sql: str) -> str:
     try:
-        with connection.cursor() as cursor:
+        with connections[read_alias()].cursor() as cursor:
             cursor.execute(sql)
             rows = cursor.fetchmany(50)
             columns = [col[0] for col in cursor.description]
@@ -27,6 +33,7 @@ def run_sql(sql: str) -> str:
 # ── Get DB schema for relevant tables only ────────────────────────────────────
 def get_schema() -> str:
     tables = [
+        "api_productlisting",
         "api_product",
         "api_category",
         "api_department",
@@ -38,7 +45,7 @@ def get_schema() -> str:
         "accounts_user",
     ]
     schema_parts = []
-    with connection.cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         for table in tables:
             try:
                 cursor.execute("""
@@ -67,7 +74,7 @@ def clear_history(session_id: str):
     _history_store[session_id] = []
 
 # ── Step 1: Generate SQL from question ───────────────────────────────────────
-def generate_sql(client: Groq, question: str, schema: str) -> str:
+def generate_sql(client: "Groq", question: str, schema: str) -> str:
     response = client.chat.completions.create(
         model="llama-3.3-70b-versatile",
         max_tokens=512,
@@ -78,6 +85,7 @@ def generate_sql(client: Groq, question: str, schema: str) -> str:
                 "content": f"""You are a PostgreSQL expert. Given the schema below, write a single SELECT query to answer the question.
 Return ONLY the raw SQL query — no explanation, no markdown, no backticks, no semicolon at the end.
 If the question cannot be answered from the schema, return exactly: CANNOT_ANSWER
+For questions about products, prefer api_productlisting: it already holds the category, vendor, department and status names, so no joins are needed. Only active products have is_active = true.
 
 Schema:
 {schema}"""
@@ -91,7 +99,7 @@ Schema:
     return response.choices[0].message.content.strip()
 
 # ── Step 2: Format SQL result as natural language ─────────────────────────────
-def format_answer(client: Groq, question: str, sql: str, result: str, history: list) -> str:
+def format_answer(client: "Groq", question: str, sql: str, result: str, history: list) -> str:
     messages = [
         {
             "role": "system",
@@ -126,14 +134,20 @@ If the result is empty or says 'No results found', say no data was found."""
     )
     return response.choices[0].message.content.strip()
 
+# ── LLM client (groq is imported on first use to keep it out of worker startup) ─
+def get_client() -> "Groq":
+    from groq import Groq
+    return Groq(api_key=settings.GROQ_API_KEY)
+
 # ── Main entry point ──────────────────────────────────────────────────────────
-def run_agent(session_id: str, user_message: str) -> str:
-    client = Groq(api_key=settings.GROQ_API_KEY)
+def run_agent(session_id: str, user_message: str, client=None) -> str:
+    client = client or get_client()
     history = get_history(session_id)
 
     try:
         # Step 1: Get schema
-        schema = get_schema()
+        with CHATBOT_PHASE.time(("schema",)):
+            schema = get_schema()
 
         # Build question with history context
         question = user_message
@@ -144,7 +158,8 @@ def run_agent(session_id: str, user_message: str) -> str:
             question = f"Previous context:\n{context}\n\nCurrent question: {user_message}"
 
         # Step 2: Generate SQL
-        sql = generate_sql(client, question, schema)
+        with CHATBOT_PHASE.time(("llm_sql",)):
+            sql = generate_sql(client, question, schema)
 
         # Clean up any accidental markdown the model adds
         sql = sql.replace("```sql", "").replace("```", "").strip()
@@ -161,10 +176,12 @@ def run_agent(session_id: str, user_message: str) -> str:
             return reply
 
         # Step 4: Run SQL against DB
-        result = run_sql(sql)
+        with CHATBOT_PHASE.time(("sql",)):
+            result = run_sql(sql)
 
         # Step 5: Format as natural language answer
-        reply = format_answer(client, user_message, sql, result, history)
+        with CHATBOT_PHASE.time(("llm_answer",)):
+            reply = format_answer(client, user_message, sql, result, history)
 
         get_history(session_id).append({"human": user_message, "ai": reply})
         return reply
@@ -5,6 +5,7 @@ from .agent import run_agent
 
 class ChatbotAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def post(self, request):
         message = request.data.get("message", "").strip()
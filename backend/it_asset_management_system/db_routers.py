@@ -0,0 +1,135 @@
+"""
+Read replica routing.
+
+`ReplicaReadMiddleware` marks a request as replica-safe when it is a GET/HEAD
+or when its view sets `replica_reads = True` (exports, the chatbot), and picks
+one of `REPLICA_DATABASES` for it. Inside such a request `ReplicaRouter` sends
+reads of the `REPLICA_APPS` models to that replica. Writes, and reads inside a
+transaction on the primary, always use `default`.
+
+Read-your-writes: when a request writes, the response carries a signed,
+timestamped pin in the `X-DB-Pin` header and the `db_pin` cookie. A request
+that brings a pin younger than `REPLICA_PIN_SECONDS` back (the frontend
+echoes the header; same-origin browsers send the cookie) reads from the
+primary. The pin travels with the client, so it holds whichever worker
+serves the next request.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE = "db_pin"
+PIN_HEADER = "X-DB-Pin"
+_pin_signer = signing.TimestampSigner(salt="db_routers.pin")
+
+
+class _ReadState:
+    __slots__ = ("alias", "wrote")
+
+    def __init__(self, alias):
+        # Replica used for this request's reads; None reads from the primary
+        self.alias = alias
+        self.wrote = False
+
+
+_state = ContextVar("db_read_state", default=None)
+
+
+def pick_replica():
+    replicas = settings.REPLICA_DATABASES
+    return random.choice(replicas) if replicas else None
+
+
+def read_alias():
+    """Alias to run explicitly read-only SQL against."""
+    state = _state.get()
+    if state is not None:
+        return state.alias or "default"
+    return pick_replica() or "default"
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _state.set(_ReadState(pick_replica() if enabled else None))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.alias is None:
+            return None
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        # Reads that are part of a write transaction must see its changes
+        if connections["default"].in_atomic_block:
+            return None
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+class ReplicaReadMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def wants_replica(self, request):
+        if not settings.REPLICA_DATABASES:
+            return False
+        if request.method not in SAFE_METHODS:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return False
+            view_class = getattr(match.func, "cls", None) or getattr(match.func, "view_class", None)
+            if not getattr(view_class, "replica_reads", False):
+                return False
+        return not self.is_pinned(request)
+
+    def is_pinned(self, request):
+        for pin in (request.headers.get(PIN_HEADER), request.COOKIES.get(PIN_COOKIE)):
+            if not pin:
+                continue
+            try:
+                _pin_signer.unsign(pin, max_age=settings.REPLICA_PIN_SECONDS)
+            except signing.BadSignature:  # includes SignatureExpired
+                continue
+            return True
+        return False
+
+    def pin(self, request, response):
+        pin = _pin_signer.sign("primary")
+        response[PIN_HEADER] = pin
+        response.set_cookie(PIN_COOKIE, pin, max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax")
+
+    def __call__(self, request):
+        state = _ReadState(pick_replica() if self.wants_replica(request) else None)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote and settings.REPLICA_DATABASES and settings.REPLICA_PIN_SECONDS:
+            self.pin(request, response)
+        return response
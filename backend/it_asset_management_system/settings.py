@@ -14,6 +14,7 @@ from pathlib import Path
 import os
 import environ
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,20 +50,25 @@ INSTALLED_APPS = [
 
     'accounts',
     'chatbot',
+    'monitoring',
     
 
 
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'it_asset_management_system.db_routers.ReplicaReadMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
 ]
 
 CORS_ALLOW_ALL_ORIGINS = False
@@ -70,6 +76,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
 CORS_ALLOW_CREDENTIALS = False
+# The read-your-writes pin (see db_routers.py), which the frontend echoes back
+CORS_EXPOSE_HEADERS = ["X-DB-Pin"]
+CORS_ALLOW_HEADERS = [*default_headers, "x-db-pin"]
 
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
@@ -101,20 +110,65 @@ WSGI_APPLICATION = 'it_asset_management_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        # 'ENGINE': 'django.db.backends.sqlite3',
-        # 'NAME': BASE_DIR / 'db.sqlite3',
+# Connections are reused across requests: with DB_POOL the psycopg 3 pool
+# (needs psycopg[pool]) hands them out, otherwise each worker keeps its
+# connection for DB_CONN_MAX_AGE seconds. Health checks drop dead ones.
+DB_POOL = env.bool("DB_POOL", default=False)
+
 
+def database_settings(prefix="DB"):
+    """Connection settings for a primary (DB_*) or replica (DB_REPLICA_*) alias."""
+    config = {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': env('DB_NAME'),
-        'USER': env('DB_USER'),
-        'PASSWORD': env('DB_PASSWORD'),
-        'HOST': env('DB_HOST'),
-        'PORT': env('DB_PORT'),
+        'NAME': env(f'{prefix}_NAME', default=env('DB_NAME')),
+        'USER': env(f'{prefix}_USER', default=env('DB_USER')),
+        'PASSWORD': env(f'{prefix}_PASSWORD', default=env('DB_PASSWORD')),
+        'HOST': env(f'{prefix}_HOST', default=env('DB_HOST')),
+        'PORT': env(f'{prefix}_PORT', default=env('DB_PORT')),
+        'CONN_HEALTH_CHECKS': True,
+        'CONN_MAX_AGE': 0 if DB_POOL else env.int('DB_CONN_MAX_AGE', default=60),
+        'OPTIONS': {},
     }
+    if DB_POOL:
+        config['OPTIONS']['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+        }
+    return config
+
+
+DATABASES = {
+    # 'default': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': BASE_DIR / 'db.sqlite3',
+    # },
+    'default': database_settings(),
 }
 
+# Read replicas: GET requests, exports, the dashboard and the chatbot read
+# from one of them (picked per request) for the apps in REPLICA_APPS; see
+# db_routers.py. DB_REPLICA_HOSTS is a comma separated list of host[:port];
+# the other DB_REPLICA_* values default to the primary's.
+REPLICA_DATABASES = []
+for _i, _host in enumerate(env.list('DB_REPLICA_HOSTS', default=[]) or [h for h in [env('DB_REPLICA_HOST', default='')] if h], start=1):
+    _host, _, _port = _host.partition(':')
+    DATABASES[f'replica_{_i}'] = {
+        **database_settings('DB_REPLICA'),
+        'HOST': _host,
+        'PORT': _port or env('DB_REPLICA_PORT', default=env('DB_PORT')),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{_i}')
+
+REPLICA_APPS = ['api', 'chatbot']
+
+# After a request writes, the same client reads from the primary for this
+# many seconds so it never sees a replica that has not caught up yet.
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=5)
+
+DATABASE_ROUTERS = ['it_asset_management_system.db_routers.ReplicaRouter']
+
 # Database URL for LangChain SQL Agent
 # For LangChain — must URL-encode the @ in the password as %40
 DATABASE_URL = (
@@ -164,6 +218,102 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Product document downloads.
+# Set DOCUMENTS_SENDFILE to "nginx" (X-Accel-Redirect) or "apache" (X-Sendfile)
+# to let the web server stream files; leave empty to stream from Django.
+# For nginx, DOCUMENTS_SENDFILE_PREFIX must map to an `internal` location
+# aliased to MEDIA_ROOT.
+DOCUMENTS_SENDFILE = env.str("DOCUMENTS_SENDFILE", default="")
+DOCUMENTS_SENDFILE_PREFIX = env.str("DOCUMENTS_SENDFILE_PREFIX", default="/protected-media/")
+DOCUMENTS_CACHE_MAX_AGE = env.int("DOCUMENTS_CACHE_MAX_AGE", default=3600)
+
+# Thumbnails for uploaded documents are rendered in a background thread pool.
+# PDF previews need the optional `pypdfium2` package.
+DOCUMENT_PREVIEWS_ENABLED = env.bool("DOCUMENT_PREVIEWS_ENABLED", default=True)
+DOCUMENT_PREVIEW_WORKERS = env.int("DOCUMENT_PREVIEW_WORKERS", default=2)
+DOCUMENT_PREVIEW_SIZE = (320, 320)
+
+# Cache
+# Cached lists and TCO results are keyed by the newest ChangeLog id of their
+# models (see api/cache.py), read from the database, so a write in any worker
+# invalidates them everywhere and the per-process local-memory default is
+# safe. A shared backend (CACHE_BACKEND=django.core.cache.backends.redis.
+# RedisCache, needs the `redis` package) lets workers share the entries.
+CACHES = {
+    "default": {
+        "BACKEND": env.str("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env.str("CACHE_LOCATION", default=""),
+        "TIMEOUT": 300,
+    }
+}
+
+# Reference-data list responses (vendors, departments, statuses, ...)
+API_LIST_CACHE_TIMEOUT = env.int("API_LIST_CACHE_TIMEOUT", default=3600)
+
+# Serve product/transfer/movement lists from values() rows (see api/fastread.py).
+# Opt-in: run `manage.py compare_fast_read` against the deployment's data first.
+API_FAST_READ = env.bool("API_FAST_READ", default=False)
+
+# Depreciation / TCO reports are cached per as-of date for this many seconds
+TCO_CACHE_TIMEOUT = env.int("TCO_CACHE_TIMEOUT", default=900)
+
+# CSV / Parquet extracts: rows fetched per server-side cursor round trip and
+# per Parquet row group, and the gzip level used for compressed CSV.
+EXPORT_CHUNK_ROWS = env.int("EXPORT_CHUNK_ROWS", default=50000)
+EXPORT_GZIP_LEVEL = env.int("EXPORT_GZIP_LEVEL", default=6)
+
+# Scheduled report snapshots (manage.py run_scheduled_reports): how many to
+# keep per schedule, and how long a generation lock may be held.
+REPORT_SNAPSHOTS_KEEP = env.int("REPORT_SNAPSHOTS_KEEP", default=4)
+REPORT_LOCK_TIMEOUT = env.int("REPORT_LOCK_TIMEOUT", default=3600)
+
+# Request latency, query and serializer metrics served at /metrics in the
+# Prometheus text format (per worker process). Scrapes must send
+# `Authorization: Bearer <METRICS_TOKEN>`; with no token set, /metrics is only
+# served when DEBUG is on.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+
+# Queries slower than SLOW_QUERY_MS (0 disables) are kept in a per-worker ring
+# buffer of SLOW_QUERY_LOG_SIZE entries, served to admins at /api/slow-queries/.
+# SLOW_QUERY_EXPLAIN_RATE (0-1) of slow SELECTs are re-run under
+# EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL, which executes them twice.
+SLOW_QUERY_MS = env.int("SLOW_QUERY_MS", default=200)
+SLOW_QUERY_LOG_SIZE = env.int("SLOW_QUERY_LOG_SIZE", default=200)
+SLOW_QUERY_EXPLAIN_RATE = env.float("SLOW_QUERY_EXPLAIN_RATE", default=0.0)
+
+# Superusers can profile a single request with `X-Profile: sample|cprofile`
+# (or ?_profile=); results are kept in the cache for PROFILE_TTL seconds and
+# listed at /api/profiles/. PROFILING_ENABLED=False removes the middleware.
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=True)
+PROFILE_TTL = env.int("PROFILE_TTL", default=3600)
+PROFILE_SAMPLE_INTERVAL = env.float("PROFILE_SAMPLE_INTERVAL", default=0.001)
+
+# The async dashboard view (ASGI) runs its aggregates concurrently on this many
+# threads per process, each with its own database connection (1 runs them one
+# after another). The sync DashboardViewSet always runs them sequentially.
+DASHBOARD_WORKERS = env.int("DASHBOARD_WORKERS", default=4)
+
+# /api/batch/: sub-requests allowed per batch, and threads shared by batches
+# that ask for "concurrent": true (1 runs every batch sequentially).
+BATCH_MAX_REQUESTS = env.int("BATCH_MAX_REQUESTS", default=20)
+BATCH_WORKERS = env.int("BATCH_WORKERS", default=4)
+
+# TransferLog and RepairMovement are partitioned by month on PostgreSQL (see
+# api/partitions.py). create_history_partitions keeps this many months ahead;
+# archive_history_partitions detaches months older than the retention.
+HISTORY_PARTITIONS_AHEAD = env.int("HISTORY_PARTITIONS_AHEAD", default=3)
+HISTORY_RETENTION_MONTHS = env.int("HISTORY_RETENTION_MONTHS", default=24)
+
+# /api/events/ (Server-Sent Events, ASGI only). On PostgreSQL events reach every
+# worker through NOTIFY on EVENTS_CHANNEL; on other databases only the process
+# that made the change. A client more than EVENTS_QUEUE_SIZE events behind gets
+# a "reset" event; idle streams get a keep-alive every EVENTS_HEARTBEAT seconds.
+EVENTS_ENABLED = env.bool("EVENTS_ENABLED", default=True)
+EVENTS_CHANNEL = env.str("EVENTS_CHANNEL", default="asset_events")
+EVENTS_QUEUE_SIZE = env.int("EVENTS_QUEUE_SIZE", default=256)
+EVENTS_HEARTBEAT = env.int("EVENTS_HEARTBEAT", default=15)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
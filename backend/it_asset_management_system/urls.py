@@ -19,12 +19,17 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from chatbot.views import ChatbotAPIView
+from monitoring.views import ProfileDetailView, ProfileListView, SlowQueryLogView, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('api/auth/', include('accounts.urls')),
     path('api/chatbot/', ChatbotAPIView.as_view(), name='chatbot'),
+    path('api/slow-queries/', SlowQueryLogView.as_view(), name='slow-queries'),
+    path('api/profiles/', ProfileListView.as_view(), name='profiles'),
+    path('api/profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile-detail'),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
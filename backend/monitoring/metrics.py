@@ -0,0 +1,170 @@
+"""
+In-process metrics, exported in the Prometheus text format by `views.metrics`.
+
+Each metric keeps one series per label combination in a dict guarded by its
+own lock, so observing a value is a dict lookup, a bisect and two additions.
+The numbers belong to the process that serves the scrape: with several
+workers, scrape each of them and let Prometheus aggregate.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+REGISTRY = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        REGISTRY.append(self)
+
+    def _check(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues!r}")
+
+    def _items(self):
+        with self._lock:
+            return sorted((values, self._copy(series)) for values, series in self._series.items())
+
+    def samples(self):
+        """(name, label pairs, value) for every sample, in exposition order."""
+        raise NotImplementedError
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    @staticmethod
+    def _copy(series):
+        return series
+
+    def inc(self, labelvalues=(), amount=1):
+        self._check(labelvalues)
+        with self._lock:
+            self._series[labelvalues] = self._series.get(labelvalues, 0) + amount
+
+    def samples(self):
+        for values, total in self._items():
+            yield self.name, list(zip(self.labelnames, values)), total
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    @staticmethod
+    def _copy(series):
+        counts, total = series
+        return list(counts), total
+
+    def observe(self, labelvalues, value):
+        self._check(labelvalues)
+        # Index of the first bucket whose upper bound is >= value; the last slot is +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, labelvalues=()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labelvalues, time.perf_counter() - start)
+
+    def samples(self):
+        bounds = (*self.buckets, math.inf)
+        for values, (counts, total) in self._items():
+            labels = list(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + [("le", _format_number(bound))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+def render(registry=REGISTRY):
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Metrics collected by this project ────────────────────────────────────────
+# `route` is the URL name (e.g. "product-list"), so the label set stays small.
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route, method and status code.",
+    ["route", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response is returned to the WSGI/ASGI server (streamed bodies are not included).",
+    ["route", "method"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries run while handling a request.",
+    ["route", "method"], buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries while handling a request.",
+    ["route", "method"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size (Content-Length for streamed responses).",
+    ["route", "method"], buckets=SIZE_BUCKETS,
+)
+SERIALIZER_TIME = Histogram(
+    "api_serializer_duration_seconds",
+    "Time spent producing serializer.data, including the queries it triggers.",
+    ["route", "serializer"],
+)
+CHATBOT_PHASE = Histogram(
+    "chatbot_phase_duration_seconds", "Time spent in each step of a chatbot answer.",
+    ["phase"],
+)
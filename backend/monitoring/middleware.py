@@ -0,0 +1,151 @@
+"""
+Per-request instrumentation.
+
+`MetricsMiddleware` times each request and, through an execute wrapper on
+every database connection, counts its queries and their time.
+`SlowQueryMiddleware` installs the slow query recorder the same way, and
+`ProfilingMiddleware` profiles single requests on demand (see profiling.py).
+Serializer time is measured by the views (see serializers.py).
+"""
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+
+from . import metrics, profiling
+from .slow_queries import SlowQueryRecorder
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unnamed"
+
+
+class RequestMetrics:
+    __slots__ = ("request", "queries", "db_time")
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+def wrap_connections(stack, wrapper):
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+
+
+def _response_size(response):
+    if response.streaming:
+        length = response.get("Content-Length")
+        return int(length) if length else None
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestMetrics(request)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            wrap_connections(stack, state)
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        labels = (route_name(request), request.method)
+        metrics.REQUESTS.inc((*labels, str(response.status_code)))
+        metrics.REQUEST_LATENCY.observe(labels, elapsed)
+        metrics.REQUEST_QUERIES.observe(labels, state.queries)
+        metrics.REQUEST_DB_TIME.observe(labels, state.db_time)
+        size = _response_size(response)
+        if size is not None:
+            metrics.RESPONSE_SIZE.observe(labels, size)
+        return response
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(lambda: (route_name(request), request.method, request.path))
+        with ExitStack() as stack:
+            wrap_connections(stack, recorder)
+            return self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """
+    Goes last in MIDDLEWARE, after AuthenticationMiddleware. Requests without
+    the profiling flag cost a header lookup and a substring check.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def requested_mode(self, request):
+        mode = request.META.get("HTTP_X_PROFILE")
+        if not mode and "_profile=" in request.META.get("QUERY_STRING", ""):
+            mode = request.GET.get("_profile")
+        if not mode:
+            return None
+        mode = mode.lower()
+        return "sample" if mode in ("1", "true") else mode
+
+    def is_superuser(self, request):
+        if request.user.is_authenticated:
+            return request.user.is_superuser
+        # API clients authenticate with JWT inside the view; check the token here
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return bool(authenticated and authenticated[0].is_active and authenticated[0].is_superuser)
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        if mode not in profiling.MODES or not self.is_superuser(request):
+            # Ignored rather than rejected, so the flag reveals nothing to other users
+            return self.get_response(request)
+
+        response, profile, raw = profiling.profile_call(mode, lambda: self.get_response(request), wrap_connections)
+        if profile is None:
+            response["X-Profile"] = "busy"
+            return response
+
+        profile = profiling.store({
+            "method": request.method,
+            "path": request.get_full_path(),
+            "route": route_name(request),
+            "status": response.status_code,
+            **profile,
+        }, raw)
+        response["X-Profile-Id"] = profile["id"]
+        response["X-Profile-Url"] = request.build_absolute_uri(reverse("profile-detail", args=[profile["id"]]))
+        return response
+
@@ -0,0 +1,194 @@
+"""
+On-demand request profiling.
+
+A superuser adds `X-Profile: sample|cprofile` (or `?_profile=sample|cprofile`)
+to any request; `ProfilingMiddleware` then runs it under the chosen profiler
+together with an SQL timeline, stores the result in the cache for
+`PROFILE_TTL` seconds and returns its id in `X-Profile-Id`. Profiles are read
+back from /api/profiles/<id>/:
+
+* `sample` (default) - a sampling profiler over the request thread; the
+  stacks are downloadable in the folded format that flamegraph.pl, speedscope
+  and inferno read.
+* `cprofile` - deterministic cProfile; the stats download is a `.prof` file
+  for snakeviz / `python -m pstats` / gprof2dot.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+MODES = ("sample", "cprofile")
+INDEX_KEY = "profiles:index"
+INDEX_SIZE = 50
+
+_SITE_MARKERS = ("site-packages/", "dist-packages/")
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve()) + "/"
+# One profiled request at a time per process: the sampler lowers the global
+# thread switch interval while it runs.
+_session_lock = threading.Lock()
+
+
+def _short_path(filename):
+    if filename.startswith(_PROJECT_DIR):
+        return filename[len(_PROJECT_DIR):]
+    for marker in _SITE_MARKERS:
+        index = filename.find(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return filename
+
+
+class StackSampler:
+    """Samples the stack of one thread every `interval` seconds from a helper thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        labels = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._switch_interval = sys.getswitchinterval()
+        # Let the sampler get the GIL about as often as it wants to sample
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class SqlTimeline:
+    """Execute wrapper listing every query with its offset from the start of the request."""
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = time.perf_counter()
+            self.queries.append({
+                "start_ms": round((start - self.started) * 1000, 2),
+                "duration_ms": round((end - start) * 1000, 2),
+                "database": context["connection"].alias,
+                "many": many,
+                "sql": sql[:2000],
+            })
+
+
+def _top_functions(profiler, limit=40):
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(limit)
+    return buffer.getvalue()
+
+
+def profile_call(mode, func, wrap_connections):
+    """
+    Run `func()` under `mode`; returns (its result, profile dict, raw download
+    bytes). `wrap_connections(stack, wrapper)` installs the SQL timeline, or
+    None when another request in this process is already being profiled.
+    """
+    if not _session_lock.acquire(blocking=False):
+        return func(), None, None
+    try:
+        started = time.perf_counter()
+        timeline = SqlTimeline(started)
+        with ExitStack() as stack:
+            wrap_connections(stack, timeline)
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                result = profiler.runcall(func)
+            else:
+                sampler = stack.enter_context(StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL))
+                result = func()
+        elapsed = time.perf_counter() - started
+    finally:
+        _session_lock.release()
+
+    profile = {
+        "mode": mode,
+        "duration_ms": round(elapsed * 1000, 2),
+        "sql_count": len(timeline.queries),
+        "sql_ms": round(sum(q["duration_ms"] for q in timeline.queries), 2),
+        "sql": timeline.queries,
+    }
+    if mode == "cprofile":
+        profiler.create_stats()
+        # The same format as Profile.dump_stats(); pstats.Stats() below empties profiler.stats
+        raw = marshal.dumps(profiler.stats)
+        profile["top_functions"] = _top_functions(profiler)
+    else:
+        profile["samples"] = sum(sampler.stacks.values())
+        profile["sample_interval_ms"] = settings.PROFILE_SAMPLE_INTERVAL * 1000
+        raw = sampler.folded().encode()
+    return result, profile, raw
+
+
+def _key(profile_id, part):
+    return f"profiles:{profile_id}:{part}"
+
+
+def store(profile, raw):
+    profile_id = uuid.uuid4().hex
+    profile = {"id": profile_id, "recorded_at": timezone.now().isoformat(), **profile}
+    cache.set_many({_key(profile_id, "meta"): profile, _key(profile_id, "raw"): raw}, settings.PROFILE_TTL)
+    index = [profile_id] + (cache.get(INDEX_KEY) or [])
+    cache.set(INDEX_KEY, index[:INDEX_SIZE], settings.PROFILE_TTL)
+    return profile
+
+
+def load(profile_id):
+    return cache.get(_key(profile_id, "meta"))
+
+
+def load_raw(profile_id):
+    return cache.get(_key(profile_id, "raw"))
+
+
+def recent():
+    """Summaries of the stored profiles that have not expired, newest first."""
+    index = cache.get(INDEX_KEY) or []
+    found = cache.get_many([_key(profile_id, "meta") for profile_id in index])
+    summaries = []
+    for profile_id in index:
+        profile = found.get(_key(profile_id, "meta"))
+        if profile:
+            summaries.append({k: v for k, v in profile.items() if k not in ("sql", "top_functions")})
+    return summaries
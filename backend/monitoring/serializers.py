@@ -0,0 +1,67 @@
+"""
+Serializer timing for DRF views.
+
+`SerializerMetricsMixin` hands out a subclass of the view's serializer class
+whose `.data` is timed into SERIALIZER_TIME. Lists are timed through the
+subclass's list serializer, once for the whole page. Serializers nested as
+fields keep their own classes, so their time is counted once, inside the
+outermost one.
+"""
+import time
+
+from django.conf import settings
+from rest_framework.serializers import ListSerializer
+
+from . import metrics
+from .middleware import route_name
+
+_timed_classes = {}
+
+
+def _observe(serializer, elapsed):
+    request = serializer.context.get("request")
+    child = getattr(serializer, "child", None)
+    name = type(child if child is not None else serializer).__name__
+    route = route_name(request) if request is not None else "unmatched"
+    metrics.SERIALIZER_TIME.observe((route, name), elapsed)
+
+
+def timed_class(serializer_class):
+    """`serializer_class` with a timed `.data`; built once per class."""
+    timed = _timed_classes.get(serializer_class)
+    if timed is not None:
+        return timed
+
+    data = serializer_class.data
+
+    def timed_data(self):
+        start = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            _observe(self, time.perf_counter() - start)
+
+    attrs = {
+        "__module__": serializer_class.__module__,
+        "__qualname__": serializer_class.__qualname__,
+        "data": property(timed_data),
+    }
+    if not issubclass(serializer_class, ListSerializer):
+        # many=True builds Meta.list_serializer_class around the child
+        meta = getattr(serializer_class, "Meta", object)
+        list_class = getattr(meta, "list_serializer_class", ListSerializer)
+        attrs["Meta"] = type("Meta", (meta,), {"list_serializer_class": timed_class(list_class)})
+
+    timed = type(serializer_class.__name__, (serializer_class,), attrs)
+    _timed_classes[serializer_class] = timed
+    return timed
+
+
+class SerializerMetricsMixin:
+    """Goes first in a view's bases; times the serializers from `get_serializer_class()`."""
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        if not settings.METRICS_ENABLED:
+            return serializer_class
+        return timed_class(serializer_class)
@@ -0,0 +1,153 @@
+"""
+Slow query log.
+
+`SlowQueryRecorder` is installed as an execute wrapper on every connection
+for the duration of a request (see `SlowQueryMiddleware`). Queries slower
+than `SLOW_QUERY_MS` are kept in a per-process ring buffer with their
+normalized fingerprint, the view that ran them and the innermost project
+frame that issued them. A `SLOW_QUERY_EXPLAIN_RATE` share of slow SELECTs
+on PostgreSQL is re-run under `EXPLAIN (ANALYZE, BUFFERS)`; that executes the
+query a second time, so keep the rate low.
+"""
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES = metrics.Counter(
+    "db_slow_queries_total", "Queries slower than SLOW_QUERY_MS, by route.", ["route"],
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """SQL with literals and parameters replaced by `?`, and IN lists collapsed."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+_OWN_DIR = str(Path(__file__).resolve().parent)
+
+
+def project_stack(limit=8):
+    """Innermost-first `file:line in function` strings for the project's own frames."""
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if not filename.startswith(_PROJECT_DIR) or filename.startswith(_OWN_DIR) or "site-packages" in filename:
+            continue
+        frames.append(f"{filename[len(_PROJECT_DIR) + 1:]}:{frame.lineno} in {frame.name}")
+        if len(frames) == limit:
+            break
+    return frames
+
+
+def explain(connection, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) output, or None where it does not apply."""
+    if connection.vendor != "postgresql" or sql.lstrip()[:6].lower() not in ("select", "with"):
+        return None
+    # A failing EXPLAIN must not abort the caller's transaction
+    savepoint = connection.savepoint() if connection.in_atomic_block else None
+    try:
+        with connection.cursor() as cursor:
+            # The raw cursor bypasses the execute wrappers, so this is not logged itself
+            cursor.cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.cursor.fetchall())
+    except Exception as exc:
+        if savepoint:
+            connection.savepoint_rollback(savepoint)
+        return f"EXPLAIN failed: {exc}"
+    if savepoint:
+        connection.savepoint_commit(savepoint)
+    return plan
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of slow query entries for this process."""
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=size)
+
+    def append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self):
+        """Newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+class SlowQueryRecorder:
+    """Execute wrapper recording queries slower than the threshold for `view`."""
+
+    def __init__(self, view, threshold_ms=None, explain_rate=None):
+        # `view` is a callable so the route can be resolved after URL matching
+        self.view = view
+        self.threshold = (settings.SLOW_QUERY_MS if threshold_ms is None else threshold_ms) / 1000
+        self.explain_rate = settings.SLOW_QUERY_EXPLAIN_RATE if explain_rate is None else explain_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            self.record(sql, params, many, context["connection"], duration)
+        return result
+
+    def record(self, sql, params, many, connection, duration):
+        route, method, path = self.view()
+        normalized = fingerprint(sql)
+        stack = project_stack()
+        entry = {
+            "fingerprint": normalized,
+            "fingerprint_id": hashlib.md5(normalized.encode()).hexdigest()[:12],
+            "sql": sql[:4000],
+            "duration_ms": round(duration * 1000, 2),
+            "database": connection.alias,
+            "route": route,
+            "method": method,
+            "path": path,
+            "frame": stack[0] if stack else None,
+            "stack": stack,
+            "plan": None,
+            "recorded_at": timezone.now().isoformat(),
+        }
+        if not many and self.explain_rate and random.random() < self.explain_rate:
+            entry["plan"] = explain(connection, sql, params)
+
+        log.append(entry)
+        SLOW_QUERIES.inc((route,))
+        logger.warning(
+            "Slow query (%.1f ms) in %s %s at %s: %s",
+            entry["duration_ms"], method, route, entry["frame"], normalized[:500],
+        )
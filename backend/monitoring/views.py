@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import profiling, slow_queries
+from .metrics import render
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint; requires `Authorization: Bearer <METRICS_TOKEN>`.
+    Without a token it is only served when DEBUG is on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse("METRICS_TOKEN is not set.", status=403, content_type="text/plain")
+    elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class SlowQueryLogView(APIView):
+    """
+    Slow queries recorded by this worker, newest first. Filter with `?route=`,
+    `?fingerprint=` (the fingerprint_id) and `?min_ms=`; DELETE clears the log.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        entries = slow_queries.log.entries()
+        route = request.query_params.get("route")
+        fingerprint_id = request.query_params.get("fingerprint")
+        min_ms = request.query_params.get("min_ms")
+        if route:
+            entries = [e for e in entries if e["route"] == route]
+        if fingerprint_id:
+            entries = [e for e in entries if e["fingerprint_id"] == fingerprint_id]
+        if min_ms:
+            try:
+                min_ms = float(min_ms)
+            except ValueError:
+                return Response({"error": "min_ms must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+            entries = [e for e in entries if e["duration_ms"] >= min_ms]
+        return Response({"threshold_ms": settings.SLOW_QUERY_MS, "count": len(entries), "results": entries})
+
+    def delete(self, request):
+        slow_queries.log.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfileListView(APIView):
+    """Recently stored request profiles (see monitoring/profiling.py)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(profiling.recent())
+
+
+class ProfileDetailView(APIView):
+    """
+    A stored profile with its SQL timeline. `?download=1` returns the folded
+    stacks (sample mode) or the `.prof` stats file (cprofile mode).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = profiling.load(profile_id)
+        if profile is None:
+            return Response({"error": "Profile not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get("download") not in ("1", "true"):
+            return Response(profile)
+
+        raw = profiling.load_raw(profile_id) or b""
+        if profile["mode"] == "cprofile":
+            response = HttpResponse(raw, content_type="application/octet-stream")
+            filename = f"profile-{profile_id}.prof"
+        else:
+            response = HttpResponse(raw, content_type="text/plain; charset=utf-8")
+            filename = f"profile-{profile_id}.folded"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -6,6 +6,22 @@ const BASE_URL = import.meta.env.VITE_API_BASE_URL;
 
 const TOKEN_KEY   = "access_token";
 const REFRESH_KEY = "refresh_token";
+const PIN_HEADER  = "x-db-pin";
+
+/**
+ * Read-your-writes: after a write the backend answers with a short-lived
+ * X-DB-Pin; sending it back keeps our reads on the primary database until
+ * the replicas have caught up (the backend ignores it once expired).
+ */
+let dbPin = null;
+axios.interceptors.response.use((res) => {
+  if (res.headers?.[PIN_HEADER]) dbPin = res.headers[PIN_HEADER];
+  return res;
+});
+axios.interceptors.request.use((config) => {
+  if (dbPin) config.headers[PIN_HEADER] = dbPin;
+  return config;
+});
 
 /** Set or clear the Authorization header on every future axios request. */
 const setAxiosAuth = (token) => {
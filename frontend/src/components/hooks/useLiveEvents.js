@@ -0,0 +1,63 @@
+// useLiveEvents.js
+import { useEffect, useRef } from "react";
+
+const API = import.meta.env.VITE_API_BASE_URL || "http://127.0.0.1:8000/api";
+const MAX_DELAY = 60000;
+
+/**
+ * Subscribe to the backend's live change events (Server-Sent Events).
+ *
+ * `handlers` maps an event name ("product.created", "dashboard.delta",
+ * "reset", ...) to a callback that receives the parsed payload. On "reset"
+ * events may have been missed, so the view should refetch.
+ *
+ * The server closes the stream when the access token expires; it is reopened
+ * with whatever token is current by then. Events sent while disconnected are
+ * lost, so every reconnect also calls the "reset" handler.
+ */
+export function useLiveEvents(handlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    let source = null;
+    let timer = null;
+    let delay = 1000;
+    let stopped = false;
+    let opened = false;
+
+    const connect = () => {
+      const token = localStorage.getItem("access_token");
+      if (stopped || !token) return;
+
+      source = new EventSource(`${API}/events/?token=${encodeURIComponent(token)}`);
+      source.onopen = () => {
+        delay = 1000;
+        if (opened) {
+          const reset = handlersRef.current.reset;
+          if (reset) reset({});
+        }
+        opened = true;
+      };
+      Object.keys(handlersRef.current).forEach((name) => {
+        source.addEventListener(name, (event) => {
+          const handler = handlersRef.current[name];
+          if (handler) handler(JSON.parse(event.data));
+        });
+      });
+      source.onerror = () => {
+        // EventSource would retry with the same (possibly expired) token
+        source.close();
+        timer = setTimeout(connect, delay);
+        delay = Math.min(delay * 2, MAX_DELAY);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(timer);
+      if (source) source.close();
+    };
+  }, []);
+}
@@ -14,6 +14,7 @@ import {
 } from "react-icons/fa";
 import { HiOutlineCash } from "react-icons/hi";
 import { toast } from "react-toastify";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 import {
   PieChart,
   Pie,
@@ -31,6 +32,21 @@ import {
 const API = "http://127.0.0.1:8000/api/dashboard/";
 const COLORS = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6", "#F472B6"];
 
+const statusKey = (name) => name.toLowerCase().replace(/\s+/g, "_");
+
+// Add per-name count changes to chart rows, dropping rows that reach zero
+const applyCounts = (rows, nameKey, valueKey, changes) => {
+  const next = rows.map((row) =>
+    row[nameKey] in changes ? { ...row, [valueKey]: row[valueKey] + changes[row[nameKey]] } : row
+  );
+  Object.entries(changes).forEach(([name, change]) => {
+    if (change > 0 && !rows.some((row) => row[nameKey] === name)) {
+      next.push({ [nameKey]: name, [valueKey]: change });
+    }
+  });
+  return next.filter((row) => row[valueKey] > 0);
+};
+
 export default function Dashboard() {
   const [loading, setLoading] = useState(true);
   const [summary, setSummary] = useState({
@@ -61,36 +77,72 @@ export default function Dashboard() {
     }
   }, [location.state]);
 
-  useEffect(() => {
-    const fetchDashboard = async () => {
-      try {
-        setLoading(true);
-        const res = await axios.get(API);
-        const data = res.data;
+  const fetchDashboard = async (showLoading = true) => {
+    try {
+      if (showLoading) setLoading(true);
+      const res = await axios.get(API);
+      const data = res.data;
 
-        setSummary(data.summary || {});
-        setDepartmentProducts(data.department_products || []);
-        setRepairStatusCounts(data.repair_status_counts || []);
-        setProductCategoryCounts(data.product_category_counts || []);
-        setProductVendorCounts(data.product_vendor_counts || []);
-        
-        const statusMap = { repaired: 0, repairing: 0, in_stock: 0, in_use: 0 };
-        (data.product_status_counts || []).forEach((item) => {
-          const key = item.status_name.toLowerCase().replace(/\s+/g, "_");
-          if (statusMap[key] !== undefined) statusMap[key] = item.value;
-        });
-        setProductStatusCounts(statusMap);
-      } catch (err) {
-        console.error(err);
-        toast.error("Failed to load dashboard data.");
-      } finally {
-        setLoading(false);
-      }
-    };
+      setSummary(data.summary || {});
+      setDepartmentProducts(data.department_products || []);
+      setRepairStatusCounts(data.repair_status_counts || []);
+      setProductCategoryCounts(data.product_category_counts || []);
+      setProductVendorCounts(data.product_vendor_counts || []);
+      
+      const statusMap = { repaired: 0, repairing: 0, in_stock: 0, in_use: 0 };
+      (data.product_status_counts || []).forEach((item) => {
+        const key = statusKey(item.status_name);
+        if (statusMap[key] !== undefined) statusMap[key] = item.value;
+      });
+      setProductStatusCounts(statusMap);
+    } catch (err) {
+      console.error(err);
+      toast.error("Failed to load dashboard data.");
+    } finally {
+      if (showLoading) setLoading(false);
+    }
+  };
 
+  useEffect(() => {
     fetchDashboard();
   }, []);
 
+  // Keep the counters current from the server's change events instead of reloading
+  useLiveEvents({
+    "dashboard.delta": (delta) => {
+      if (delta.summary) {
+        setSummary((prev) => {
+          const next = { ...prev };
+          Object.entries(delta.summary).forEach(([key, change]) => {
+            next[key] = Number(next[key] || 0) + change;
+          });
+          return next;
+        });
+      }
+      if (delta.department_products) {
+        setDepartmentProducts((rows) => applyCounts(rows, "dept", "count", delta.department_products));
+      }
+      if (delta.product_category_counts) {
+        setProductCategoryCounts((rows) => applyCounts(rows, "category__name", "value", delta.product_category_counts));
+      }
+      if (delta.product_vendor_counts) {
+        setProductVendorCounts((rows) => applyCounts(rows, "vendor__name", "value", delta.product_vendor_counts));
+      }
+      if (delta.product_status_counts) {
+        setProductStatusCounts((prev) => {
+          const next = { ...prev };
+          Object.entries(delta.product_status_counts).forEach(([name, change]) => {
+            const key = statusKey(name);
+            if (next[key] !== undefined) next[key] += change;
+          });
+          return next;
+        });
+      }
+    },
+    // Events may have been missed
+    reset: () => fetchDashboard(false),
+  });
+
   const cards = [
     {
       name: "Total Price",
@@ -40,15 +40,19 @@ function AddProduct() {
 
   const fetchDropdowns = async () => {
     try {
-      const [cat, ven, dep, stat] = await Promise.all([
-        axios.get('http://127.0.0.1:8000/api/categories/'),
-        axios.get('http://127.0.0.1:8000/api/vendors/'),
-        axios.get('http://127.0.0.1:8000/api/departments/'),
-      ]);
-
-      setCategories(mapOptions(cat.data.results));
-      setVendors(mapOptions(ven.data.results));
-      setDepartments(mapOptions(dep.data.results));
+      // One round trip for all dropdowns
+      const res = await axios.post('http://127.0.0.1:8000/api/batch/', {
+        requests: [
+          { id: 'categories', path: '/api/categories/' },
+          { id: 'vendors', path: '/api/vendors/' },
+          { id: 'departments', path: '/api/departments/' },
+        ],
+      });
+      const [cat, ven, dep] = res.data.responses.map((r) => r.body);
+
+      setCategories(mapOptions(cat.results));
+      setVendors(mapOptions(ven.results));
+      setDepartments(mapOptions(dep.results));
     } catch (err) {
       console.error(err);
     }
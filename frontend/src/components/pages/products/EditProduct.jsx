@@ -41,15 +41,19 @@ function EditProduct() {
 
   const fetchDropdowns = async () => {
     try {
-      const [cat, ven, dep, stat] = await Promise.all([
-        axios.get("http://127.0.0.1:8000/api/categories/"),
-        axios.get("http://127.0.0.1:8000/api/vendors/"),
-        axios.get("http://127.0.0.1:8000/api/departments/"),
-      ]);
-
-      setCategories(mapOptions(cat.data.results));
-      setVendors(mapOptions(ven.data.results));
-      setDepartments(mapOptions(dep.data.results));
+      // One round trip for all dropdowns
+      const res = await axios.post("http://127.0.0.1:8000/api/batch/", {
+        requests: [
+          { id: "categories", path: "/api/categories/" },
+          { id: "vendors", path: "/api/vendors/" },
+          { id: "departments", path: "/api/departments/" },
+        ],
+      });
+      const [cat, ven, dep] = res.data.responses.map((r) => r.body);
+
+      setCategories(mapOptions(cat.results));
+      setVendors(mapOptions(ven.results));
+      setDepartments(mapOptions(dep.results));
     } catch (err) {
       console.error(err);
     }
@@ -144,6 +148,23 @@ function EditProduct() {
     }
   };
 
+  // The download endpoint needs the Authorization header, which a plain link
+  // cannot send: fetch the file and open it from a blob URL instead.
+  const handleOpenDoc = async (event, doc) => {
+    event.preventDefault();
+    const tab = window.open("", "_blank");
+    try {
+      const res = await axios.get(doc.download_url, { responseType: "blob" });
+      const url = URL.createObjectURL(res.data);
+      tab.location.href = url;
+      setTimeout(() => URL.revokeObjectURL(url), 60000);
+    } catch (err) {
+      console.error(err);
+      tab.close();
+      toast.error("Failed to open document");
+    }
+  };
+
   return (
     <div className="max-w-6xl mx-auto p-6 space-y-6">
       <div className="bg-white shadow-xl rounded-2xl p-6">
@@ -259,8 +280,8 @@ function EditProduct() {
                     className="flex items-center gap-2 bg-gray-100 px-3 py-2 rounded-lg"
                   >
                     <a
-                      href={doc.file}
-                      target="_blank"
+                      href={doc.download_url}
+                      onClick={(event) => handleOpenDoc(event, doc)}
                       className="text-blue-600 truncate"
                     >
                       {doc.file.split("/").pop()}